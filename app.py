@@ -3,6 +3,7 @@
 import streamlit as st
 import requests
 import os
+import time
 from dotenv import load_dotenv
 
 # --- INITIALIZATION ---
@@ -25,6 +26,9 @@ def initialize_session_state():
         st.session_state.gemini_api_key = os.getenv("GEMINI_API_KEY", "")
     if 'groq_api_key' not in st.session_state:
         st.session_state.groq_api_key = os.getenv("GROQ_API_KEY", "")
+    # Id of the last submitted generation job, so a rerun can keep polling it
+    if 'job_id' not in st.session_state:
+        st.session_state.job_id = None
 
     # --- Form Fields ---
     # This dictionary makes it easy to add or change default values.
@@ -356,8 +360,77 @@ def page_three():
 
 # --- DATA SUBMISSION LOGIC ---
 
+# How often and for how long the job status is polled.
+JOB_POLL_INTERVAL = 5  # seconds
+JOB_POLL_TIMEOUT = 30 * 60  # seconds
+
+def fetch_pdf(business_plan):
+    """
+    Has the backend render the plan to PDF. Returns None if the export is not available,
+    so the markdown download still works.
+    """
+    backend_url = os.getenv("BACKEND_URL")
+    if not backend_url:
+        return None
+    try:
+        response = requests.post(
+            f"{backend_url}/export", params={"format": "pdf"}, json={"markdown": business_plan}, timeout=120
+        )
+    except requests.exceptions.RequestException:
+        return None
+    return response.content if response.status_code == 200 else None
+
+def show_business_plan(business_plan):
+    """Renders the generated business plan with download buttons for markdown and PDF."""
+    st.markdown("---")
+    st.header("Generated Business Plan")
+    st.markdown(business_plan, unsafe_allow_html=True)
+    st.success("✅ Business Plan ready!")
+
+    st.download_button(
+        label="Download Business Plan", data=business_plan,
+        file_name="business_plan.md", mime="text/markdown"
+    )
+    pdf = fetch_pdf(business_plan)
+    if pdf:
+        st.download_button(
+            label="Download Business Plan (PDF)", data=pdf,
+            file_name="business_plan.pdf", mime="application/pdf"
+        )
+
+def wait_for_job(backend_url, job_id):
+    """
+    Polls the backend until the job is finished and renders the result.
+    Each poll is a short request, so slow runs no longer hit a client timeout.
+    """
+    deadline = time.time() + JOB_POLL_TIMEOUT
+    while time.time() < deadline:
+        response = requests.get(f"{backend_url}/jobs/{job_id}", timeout=30)
+        if response.status_code != 200:
+            st.error(f"Error from server (Status {response.status_code}): {response.text}")
+            return
+        status = response.json().get("status")
+        if status == "succeeded":
+            break
+        if status == "failed":
+            st.session_state.job_id = None
+            st.error(f"Business plan generation failed: {response.json().get('error')}")
+            return
+        time.sleep(JOB_POLL_INTERVAL)
+    else:
+        st.warning("The business plan is still being generated. Click 'Generate Business Plan' again later to check on it.")
+        return
+
+    response = requests.get(f"{backend_url}/jobs/{job_id}/result", timeout=30)
+    if response.status_code == 200:
+        st.session_state.job_id = None
+        business_plan = response.json().get("business_plan", "Error: No business plan in response.")
+        show_business_plan(business_plan)
+    else:
+        st.error(f"Error from server (Status {response.status_code}): {response.text}")
+
 def generate_business_plan():
-    """Collects data from session_state and calls the backend API."""
+    """Collects data from session_state, submits a generation job and waits for the result."""
     with st.spinner("🧠 Generating your business plan... This may take a few minutes."):
         try:
             # Get the backend URL from environment variables.
@@ -366,8 +439,13 @@ def generate_business_plan():
                 st.error("Configuration error: BACKEND_URL is not set. Please set it in Render environment variables or your local .env file.")
                 return
 
+            # A job from a previous click is still running: keep waiting for it instead of resubmitting
+            if st.session_state.job_id:
+                wait_for_job(backend_url, st.session_state.job_id)
+                return
+
             # Collect all form data from session state
-            data = {key: st.session_state[key] for key in st.session_state if key not in ['page', 'authenticated']}
+            data = {key: st.session_state[key] for key in st.session_state if key not in ['page', 'authenticated', 'job_id']}
             # Ensure both API keys are passed to the backend
             data['gemini_api_key'] = st.session_state.gemini_api_key
             data['groq_api_key'] = st.session_state.groq_api_key
@@ -385,24 +463,14 @@ def generate_business_plan():
 
 
             response = requests.post(
-                f"{backend_url}/generate_business_plan", # Append the endpoint path
+                f"{backend_url}/jobs", # Submit a job; the plan is generated in the background
                 json=data, # 'data' now contains 'important_strategic_partners' as a list
-                timeout=300  # 5-minute timeout for potentially long AI responses
+                timeout=30
             )
 
-            if response.status_code == 200:
-                result = response.json()
-                business_plan = result.get("business_plan", "Error: No business plan in response.")
-
-                st.markdown("---")
-                st.header("Generated Business Plan")
-                st.markdown(business_plan, unsafe_allow_html=True)
-                st.success("✅ Business Plan ready!")
-
-                st.download_button(
-                    label="Download Business Plan", data=business_plan,
-                    file_name="business_plan.md", mime="text/markdown"
-                )
+            if response.status_code == 202:
+                st.session_state.job_id = response.json()["job_id"]
+                wait_for_job(backend_url, st.session_state.job_id)
             else:
                 st.error(f"Error from server (Status {response.status_code}): {response.text}")
 
@@ -1,32 +1,99 @@
 # --- START OF FILE backend.py ---
 
+import asyncio
 import os
+import time
 import traceback
+from contextlib import asynccontextmanager
 from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
 # Assuming your project structure is correct, this imports the flow from src/main.py
 # Make sure to adjust your PYTHONPATH if src is not directly importable from the root.
 # For Render, usually, the root directory is added to PYTHONPATH automatically.
-from src.main import BusinessPlanFlow, BusinessPlanState
+from src.main import BusinessPlanFlow, BusinessPlanState, llm_pool, section_cache
+from src.schemas import BusinessPlanRequest, collect_business_plan_inputs
+from src.job_store import JobStore, JOB_FAILED, JOB_SUCCEEDED
+from src.config import config_version, get_plan_config
+from src.export import ExportUnavailableError, default_exporter
+from src.generate_plan_crew import DEFAULT_CONTEXT_MODE, DEFAULT_REFINE_MODE
+from src.metrics import registry as metrics_registry
+from src.plan_archive import ArchivedPlan, ArchivedPlanSummary, default_archive
+from src.plan_linter import review_savings
+from src.plan_cache import PlanCache
+from src.tracing import span, trace_from_headers, use_trace
 
 # Load environment variables from a .env file if it exists.
 # This is crucial for making API keys available to your application locally.
 # On Render, environment variables are set directly in the service configuration.
 load_dotenv()
 
+# Parse and validate agents.yaml/tasks.yaml once at startup, so an invalid config fails fast.
+# Later edits are picked up automatically (hot reload on mtime change).
+get_plan_config()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Each worker fails the jobs of the exited worker it replaces on startup; jobs of the
+    # other workers sharing the job store keep running
+    failed = job_store.fail_interrupted_jobs()
+    if failed:
+        print(f"Marked {failed} interrupted job(s) as failed.")
+    yield
+
 # Initialize the FastAPI application
 app = FastAPI(
     title="Business Plan Generator API",
     description="An API to generate a comprehensive business plan using AI agents.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+# Every request runs in a trace: the trace id is taken from a `traceparent` or `X-Trace-Id`
+# header when present and returned in the X-Trace-Id response header. Jobs started by a
+# request stay in its trace. Render a trace with `python -m src.trace_view <trace id>`.
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    trace = trace_from_headers(request.headers)
+    with use_trace(trace["trace_id"], trace["parent_id"]):
+        with span(f"{request.method} {request.url.path}", kind="server") as request_span:
+            response = await call_next(request)
+            request_span.set_attribute("status_code", response.status_code)
+    response.headers["X-Trace-Id"] = trace["trace_id"]
+    return response
+
+# Persistent job store for the asynchronous job API.
+# Jobs left unfinished by a previous process cannot be resumed (API keys are not stored).
+job_store = JobStore(os.getenv("JOB_STORE_PATH", "data/jobs.sqlite3"))
+_running_jobs = {}
+
+# Concurrency of a batch when the request does not ask for one, and the highest value a request may ask for
+BATCH_DEFAULT_CONCURRENCY = int(os.getenv("BATCH_DEFAULT_CONCURRENCY", "2"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+
+# Whole-plan cache: resubmitting the same questionnaire (with the same agent/task config)
+# returns the stored plan instead of running the crew again.
+plan_cache = PlanCache(
+    directory=os.getenv("PLAN_CACHE_DIR", "data/plan_cache"),
+    max_bytes=int(os.getenv("PLAN_CACHE_MAX_BYTES", str(200 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("PLAN_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
 )
 
+# Archive of every generated plan with its sections and timings, queryable through the /plans endpoints.
+# Plans older than PLAN_ARCHIVE_RETENTION_DAYS, and the oldest beyond PLAN_ARCHIVE_MAX_PLANS, are purged.
+plan_archive = default_archive()
+plan_archive.purge()
+
+# Rendered HTML/PDF exports of plans, made in worker processes and cached by the content hash of the markdown
+plan_exporter = default_exporter()
+
 # --- HEALTH CHECK ENDPOINT ---
 @app.get("/")
+@app.get("/health")
 def read_root():
     """
     Root endpoint for health checks.
@@ -34,230 +101,158 @@ def read_root():
     """
     return {"status": "ok", "message": "Business Plan Generator API is running"}
 
-# --- DATA MODELS ---
-# Defines the structure of the incoming request from the frontend.
-class BusinessPlanRequest(BaseModel):
-    # Add both API keys to the request model, as they are now sent from the frontend
-    gemini_api_key: str
-    groq_api_key: str
-
-    business_name: str
-    start_year: str
-    business_reason: str
-    mission_vision: str
-    legal_structure: str
-    financial_funding: List[str]
-    business_sector: str
-    product_service_description: str
-
-    # Business Sector Information
-    raw_materials_type: Optional[str] = ""
-    industrial_business_type: Optional[str] = ""
-    services_type: Optional[str] = ""
-    durable_goods_type: Optional[str] = ""
-    consumer_goods_type: Optional[str] = ""
-    healthcare_type: Optional[str] = ""
-    financial_sector_type: Optional[str] = ""
-    it_sector_type: Optional[str] = ""
-    utilities_type: Optional[str] = ""
-    culture_type: Optional[str] = ""
-
-    # Market Information
-    primary_countries: str
-    product_centralisation: str
-    product_range: str
-    end_consumer_characteristics: str
-    end_consumer_characteristics_2: List[str]
-
-    # Segmentation Information
-    segment_name: str
-    segment_demographics: str
-    segment_characteristics: str
-    customer_count: str
-    problems_faced: str
-    biggest_competitors: str
-    competition_intensity: str
-    price_comparison: str
-    market_type: str
-    competitive_parameters: List[str]
-    value_propositions: List[str]
-    direct_income: str
-    primary_revenue: List[str]
-    one_time_payments: Optional[List[str]] = []
-    ongoing_payments: Optional[List[str]] = []
-    payment_characteristics: Optional[List[str]] = []
-    package_price: str
-    price_negotiation: str
-    fixed_prices: Optional[List[str]] = []
-    dynamic_prices: Optional[List[str]] = []
-    distribution_channels: List[str]
-    purchasing_power: str
-    product_related_characteristics: List[str]
-    self_service_availability: str
-    online_communities_presence: str
-    development_process_customer_involvement: str
-    after_sale_purchases: str
-    personal_assistance_offered: str
-    similar_products_switch: str
-    general_customer_relation: str
-
-    # Key resources
-    material_resources: List[str]
-    intangible_resources: List[str]
-    important_activities: List[str]
-    inhouse_activities: List[str]
-    outsourced_activities: Optional[List[str]] = []
-
-    # Company statements
-    company_statements: Optional[List[str]] = []
-
-    # Important strategic partners
-    important_strategic_partners: List[str]
-    partnership_benefits: List[str]
-    other_benefit: Optional[str] = ""
-    company_dependency: str
-    cost_intensive_components: List[str]
-
-    # Team
-    team_members: str
-    funding_amount: str
-    funding_purpose: str
+# --- STATS ENDPOINT ---
+@app.get("/stats")
+def read_stats():
+    """
+    Returns the hit/miss counters and size of the in-process caches and of the LLM client pool,
+    the size of the plan archive, and how often the evaluator/refiner review was skipped because the linter found nothing.
+    """
+    return {
+        "plan_cache": plan_cache.stats(),
+        "section_cache": section_cache.stats(),
+        "llm_pool": llm_pool.stats(),
+        "review": review_savings.stats(),
+        "export_cache": plan_exporter.cache.stats(),
+        "plan_archive": plan_archive.stats(),
+    }
 
+# --- METRICS ENDPOINT ---
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    """
+    Returns the per-task and per-provider LLM metrics (tokens, latency, cost, iterations,
+    retries) of this worker process in the Prometheus text format.
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+# --- DATA MODELS ---
 # Defines the structure of the response sent back to the frontend.
 class BusinessPlanResponse(BaseModel):
     business_plan: str
+    cached: bool = False
+    # Sections taken from the section cache and sections generated by the agents in this run
+    reused_sections: List[str] = []
+    regenerated_sections: List[str] = []
+    # Version of the agents.yaml/tasks.yaml pair the plan was generated with
+    config_version: str = ""
+    # Id of the plan in the plan archive (GET /plans/{plan_id})
+    plan_id: str = ""
+
+# Responses of the asynchronous job API.
+class JobSubmissionResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    created_at: float
+    updated_at: float
+    error: Optional[str] = None
 
-# --- HELPER FUNCTION ---
-def collect_business_plan_inputs(request: BusinessPlanRequest) -> dict:
+# A plan to export.
+class ExportRequest(BaseModel):
+    markdown: str
+
+# One NDJSON line of the batch endpoint.
+class BatchItemResult(BaseModel):
+    # Position of the payload in the submitted list
+    index: int
+    status: str
+    result: Optional[BusinessPlanResponse] = None
+    error: Optional[str] = None
+    # Seconds spent waiting for a concurrency slot and generating the plan
+    queued_seconds: float = 0.0
+    duration_seconds: float = 0.0
+
+# --- FLOW EXECUTION ---
+async def run_business_plan_flow(inputs: dict, bypass_cache: bool = False) -> BusinessPlanResponse:
     """
-    Collects and formats the inputs from the frontend request for use in the crew.
+    Returns the business plan for the collected inputs, from the plan cache if possible,
+    otherwise by running the BusinessPlanFlow.
 
     Args:
-        request (BusinessPlanRequest): The request object containing all user inputs
+        inputs (dict): The inputs returned by collect_business_plan_inputs
+        bypass_cache (bool): Always run the flow, even if a cached plan exists
 
     Returns:
-        dict: A dictionary containing all the inputs formatted for use in the crew
+        BusinessPlanResponse: The generated business plan
     """
-    def safe_join(lst):
-        """Safely join a list into a string, handling None and empty lists."""
-        return ", ".join(lst) if lst else ""
-
-    # This dictionary structure must match the variables expected by your crew's tasks.
-    inputs = {
-        # Include API keys directly in inputs for the crew to use
-        "gemini_api_key": request.gemini_api_key,
-        "groq_api_key": request.groq_api_key,
-
-        "business_name": request.business_name,
-        "start_year": request.start_year,
-        "business_reason": request.business_reason,
-        "mission_vision": request.mission_vision,
-        "legal_structure": request.legal_structure,
-        "financial_funding": safe_join(request.financial_funding),
-        "business_sector": request.business_sector,
-        "raw_materials_type": request.raw_materials_type,
-        "industrial_business_type": request.industrial_business_type,
-        "services_type": request.services_type,
-        "durable_goods_type": request.durable_goods_type,
-        "consumer_goods_type": request.consumer_goods_type,
-        "healthcare_type": request.healthcare_type,
-        "financial_sector_type": request.financial_sector_type,
-        "it_sector_type": request.it_sector_type,
-        "utilities_type": request.utilities_type,
-        "culture_type": request.culture_type,
-        "product_service_description": request.product_service_description,
-        "primary_countries": request.primary_countries,
-        "product_centralisation": request.product_centralisation,
-        "product_range": request.product_range,
-        "end_consumer_characteristics": request.end_consumer_characteristics,
-        "end_consumer_characteristics_2": safe_join(request.end_consumer_characteristics_2),
-        "segment_name": request.segment_name,
-        "segment_demographics": request.segment_demographics,
-        "segment_characteristics": request.segment_characteristics,
-        "customer_count": request.customer_count,
-        "problems_faced": request.problems_faced,
-        "biggest_competitors": request.biggest_competitors,
-        "competition_intensity": request.competition_intensity,
-        "price_comparison": request.price_comparison,
-        "market_type": request.market_type,
-        "competitive_parameters": safe_join(request.competitive_parameters),
-        "value_propositions": safe_join(request.value_propositions),
-        "direct_income": request.direct_income,
-        "primary_revenue": safe_join(request.primary_revenue),
-        "one_time_payments": safe_join(request.one_time_payments),
-        "ongoing_payments": safe_join(request.ongoing_payments),
-        "payment_characteristics": safe_join(request.payment_characteristics),
-        "package_price": request.package_price,
-        "price_negotiation": request.price_negotiation,
-        "fixed_prices": safe_join(request.fixed_prices),
-        "dynamic_prices": safe_join(request.dynamic_prices),
-        "distribution_channels": safe_join(request.distribution_channels),
-        "purchasing_power": request.purchasing_power,
-        "product_related_characteristics": safe_join(request.product_related_characteristics),
-        "self_service_availability": request.self_service_availability,
-        "online_communities_presence": request.online_communities_presence,
-        "development_process_customer_involvement": request.development_process_customer_involvement,
-        "after_sale_purchases": request.after_sale_purchases,
-        "personal_assistance_offered": request.personal_assistance_offered,
-        "similar_products_switch": request.similar_products_switch,
-        "general_customer_relation": request.general_customer_relation,
-        "material_resources": safe_join(request.material_resources),
-        "intangible_resources": safe_join(request.intangible_resources),
-        "important_activities": safe_join(request.important_activities),
-        "inhouse_activities": safe_join(request.inhouse_activities),
-        "outsourced_activities": safe_join(request.outsourced_activities),
-        "company_statements": safe_join(request.company_statements),
-        "important_strategic_partners": safe_join(request.important_strategic_partners),
-        "partnership_benefits": safe_join(request.partnership_benefits),
-        "other_benefit": request.other_benefit,
-        "company_dependency": request.company_dependency,
-        "cost_intensive_components": safe_join(request.cost_intensive_components),
-        "team_members": request.team_members,
-        "funding_amount": request.funding_amount,
-        "funding_purpose": request.funding_purpose
-    }
-    return inputs
+    with span("business_plan", bypass_cache=bypass_cache) as plan_span:
+        # Plans generated from digested context or refined with patches are cached apart from the default plans
+        version = config_version()
+        if DEFAULT_CONTEXT_MODE != "full":
+            version += f"+{DEFAULT_CONTEXT_MODE}"
+        if DEFAULT_REFINE_MODE != "rewrite":
+            version += f"+{DEFAULT_REFINE_MODE}"
+        cache_key = PlanCache.make_key(inputs, version)
+        if not bypass_cache:
+            cached = await asyncio.get_running_loop().run_in_executor(None, plan_cache.get, cache_key)
+            if cached is not None:
+                print("Returning business plan from cache.")
+                plan_span.set_attribute("cached", True)
+                return BusinessPlanResponse(**cached, cached=True)
+        plan_span.set_attribute("cached", False)
+        return await _generate_business_plan(inputs, cache_key, bypass_cache)
+
+async def _generate_business_plan(inputs: dict, cache_key: str, bypass_cache: bool) -> BusinessPlanResponse:
+    """Runs the BusinessPlanFlow and stores the response in the plan cache and the plan archive."""
+    # The initial state for your crewai flow
+    # Pass the collected API keys from the request into the flow's user_inputs
+    initial_state = BusinessPlanState(user_inputs=inputs, bypass_cache=bypass_cache)
+
+    # Instantiate the flow
+    flow = BusinessPlanFlow()
+
+    # Asynchronously run the crewai flow
+    started = time.perf_counter()
+    await flow.kickoff_async(initial_state.model_dump())
+    generation_seconds = time.perf_counter() - started
+
+    # Read the result from the flow state; kickoff_async returns the output of the last method,
+    # which newer crewai versions wrap in a StateProxy. The state (or its proxy) dumps to a dict.
+    state_dict = flow.state.model_dump()
+
+    # Ensure the final business plan is a string
+    bp_value = state_dict.get("business_plan")
+    if isinstance(bp_value, dict) and "raw" in bp_value: # Adjust based on actual output format if needed
+        state_dict["business_plan"] = bp_value["raw"]
+
+    final_state = BusinessPlanState(**state_dict)
+    response = BusinessPlanResponse(
+        business_plan=final_state.business_plan,
+        reused_sections=final_state.reused_sections,
+        regenerated_sections=final_state.regenerated_sections,
+        config_version=final_state.config_version,
+    )
+    # The archive and the cache write to disk; keep that off the event loop.
+    # A failing archive write must not cost the user the plan
+    loop = asyncio.get_running_loop()
+    try:
+        response.plan_id = await loop.run_in_executor(
+            None, plan_archive.record, inputs, final_state.business_plan, final_state.config_version,
+            generation_seconds, final_state.section_outputs, final_state.task_usage,
+        )
+    except Exception as e:
+        print(f"Could not archive the business plan: {e}")
+    await loop.run_in_executor(None, plan_cache.put, cache_key, response.model_dump(exclude={"cached"}))
+    return response
 
 # --- MAIN API ENDPOINT ---
 @app.post("/generate_business_plan", response_model=BusinessPlanResponse)
 async def generate_business_plan(request: BusinessPlanRequest):
     """
     This endpoint receives user inputs and kicks off the AI crew to generate a business plan.
+    It blocks until the plan is ready; prefer the /jobs endpoints for long runs.
     """
     try:
         print("Received request to generate business plan.")
         inputs = collect_business_plan_inputs(request)
-
-        # The initial state for your crewai flow
-        # Pass the collected API keys from the request into the flow's user_inputs
-        initial_state = BusinessPlanState(user_inputs=inputs)
-
-        # Instantiate the flow
-        flow = BusinessPlanFlow()
-
-        # Asynchronously run the crewai flow
-        # Ensure the kickoff method of your flow (or crew.run) can accept these inputs
-        # The main.py will be updated next to handle passing these to GeneratePlanCrew
-        state_result = await flow.kickoff_async(initial_state.model_dump())
-
-        # Process the result from the flow
-        if isinstance(state_result, BaseModel):
-            state_dict = state_result.model_dump()
-        elif isinstance(state_result, dict):
-            state_dict = state_result
-        else:
-            print(f"Unexpected result type: {type(state_result)}")
-            raise ValueError("Flow result is not a dict or Pydantic model")
-
-        # Ensure the final business plan is a string
-        bp_value = state_dict.get("business_plan")
-        if isinstance(bp_value, dict) and "raw" in bp_value: # Adjust based on actual output format if needed
-            state_dict["business_plan"] = bp_value["raw"]
-
-        final_state = BusinessPlanState(**state_dict)
+        response = await run_business_plan_flow(inputs, bypass_cache=request.bypass_cache)
 
         print("Business plan generation complete.")
-        return BusinessPlanResponse(business_plan=final_state.business_plan)
+        return response
 
     except Exception as e:
         # Log the full error for debugging
@@ -265,3 +260,197 @@ async def generate_business_plan(request: BusinessPlanRequest):
         print(traceback.format_exc())
         # Return a meaningful error to the frontend
         raise HTTPException(status_code=500, detail=f"An internal error occurred: {str(e)}")
+
+# --- JOB API ENDPOINTS ---
+# Long runs are submitted as jobs: the client gets a job id right away and polls
+# for the status, so no HTTP connection is held open while the crew is working.
+async def _run_job(job_id: str, inputs: dict, bypass_cache: bool):
+    """Runs the flow for a submitted job and records the outcome in the job store."""
+    job_store.mark_running(job_id)
+    try:
+        with span("job", job_id=job_id):
+            response = await run_business_plan_flow(inputs, bypass_cache=bypass_cache)
+        job_store.mark_succeeded(job_id, response.model_dump())
+        print(f"Job {job_id} complete.")
+    except Exception as e:
+        print(f"Job {job_id} failed: {e}")
+        print(traceback.format_exc())
+        job_store.mark_failed(job_id, f"An internal error occurred: {str(e)}")
+    finally:
+        _running_jobs.pop(job_id, None)
+
+@app.post("/jobs", response_model=JobSubmissionResponse, status_code=202)
+async def submit_business_plan_job(request: BusinessPlanRequest):
+    """
+    Submits a business plan generation job and returns its id immediately.
+    """
+    inputs = collect_business_plan_inputs(request)
+    job = job_store.create()
+    # Keep a reference to the task so it is not garbage collected while running
+    _running_jobs[job.job_id] = asyncio.create_task(_run_job(job.job_id, inputs, request.bypass_cache))
+    print(f"Submitted job {job.job_id}.")
+    return JobSubmissionResponse(job_id=job.job_id, status=job.status)
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+def get_job_status(job_id: str):
+    """
+    Returns the current status of a job.
+    """
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job id: {job_id}")
+    return JobStatusResponse(
+        job_id=job.job_id,
+        status=job.status,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        error=job.error,
+    )
+
+def _finished_job_result(job_id: str) -> dict:
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job id: {job_id}")
+    if job.status == JOB_FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != JOB_SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is not finished yet (status: {job.status}).")
+    return job.result
+
+@app.get("/jobs/{job_id}/result", response_model=BusinessPlanResponse)
+def get_job_result(job_id: str):
+    """
+    Returns the generated business plan of a finished job.
+    """
+    return BusinessPlanResponse(**_finished_job_result(job_id))
+
+# --- EXPORT ENDPOINTS ---
+# Plans are rendered in a pool of worker processes. The output is cached by the content hash of
+# the markdown, so repeated downloads of the same plan are served without rendering again.
+async def _export_response(markdown: str, export_format: str) -> Response:
+    try:
+        result = await plan_exporter.export(markdown, export_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExportUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    return Response(
+        content=result.content,
+        media_type=result.media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="business_plan.{export_format}"',
+            "ETag": f'"{result.content_hash}"',
+            "X-Export-Cache": "hit" if result.cached else "miss",
+            "X-Render-Seconds": f"{result.render_seconds:.3f}",
+        },
+    )
+
+@app.post("/export")
+async def export_business_plan(request: ExportRequest, format: str = Query("pdf", description="html or pdf")):
+    """
+    Renders a business plan given as markdown to PDF or HTML.
+    """
+    return await _export_response(request.markdown, format)
+
+@app.get("/jobs/{job_id}/export")
+async def export_job_result(job_id: str, format: str = Query("pdf", description="html or pdf")):
+    """
+    Renders the business plan of a finished job to PDF or HTML.
+    """
+    return await _export_response(_finished_job_result(job_id)["business_plan"], format)
+
+# --- PLAN ARCHIVE ENDPOINTS ---
+# Every generated plan is kept in the SQLite plan archive, so a plan can be fetched again later
+# without regenerating it. Listing only reads the indexed summary columns.
+@app.get("/plans", response_model=List[ArchivedPlanSummary])
+def list_archived_plans(
+    business_name: Optional[str] = None,
+    sector: Optional[str] = None,
+    country: Optional[str] = None,
+    inputs_hash: Optional[str] = None,
+    since: Optional[float] = Query(None, description="Only plans created at or after this Unix time"),
+    until: Optional[float] = Query(None, description="Only plans created before this Unix time"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Lists the archived plans matching the filters, newest first. Name, sector and country
+    match exactly, ignoring case.
+    """
+    return plan_archive.list_plans(
+        business_name=business_name, business_sector=sector, country=country, inputs_hash=inputs_hash,
+        since=since, until=until, limit=limit, offset=offset,
+    )
+
+def _archived_plan(plan_id: str, include_sections: bool = True) -> ArchivedPlan:
+    plan = plan_archive.get(plan_id, include_sections=include_sections)
+    if plan is None:
+        raise HTTPException(status_code=404, detail=f"Unknown plan id: {plan_id}")
+    return plan
+
+@app.get("/plans/{plan_id}", response_model=ArchivedPlan)
+def get_archived_plan(plan_id: str, sections: bool = Query(True, description="Include the task outputs")):
+    """
+    Returns an archived plan, with the text, model and timings of every task output.
+    """
+    return _archived_plan(plan_id, include_sections=sections)
+
+@app.get("/plans/{plan_id}/export")
+async def export_archived_plan(plan_id: str, format: str = Query("pdf", description="html or pdf")):
+    """
+    Renders an archived business plan to PDF or HTML.
+    """
+    return await _export_response(_archived_plan(plan_id, include_sections=False).business_plan, format)
+
+# --- BATCH ENDPOINT ---
+# Generates plans for a whole cohort in one request. Plans run with bounded concurrency and
+# every finished plan is streamed right away as one NDJSON line, in completion order.
+async def _run_batch_item(index: int, request: BusinessPlanRequest, semaphore: asyncio.Semaphore,
+                          running: set) -> BatchItemResult:
+    submitted = time.perf_counter()
+    async with semaphore:
+        running.add(index)
+        started = time.perf_counter()
+        try:
+            with span("batch_item", index=index):
+                inputs = collect_business_plan_inputs(request)
+                response = await run_business_plan_flow(inputs, bypass_cache=request.bypass_cache)
+            item = BatchItemResult(index=index, status=JOB_SUCCEEDED, result=response)
+        except Exception as e:
+            print(f"Batch item {index} failed: {e}")
+            print(traceback.format_exc())
+            item = BatchItemResult(index=index, status=JOB_FAILED, error=f"An internal error occurred: {str(e)}")
+    item.queued_seconds = started - submitted
+    item.duration_seconds = time.perf_counter() - started
+    return item
+
+@app.post("/batch")
+async def generate_business_plan_batch(
+    requests: List[BusinessPlanRequest],
+    concurrency: Optional[int] = Query(None, ge=1, description="Plans generated at the same time"),
+):
+    """
+    Generates a business plan for every payload in the list and streams the outcomes as
+    NDJSON (one BatchItemResult per line) as soon as each plan is finished.
+    """
+    limit = min(concurrency or BATCH_DEFAULT_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    print(f"Received batch of {len(requests)} business plans (concurrency {limit}).")
+
+    async def stream_results():
+        semaphore = asyncio.Semaphore(limit)
+        # Indexes of the items that got a slot
+        running = set()
+        tasks = [asyncio.create_task(_run_batch_item(i, request, semaphore, running))
+                 for i, request in enumerate(requests)]
+        try:
+            for next_finished in asyncio.as_completed(tasks):
+                item = await next_finished
+                yield item.model_dump_json() + "\n"
+        finally:
+            # The client went away: don't start the plans that are still waiting for a slot.
+            # Plans already running finish, so their result still reaches the plan cache and the archive.
+            for i, task in enumerate(tasks):
+                if i not in running:
+                    task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
@@ -0,0 +1,123 @@
+# --- START OF FILE benchmarks/bench_graph_construction.py ---
+"""
+Microbenchmark of the per-request agent/task graph construction.
+
+"before" reproduces the previous per-request work: parse agents.yaml and tasks.yaml,
+build every agent, and build every task through factories that rebuild their upstream
+tasks for each context list, then let crewai interpolate the inputs.
+"after" binds the shared PlanGraphTemplate of the active config version to a request.
+
+No LLM is called. The agents get the same FakeLLM objects bench_overhead injects, so
+construction is measured without a provider SDK.
+
+Usage:
+    python -m benchmarks.bench_graph_construction [--iterations 200]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import yaml
+from crewai import Agent, Task
+
+from benchmarks.fakes import FakeLLM
+from src.config import AGENTS_CONFIG_PATH, TASKS_CONFIG_PATH, get_plan_config
+from src.plan_graph import TOOL_FACTORIES, get_graph_template
+from src.schemas import QUESTIONNAIRE_FIELDS
+
+SAMPLE_INPUTS = {field: f"sample {field}" for field in QUESTIONNAIRE_FIELDS}
+
+
+def build_before(llms: dict) -> int:
+    """Builds the graph the way every request used to. Returns the number of Task constructions."""
+    with open(AGENTS_CONFIG_PATH, "r", encoding="utf-8") as fh:
+        agents_raw = yaml.safe_load(fh)
+    with open(TASKS_CONFIG_PATH, "r", encoding="utf-8") as fh:
+        tasks_raw = yaml.safe_load(fh)
+
+    agents = {
+        name: Agent(
+            role=raw["role"], goal=raw["goal"], backstory=raw["backstory"],
+            tools=[TOOL_FACTORIES[tool]() for tool in raw.get("tools") or []],
+            llm=llms[raw["provider"]], verbose=True,
+        )
+        for name, raw in agents_raw.items()
+    }
+
+    # The old factories passed every earlier section as context, rebuilding each of them
+    agent_tasks = [name for name, raw in tasks_raw.items() if not raw.get("local")]
+    sections = [name for name in agent_tasks if tasks_raw[name].get("section_title")]
+    constructed = 0
+
+    def build(name: str) -> Task:
+        nonlocal constructed
+        raw = tasks_raw[name]
+        upstream = sections[:sections.index(name)] if name in sections else [
+            dep for dep in raw.get("depends_on") or [] if dep in agent_tasks
+        ]
+        context = [build(dep) for dep in upstream]
+        constructed += 1
+        return Task(description=raw["description"], expected_output=raw["expected_output"],
+                    agent=agents[raw["agent"]], context=context)
+
+    for name in agent_tasks:
+        task = build(name)
+        task.interpolate_inputs_and_add_conversation_history(SAMPLE_INPUTS)
+        task.agent.interpolate_inputs(SAMPLE_INPUTS)
+    return constructed
+
+
+def build_after(llms: dict) -> int:
+    """Binds the shared graph template to a request. Returns the number of Task constructions."""
+    template = get_graph_template(get_plan_config())
+    bound = template.bind(lambda task: llms[template.agents[template.tasks[task].agent].provider], SAMPLE_INPUTS)
+    for name in template.tasks:
+        bound.task(name)
+    return len(template.tasks)
+
+
+def measure(build, llms: dict, iterations: int) -> dict:
+    tasks_constructed = build(llms)  # warm-up, also builds the template once
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build(llms)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    snapshot_before = tracemalloc.take_snapshot()
+    build(llms)
+    snapshot_after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = [stat for stat in snapshot_after.compare_to(snapshot_before, "filename") if stat.size_diff > 0]
+
+    return {
+        "ms_per_request": elapsed / iterations * 1000,
+        "tasks_constructed": tasks_constructed,
+        "peak_kib": peak / 1024,
+        "retained_blocks": sum(stat.count_diff for stat in allocated),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    llms = {provider: FakeLLM(model=f"fake/{provider}") for provider in ("gemini", "groq")}
+    results = {"before": measure(build_before, llms, args.iterations),
+               "after": measure(build_after, llms, args.iterations)}
+
+    print(f"{'':8}{'ms/request':>12}{'tasks built':>13}{'peak KiB':>11}{'retained blocks':>17}")
+    for label, result in results.items():
+        print(f"{label:8}{result['ms_per_request']:12.2f}{result['tasks_constructed']:13d}"
+              f"{result['peak_kib']:11.1f}{result['retained_blocks']:17d}")
+
+
+if __name__ == "__main__":
+    main()
+
+# --- END OF FILE benchmarks/bench_graph_construction.py ---
@@ -0,0 +1,186 @@
+# --- START OF FILE benchmarks/bench_model_tiers.py ---
+"""
+Latency and token cost per model tier, per agent task.
+
+Generates the plans of a questionnaire file with the model settings configured in
+agents.yaml/tasks.yaml ("configured") and with every tier given on the command line.
+The file has one BusinessPlanRequest payload per line, optionally with an "id", like the
+input of the batch CLI (src/batch.py). A tier replaces the model settings of all agent tasks
+of its model's provider, so the per-task numbers show where a faster model saves time and
+money; the generated plans are written next to the results to judge whether the quality holds.
+
+Tiers are given as NAME=MODEL or NAME=JSON settings (model, reasoning_effort,
+temperature, max_tokens); a null value drops the configured setting, e.g.
+    --tier flash=gemini/gemini-2.5-flash
+    --tier 'flash-low={"model": "gemini/gemini-2.5-flash", "reasoning_effort": "low"}'
+
+Run once with --refine-mode rewrite and once with --refine-mode patch to compare the
+output tokens and wall time of refine_plan in both refine modes.
+
+The providers are called for real (GEMINI_API_KEY and GROQ_API_KEY), unless
+LLM_CASSETTE_MODE=replay serves the calls from a recording. Caches are not used.
+
+Usage:
+    python -m benchmarks.bench_model_tiers questionnaires.jsonl --tier NAME=MODEL [--tier ...] [--runs 1]
+                                           [--refine-mode patch] [--output data/benchmarks/model_tiers.json]
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+from benchmarks.bench_overhead import git_commit, summarize
+
+CONFIGURED_TIER = "configured"
+USAGE_FIELDS = ("seconds", "llm_calls", "prompt_tokens", "completion_tokens", "cost_usd")
+
+
+def parse_tier(value: str) -> Tuple[str, str, dict]:
+    """Parses NAME=MODEL or NAME=JSON into (name, provider, settings)."""
+    name, sep, spec = value.partition("=")
+    if not sep or not name or not spec:
+        raise argparse.ArgumentTypeError(f"Expected NAME=MODEL or NAME=JSON, got '{value}'.")
+    settings = json.loads(spec) if spec.lstrip().startswith("{") else {"model": spec}
+    model = settings.get("model")
+    if not isinstance(model, str) or "/" not in model:
+        raise argparse.ArgumentTypeError(f"Tier '{name}' needs a provider/model name, e.g. gemini/gemini-2.5-flash.")
+    return name, model.split("/", 1)[0], settings
+
+
+def load_inputs(path: str) -> List[Tuple[str, dict]]:
+    """Reads the questionnaires and validates them like the API does; returns (id, crew inputs) pairs."""
+    from src.batch import load_questionnaires
+    from src.plan_cache import SECRET_INPUT_KEYS
+    from src.schemas import BusinessPlanRequest, collect_business_plan_inputs
+
+    questionnaires = []
+    for item_id, payload in load_questionnaires(path):
+        payload.setdefault("gemini_api_key", os.getenv("GEMINI_API_KEY", ""))
+        payload.setdefault("groq_api_key", os.getenv("GROQ_API_KEY", ""))
+        inputs = collect_business_plan_inputs(BusinessPlanRequest(**payload))
+        # The crew gets the API keys through its constructor, like in the BusinessPlanFlow
+        questionnaires.append((item_id, {k: v for k, v in inputs.items() if k not in SECRET_INPUT_KEYS}))
+    return questionnaires
+
+
+def run_tier(questionnaires: List[Tuple[str, dict]], overrides: Dict[str, dict], runs: int,
+             refine_mode: str) -> Tuple[List[dict], Dict[str, str]]:
+    """
+    Generates the plan of every questionnaire `runs` times.
+
+    Returns:
+        tuple: (the task usage and wall time of every run, the last plan of every questionnaire)
+    """
+    from src.generate_plan_crew import GeneratePlanCrew
+
+    results, business_plans = [], {}
+    for item_id, inputs in questionnaires:
+        for _ in range(runs):
+            crew = GeneratePlanCrew(
+                gemini_api_key=os.getenv("GEMINI_API_KEY", ""),
+                groq_api_key=os.getenv("GROQ_API_KEY", ""),
+                llm_settings_overrides=overrides,
+                refine_mode=refine_mode,
+            )
+            start = time.perf_counter()
+            result = crew.run(inputs)
+            results.append({"questionnaire": item_id, "wall_seconds": time.perf_counter() - start,
+                            "task_usage": result.task_usage})
+            business_plans[item_id] = result.business_plan
+    return results, business_plans
+
+
+def tier_summary(runs: List[dict]) -> dict:
+    """Wall time percentiles of the plan, and the mean usage of every task and of the whole plan."""
+    tasks: Dict[str, Dict] = {}
+    for run in runs:
+        for task, usage in run["task_usage"].items():
+            entry = tasks.setdefault(task, {"model": usage["model"], **{field: 0.0 for field in USAGE_FIELDS}})
+            for field in USAGE_FIELDS:
+                entry[field] += usage[field] / len(runs)
+    return {
+        "wall_seconds": summarize([run["wall_seconds"] for run in runs]),
+        "tasks": tasks,
+        "total": {field: sum(task[field] for task in tasks.values()) for field in USAGE_FIELDS},
+    }
+
+
+def print_report(tiers: Dict[str, dict]):
+    print(f"{'tier':<14} {'task':<26} {'model':<38} {'seconds':>8} {'calls':>6} "
+          f"{'prompt tok':>10} {'compl. tok':>10} {'cost USD':>9}")
+    for name, summary in tiers.items():
+        rows = list(summary["tasks"].items()) + [("(all tasks)", dict(summary["total"], model=""))]
+        for task, usage in rows:
+            print(f"{name:<14} {task:<26} {usage['model']:<38} {usage['seconds']:8.1f} {usage['llm_calls']:6.1f} "
+                  f"{usage['prompt_tokens']:10.0f} {usage['completion_tokens']:10.0f} {usage['cost_usd']:9.4f}")
+        print(f"{name:<14} plan wall time p50 {summary['wall_seconds']['p50']:.1f}s, "
+              f"max {summary['wall_seconds']['max']:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("questionnaires", help="JSONL file with one BusinessPlanRequest payload per line")
+    parser.add_argument("--tier", action="append", default=[], type=parse_tier,
+                        help="NAME=MODEL or NAME=JSON model settings; repeatable")
+    parser.add_argument("--runs", type=int, default=1, help="Plans generated per questionnaire and tier")
+    parser.add_argument("--refine-mode", choices=("rewrite", "patch"), default="rewrite",
+                        help="How refine_plan applies the evaluator feedback")
+    parser.add_argument("--skip-configured", action="store_true",
+                        help="Do not run the settings from agents.yaml/tasks.yaml as a baseline tier")
+    parser.add_argument("--output", default="data/benchmarks/model_tiers.json", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    load_dotenv()
+    from src.config import get_plan_config
+
+    questionnaires = load_inputs(args.questionnaires)
+    if not questionnaires:
+        parser.error(f"No questionnaires in {args.questionnaires}.")
+    tiers = [] if args.skip_configured else [(CONFIGURED_TIER, None, {})]
+    tiers += args.tier
+    if not tiers:
+        parser.error("Nothing to run: give at least one --tier or drop --skip-configured.")
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    summaries = {}
+    for name, provider, settings in tiers:
+        print(f"Running tier '{name}' ({settings or 'settings from agents.yaml/tasks.yaml'}), "
+              f"{len(questionnaires)} questionnaire(s), {args.runs} run(s) each...")
+        runs, business_plans = run_tier(questionnaires, {provider: settings} if provider else {},
+                                        max(args.runs, 1), args.refine_mode)
+        summaries[name] = dict(tier_summary(runs), settings=settings)
+        for item_id, business_plan in business_plans.items():
+            plan_path = os.path.join(directory or ".", f"model_tier_{name}_{item_id}.md")
+            with open(plan_path, "w", encoding="utf-8") as fh:
+                fh.write(business_plan)
+
+    result = {
+        "benchmark": "model_tiers",
+        "timestamp": time.time(),
+        "git_commit": git_commit(),
+        "config_version": get_plan_config().version,
+        "params": {
+            "questionnaires": args.questionnaires,
+            "questionnaire_ids": [item_id for item_id, _ in questionnaires],
+            "runs": args.runs,
+            "refine_mode": args.refine_mode,
+        },
+        "tiers": summaries,
+    }
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2)
+
+    print_report(summaries)
+    print(f"Results written to {args.output}, plans to model_tier_<tier>_<questionnaire id>.md next to it")
+
+
+if __name__ == "__main__":
+    main()
+
+# --- END OF FILE benchmarks/bench_model_tiers.py ---
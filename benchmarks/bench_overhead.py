@@ -0,0 +1,201 @@
+# --- START OF FILE benchmarks/bench_overhead.py ---
+"""
+End-to-end orchestration overhead of one business plan generation.
+
+Runs the same path as the API (BusinessPlanRequest validation, collect_business_plan_inputs,
+the plan cache lookup, BusinessPlanFlow, GeneratePlanCrew and every crewai task) with all
+LLM providers replaced by a FakeLLM with a fixed latency and a fixed-size answer.
+Overhead is the wall time of a plan minus the critical path of the fake LLM latencies,
+i.e. the time the plan would take if our own code and crewai cost nothing.
+
+Caches are bypassed, and all data files go to a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_overhead [--plans 20] [--latency 0.05] [--output-chars 4000]
+                                        [--output data/benchmarks/overhead.json] [--baseline old.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Linearly interpolated percentile, p in [0, 100]."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": sum(values) / len(values) if values else 0.0,
+        "min": min(values, default=0.0),
+        "max": max(values, default=0.0),
+    }
+
+
+def peak_rss_kib() -> int:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def isolate_environment(directory: str):
+    """Points every data file to a temporary directory and lifts the provider concurrency limits."""
+    os.environ["JOB_STORE_PATH"] = os.path.join(directory, "jobs.sqlite3")
+    os.environ["PLAN_CACHE_DIR"] = os.path.join(directory, "plan_cache")
+    os.environ["SECTION_CACHE_DIR"] = os.path.join(directory, "section_cache")
+    os.environ["TRACE_EXPORT_PATH"] = os.path.join(directory, "traces.jsonl")
+    os.environ["PLAN_ARCHIVE_PATH"] = os.path.join(directory, "plan_archive.sqlite3")
+    os.environ["EXPORT_CACHE_DIR"] = os.path.join(directory, "export_cache")
+    # The critical path assumes every ready task can start at once
+    os.environ["GEMINI_MAX_CONCURRENCY"] = "64"
+    os.environ["GROQ_MAX_CONCURRENCY"] = "64"
+
+
+async def run_plans(count: int, request_data: dict) -> List[float]:
+    """Generates `count` plans one after the other and returns their wall times."""
+    from backend import run_business_plan_flow
+    from src.schemas import BusinessPlanRequest, collect_business_plan_inputs
+
+    wall_times = []
+    for _ in range(count):
+        start = time.perf_counter()
+        request = BusinessPlanRequest(**request_data)
+        inputs = collect_business_plan_inputs(request)
+        await run_business_plan_flow(inputs, bypass_cache=True)
+        wall_times.append(time.perf_counter() - start)
+    return wall_times
+
+
+def measure_allocations(count: int, request_data: dict) -> Dict[str, float]:
+    """Traces Python allocations of `count` plans; returns the mean peak and retained KiB per plan."""
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(count):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            asyncio.run(run_plans(1, request_data))
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append((peak - before) / 1024)
+            retained.append((current - before) / 1024)
+    finally:
+        tracemalloc.stop()
+    return {"peak_kib_mean": sum(peaks) / len(peaks), "retained_kib_mean": sum(retained) / len(retained)}
+
+
+def compare(result: dict, baseline: dict):
+    print(f"\nChange against baseline ({baseline.get('git_commit') or 'unknown commit'}):")
+    rows = [
+        ("overhead p50", result["overhead_seconds"]["p50"], baseline["overhead_seconds"]["p50"]),
+        ("overhead p95", result["overhead_seconds"]["p95"], baseline["overhead_seconds"]["p95"]),
+        ("overhead p99", result["overhead_seconds"]["p99"], baseline["overhead_seconds"]["p99"]),
+        ("peak KiB/plan", result["allocations"]["peak_kib_mean"], baseline["allocations"]["peak_kib_mean"]),
+        ("peak RSS KiB", result["peak_rss_kib"], baseline["peak_rss_kib"]),
+    ]
+    for label, new, old in rows:
+        change = (new - old) / old * 100 if old else 0.0
+        print(f"  {label:<14} {old:12.4f} -> {new:12.4f}  ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plans", type=int, default=20, help="Number of timed plans")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed plans run first")
+    parser.add_argument("--alloc-plans", type=int, default=3, help="Plans run under tracemalloc")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM latency per call, in seconds")
+    parser.add_argument("--output-chars", type=int, default=4000, help="Size of every fake LLM answer")
+    parser.add_argument("--output", default="data/benchmarks/overhead.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    isolate_environment(tempfile.mkdtemp(prefix="bench_overhead_"))
+
+    from benchmarks.fakes import FakeLLM, sample_request_data
+    from src import main as flow_module
+    from src.config import get_plan_config
+
+    fakes = {
+        provider: FakeLLM(model=f"fake/{provider}", latency=args.latency, output_chars=args.output_chars)
+        for provider in ("gemini", "groq")
+    }
+    flow_module.LLM_OVERRIDES.update(fakes)
+    request_data = sample_request_data(gemini_api_key="fake", groq_api_key="fake")
+
+    plan_config = get_plan_config()
+    critical_path = plan_config.graph.critical_path_length(
+        {name: 0.0 if spec.local else args.latency for name, spec in plan_config.tasks.items()}
+    )
+
+    asyncio.run(run_plans(args.warmup, request_data))
+    calls_before = sum(fake.calls for fake in fakes.values())
+    wall_times = asyncio.run(run_plans(args.plans, request_data))
+    llm_calls = sum(fake.calls for fake in fakes.values()) - calls_before
+    allocations = measure_allocations(args.alloc_plans, request_data)
+
+    result = {
+        "benchmark": "overhead",
+        "timestamp": time.time(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config_version": plan_config.version,
+        "params": {"plans": args.plans, "warmup": args.warmup, "latency": args.latency,
+                   "output_chars": args.output_chars},
+        "llm_calls_per_plan": llm_calls / args.plans,
+        "critical_path_seconds": critical_path,
+        "wall_seconds": summarize(wall_times),
+        "overhead_seconds": summarize([wall - critical_path for wall in wall_times]),
+        "allocations": allocations,
+        "peak_rss_kib": peak_rss_kib(),
+    }
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(result, fh, indent=2)
+
+    overhead = result["overhead_seconds"]
+    print(f"{args.plans} plans, {result['llm_calls_per_plan']:.1f} LLM calls per plan, "
+          f"critical path {critical_path:.3f}s")
+    print(f"overhead per plan: p50 {overhead['p50']:.4f}s  p95 {overhead['p95']:.4f}s  p99 {overhead['p99']:.4f}s")
+    print(f"allocations per plan: peak {allocations['peak_kib_mean']:.0f} KiB, "
+          f"retained {allocations['retained_kib_mean']:.0f} KiB; peak RSS {result['peak_rss_kib']} KiB")
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            compare(result, json.load(fh))
+
+
+if __name__ == "__main__":
+    main()
+
+# --- END OF FILE benchmarks/bench_overhead.py ---
@@ -0,0 +1,76 @@
+# --- START OF FILE benchmarks/fakes.py ---
+"""
+Deterministic stand-ins for the LLM providers and the questionnaire, shared by the benchmarks.
+"""
+
+import threading
+import time
+import typing
+
+from crewai.llms.base_llm import BaseLLM
+
+from src.length_limits import parse_length_limits
+from src.schemas import BusinessPlanRequest
+
+
+class FakeLLM(BaseLLM):
+    """
+    LLM that answers every call after a fixed latency with a fixed-size markdown text.
+
+    Prompts asking for "between X and Y characters" get an answer of the midpoint length,
+    as from a model that follows the instruction. Agent prompts are answered with a crewai
+    final answer, so every agent task finishes with exactly one call.
+    """
+
+    def __init__(self, model: str = "fake/fake-llm", latency: float = 0.0, output_chars: int = 4000):
+        super().__init__(model=model, temperature=0.0)
+        self.latency = latency
+        self.output_chars = output_chars
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _body(chars: int) -> str:
+        paragraph = "The company grew revenue by 12% in 2024 while expanding to two new markets. "
+        return ("## Overview\n\n" + paragraph * (chars // len(paragraph) + 1))[:chars]
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = messages if isinstance(messages, str) else " ".join(str(m.get("content") or "") for m in messages)
+        limits = parse_length_limits(prompt)
+        body = self._body((limits[0] + limits[1]) // 2 if limits else self.output_chars)
+        if "Final Answer" not in prompt:
+            return body
+        return "Thought: I now know the final answer\nFinal Answer: " + body
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 1_000_000
+
+
+def sample_request_data(**overrides) -> dict:
+    """Returns a complete, valid BusinessPlanRequest payload with placeholder answers."""
+    data = {}
+    for name, field in BusinessPlanRequest.model_fields.items():
+        annotation = field.annotation
+        # Optional[List[str]] -> List[str]
+        if typing.get_origin(annotation) is typing.Union:
+            annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+        if typing.get_origin(annotation) in (list, typing.List):
+            data[name] = [f"sample {name} 1", f"sample {name} 2"]
+        elif annotation is bool:
+            data[name] = False
+        else:
+            data[name] = f"sample {name}"
+    data.update(overrides)
+    return data
+
+# --- END OF FILE benchmarks/fakes.py ---
@@ -1264,6 +1264,20 @@ if st.button("Generate Business Plan"):
                     file_name="generated_business_plan.md",
                     mime="text/markdown"
                 )
+
+                # PDF rendered by the backend; cached there by the content of the plan
+                pdf_response = requests.post(
+                    "http://localhost:8000/export",
+                    params={"format": "pdf"},
+                    json={"markdown": business_plan_markdown}
+                )
+                if pdf_response.status_code == 200:
+                    st.download_button(
+                        label="Download Business Plan (PDF)",
+                        data=pdf_response.content,
+                        file_name="generated_business_plan.pdf",
+                        mime="application/pdf"
+                    )
             else:
                 st.error(f"Error: {response.text}")
         except Exception as e:
@@ -0,0 +1,270 @@
+# --- START OF FILE src/batch.py ---
+"""
+Offline batch generation of business plans from a JSONL file of questionnaires.
+
+Every line is a BusinessPlanRequest payload, optionally with an "id"; lines without an id
+are identified by a hash of their answers. API keys missing from a line are taken from the
+GEMINI_API_KEY and GROQ_API_KEY environment variables.
+
+Plans are written to <output-dir>/<id>.md and the state of every item is kept in
+<output-dir>/manifest.json. Restarting after a crash or Ctrl-C skips finished items and
+retries failed and interrupted ones. Failed attempts are limited by --max-attempts per item;
+interrupted attempts do not count. Ctrl-C exits right away, abandoning the running plans.
+
+Every generated plan is also stored in the plan archive (PLAN_ARCHIVE_PATH), like the plans
+generated through the API, and its archive id is kept in the manifest.
+
+With --export, every finished plan is also rendered to <output-dir>/<id>.pdf and/or .html.
+Renders are cached by the content hash of the plan, so re-exporting is cheap.
+
+Usage:
+    python -m src.batch questionnaires.jsonl --output-dir data/batch [--workers 2] [--max-attempts 3]
+                        [--export pdf,html]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from .export import EXPORT_FORMATS, PlanExporter, default_exporter
+from .main import BusinessPlanFlow, BusinessPlanState, shutdown_crew_executor
+from .plan_archive import PlanArchive, default_archive
+from .plan_cache import PlanCache
+from .schemas import BusinessPlanRequest, collect_business_plan_inputs
+
+ITEM_PENDING = "pending"
+ITEM_RUNNING = "running"
+ITEM_SUCCEEDED = "succeeded"
+ITEM_FAILED = "failed"
+
+SAFE_ID_PATTERN = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class BatchManifest:
+    """
+    Per-item state of a batch run, saved as JSON after every change.
+    Writes go to a temporary file that replaces the manifest, so a crash never leaves it half-written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.items: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as fh:
+                self.items = json.load(fh).get("items", {})
+
+    def get(self, item_id: str) -> Dict:
+        return self.items.setdefault(item_id, {"status": ITEM_PENDING, "attempts": 0})
+
+    def update(self, item_id: str, **fields):
+        self.get(item_id).update(fields)
+        self.save()
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({"items": self.items}, fh, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def succeeded_since(self, since: float) -> int:
+        """Number of items that succeeded at or after the Unix time `since`."""
+        return sum(1 for item in self.items.values()
+                   if item["status"] == ITEM_SUCCEEDED and item.get("finished_at", 0) >= since)
+
+    def counts(self) -> Dict[str, int]:
+        counts = {ITEM_PENDING: 0, ITEM_RUNNING: 0, ITEM_SUCCEEDED: 0, ITEM_FAILED: 0}
+        for item in self.items.values():
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        return counts
+
+
+def load_questionnaires(path: str) -> List[Tuple[str, dict]]:
+    """Reads (item id, payload) pairs from a JSONL file."""
+    questionnaires = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for line_number, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                payload = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}") from e
+            item_id = payload.pop("id", None) or payload.pop("request_id", None)
+            if not item_id:
+                item_id = PlanCache.make_key(payload, "")[:16]
+            questionnaires.append((SAFE_ID_PATTERN.sub("_", str(item_id)), payload))
+    return questionnaires
+
+
+async def generate_plan(payload: dict, archive: Optional[PlanArchive] = None) -> Tuple[str, str]:
+    """
+    Validates one questionnaire, runs the BusinessPlanFlow for it and stores the plan in the archive.
+
+    Returns:
+        tuple: (the business plan, its archive id or "" without an archive)
+    """
+    payload = dict(payload)
+    payload.setdefault("gemini_api_key", os.getenv("GEMINI_API_KEY", ""))
+    payload.setdefault("groq_api_key", os.getenv("GROQ_API_KEY", ""))
+    request = BusinessPlanRequest(**payload)
+    inputs = collect_business_plan_inputs(request)
+    flow = BusinessPlanFlow()
+    started = time.perf_counter()
+    await flow.kickoff_async(BusinessPlanState(user_inputs=inputs, bypass_cache=request.bypass_cache).model_dump())
+    state = flow.state
+    if archive is None:
+        return state.business_plan, ""
+    # A failing archive write must not send the finished plan back for a retry
+    try:
+        plan_id = archive.record(inputs, state.business_plan, state.config_version, time.perf_counter() - started,
+                                 dict(state.section_outputs), dict(state.task_usage))
+    except Exception as e:
+        print(f"Could not archive the business plan: {e}")
+        plan_id = ""
+    return state.business_plan, plan_id
+
+
+async def run_batch(questionnaires: List[Tuple[str, dict]], output_dir: str, manifest: BatchManifest,
+                    workers: int, max_attempts: int, archive: Optional[PlanArchive] = None) -> int:
+    """Runs every unfinished questionnaire; returns the number of plans generated in this run."""
+    todo = []
+    for item_id, payload in questionnaires:
+        item = manifest.get(item_id)
+        finished = item["status"] == ITEM_SUCCEEDED and os.path.exists(item.get("output", ""))
+        if not finished and item["attempts"] < max_attempts:
+            todo.append((item_id, payload))
+    manifest.save()
+
+    total = len(todo)
+    print(f"{len(questionnaires)} questionnaires, {len(questionnaires) - total} finished or given up, {total} to run.")
+    semaphore = asyncio.Semaphore(workers)
+    started = time.perf_counter()
+    generated = 0
+
+    async def run_item(item_id: str, payload: dict):
+        nonlocal generated
+        async with semaphore:
+            # An attempt counts once it has finished, so attempts interrupted by Ctrl-C or a crash are not counted
+            attempt = manifest.get(item_id)["attempts"] + 1
+            manifest.update(item_id, status=ITEM_RUNNING, started_at=time.time(), error=None)
+            item_start = time.perf_counter()
+            try:
+                business_plan, plan_id = await generate_plan(payload, archive)
+                output_path = os.path.join(output_dir, f"{item_id}.md")
+                with open(output_path, "w", encoding="utf-8") as fh:
+                    fh.write(business_plan)
+            except Exception as e:
+                manifest.update(item_id, status=ITEM_FAILED, attempts=attempt, error=str(e), finished_at=time.time(),
+                                duration_seconds=time.perf_counter() - item_start)
+                print(f"[{item_id}] failed (attempt {attempt}/{max_attempts}): {e}")
+                return
+            generated += 1
+            manifest.update(item_id, status=ITEM_SUCCEEDED, attempts=attempt, output=output_path, plan_id=plan_id,
+                            finished_at=time.time(), duration_seconds=time.perf_counter() - item_start)
+            print(f"[{item_id}] done in {time.perf_counter() - item_start:.0f}s "
+                  f"({generated}/{total}, {throughput(generated, started):.1f} plans/hour)")
+
+    await asyncio.gather(*(run_item(item_id, payload) for item_id, payload in todo))
+    return generated
+
+
+async def export_plans(manifest: BatchManifest, output_dir: str, formats: List[str], exporter: PlanExporter) -> int:
+    """Renders every finished plan that lacks one of the export formats; returns the number of files written."""
+    written = 0
+    for item_id, item in manifest.items.items():
+        if item["status"] != ITEM_SUCCEEDED or not os.path.exists(item.get("output", "")):
+            continue
+        exports = dict(item.get("exports") or {})
+        missing = [fmt for fmt in formats if not os.path.exists(exports.get(fmt, ""))]
+        if not missing:
+            continue
+        with open(item["output"], "r", encoding="utf-8") as fh:
+            business_plan = fh.read()
+        for fmt in missing:
+            try:
+                result = await exporter.export(business_plan, fmt)
+            except Exception as e:
+                print(f"[{item_id}] {fmt} export failed: {e}")
+                continue
+            exports[fmt] = os.path.join(output_dir, f"{item_id}.{fmt}")
+            with open(exports[fmt], "wb") as fh:
+                fh.write(result.content)
+            written += 1
+            print(f"[{item_id}] {fmt} {'from cache' if result.cached else f'rendered in {result.render_seconds:.1f}s'}")
+        manifest.update(item_id, exports=exports)
+    return written
+
+
+def throughput(plans: int, started: float) -> float:
+    elapsed = time.perf_counter() - started
+    return plans / elapsed * 3600 if elapsed > 0 else 0.0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file with one BusinessPlanRequest payload per line")
+    parser.add_argument("--output-dir", default="data/batch", help="Where plans and the manifest are written")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="Plans generated at the same time, at most CREW_MAX_WORKERS (default 4)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per item across restarts")
+    parser.add_argument("--export", default="", help="Comma-separated export formats of the finished plans: pdf, html")
+    args = parser.parse_args(argv)
+    formats = [fmt.strip() for fmt in args.export.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown:
+        parser.error(f"Unknown export formats: {', '.join(unknown)}")
+
+    load_dotenv()
+    os.makedirs(args.output_dir, exist_ok=True)
+    questionnaires = load_questionnaires(args.input)
+    manifest = BatchManifest(os.path.join(args.output_dir, "manifest.json"))
+    archive = default_archive()
+    archive.purge()
+
+    started = time.perf_counter()
+    run_started_at = time.time()
+    interrupted = False
+    try:
+        asyncio.run(run_batch(questionnaires, args.output_dir, manifest, max(args.workers, 1),
+                              args.max_attempts, archive))
+        if formats:
+            exporter = default_exporter()
+            try:
+                exported = asyncio.run(export_plans(manifest, args.output_dir, formats, exporter))
+            finally:
+                exporter.shutdown()
+            print(f"Wrote {exported} export files.")
+    except KeyboardInterrupt:
+        # Items left "running" are retried on the next start
+        interrupted = True
+        print("Interrupted; restart the same command to continue.")
+    finally:
+        # Counted from the manifest, so plans finished before a Ctrl-C are included
+        generated = manifest.succeeded_since(run_started_at)
+        counts = manifest.counts()
+        print(f"Generated {generated} plans in {time.perf_counter() - started:.0f}s "
+              f"({throughput(generated, started):.1f} plans/hour). "
+              f"Manifest: {counts[ITEM_SUCCEEDED]} succeeded, {counts[ITEM_FAILED]} failed, "
+              f"{counts[ITEM_RUNNING]} interrupted, {counts[ITEM_PENDING]} pending.")
+    if interrupted:
+        # The manifest is saved after every change. Running crews cannot be cancelled, and their
+        # non-daemon worker threads would keep the process alive until they finish; exit now instead.
+        shutdown_crew_executor()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(130)
+    return 0 if counts[ITEM_FAILED] == 0 and counts[ITEM_RUNNING] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# --- END OF FILE src/batch.py ---
@@ -0,0 +1,94 @@
+# --- START OF FILE src/compaction.py ---
+
+import re
+from typing import List
+
+from .consolidation import FENCE_PATTERN, HEADING_PATTERN, _strip_outer_fence
+
+# How section outputs are passed to downstream agent tasks: verbatim, or as a compact digest
+CONTEXT_MODES = ("full", "digest")
+
+# Digest length cap per section, in characters
+DEFAULT_DIGEST_MAX_CHARS = 1500
+
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+# Numbers, amounts, percentages and years
+FIGURE_PATTERN = re.compile(r"\d")
+# A capitalized word that does not start the sentence, e.g. a company, product or place name
+ENTITY_PATTERN = re.compile(r"(?<=[a-z,;:()] )[A-Z][A-Za-z0-9&'-]+")
+LIST_MARKER_PATTERN = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\|[\s|:-]+\|$")
+
+
+def approximate_tokens(text: str) -> int:
+    """Rough token count of a prompt text (about four characters per token for English prose)."""
+    return (len(text or "") + 3) // 4
+
+
+def _is_key_fact(sentence: str) -> bool:
+    return bool(FIGURE_PATTERN.search(sentence) or ENTITY_PATTERN.search(sentence))
+
+
+def _paragraph_sentences(paragraph: List[str]) -> List[str]:
+    text = " ".join(LIST_MARKER_PATTERN.sub("", line).strip() for line in paragraph)
+    return [sentence.strip() for sentence in SENTENCE_SPLIT_PATTERN.split(text) if sentence.strip()]
+
+
+def digest_section(title: str, markdown: str, max_chars: int = DEFAULT_DIGEST_MAX_CHARS) -> str:
+    """
+    Builds a compact digest of one plan section, without an LLM call.
+
+    The digest keeps the section's headings as an outline, the first sentence of every
+    paragraph and every other sentence that states a figure or names an entity.
+    Table headers and table rows with figures are kept as they are; code blocks are dropped.
+
+    Args:
+        title (str): The section title
+        markdown (str): The full markdown text of the section
+        max_chars (int): Maximum length of the digest
+
+    Returns:
+        str: The digest, starting with a "Digest of <title>" line
+    """
+    lines = [f"Digest of {title}:"]
+    paragraph: List[str] = []
+    in_fence = False
+    in_table = False
+
+    def flush():
+        sentences = _paragraph_sentences(paragraph)
+        lines.extend(
+            f"- {sentence}" for i, sentence in enumerate(sentences) if i == 0 or _is_key_fact(sentence)
+        )
+        paragraph.clear()
+
+    for line in _strip_outer_fence(markdown or "").splitlines():
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        stripped = line.strip()
+        heading = HEADING_PATTERN.match(stripped)
+        if heading or not stripped or stripped.startswith("|") or LIST_MARKER_PATTERN.match(line):
+            flush()
+        if heading:
+            lines.append(f"{heading.group(1)} {heading.group(2)}")
+        elif stripped.startswith("|"):
+            if not in_table or (FIGURE_PATTERN.search(stripped) and not TABLE_SEPARATOR_PATTERN.match(stripped)):
+                lines.append(stripped)
+        elif stripped:
+            paragraph.append(stripped)
+        in_table = stripped.startswith("|")
+    flush()
+
+    digest = []
+    length = 0
+    for line in lines:
+        if length + len(line) + 1 > max_chars and digest:
+            break
+        digest.append(line)
+        length += len(line) + 1
+    return "\n".join(digest)
+
+# --- END OF FILE src/compaction.py ---
@@ -0,0 +1,286 @@
+# --- START OF FILE src/config.py ---
+
+import hashlib
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from .length_limits import parse_length_limits
+from .scheduler import TaskGraph
+from .schemas import QUESTIONNAIRE_FIELDS
+
+# The YAML configs ship next to this module
+CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
+AGENTS_CONFIG_PATH = os.path.join(CONFIG_DIR, "agents.yaml")
+TASKS_CONFIG_PATH = os.path.join(CONFIG_DIR, "tasks.yaml")
+
+# crewai interpolates {name} placeholders in task and agent texts with the crew inputs
+PLACEHOLDER_PATTERN = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+PROVIDERS = ("gemini", "groq")
+
+# Model settings an agent (agents.yaml) or a task (tasks.yaml) can set under `llm:`
+LLM_SETTING_KEYS = ("model", "reasoning_effort", "temperature", "max_tokens")
+REASONING_EFFORTS = ("disable", "low", "medium", "high")
+
+
+# `local: true` tasks run the GeneratePlanCrew method of the same name, registered with @local_task
+LOCAL_TASK_HANDLERS: Dict[str, Callable] = {}
+
+
+class ConfigError(ValueError):
+    """Raised when agents.yaml or tasks.yaml is invalid."""
+
+
+def local_task(method: Callable) -> Callable:
+    """Registers a GeneratePlanCrew method as the handler of the local task of the same name."""
+    LOCAL_TASK_HANDLERS[method.__name__] = method
+    return method
+
+
+def template_placeholders(*texts: str) -> List[str]:
+    """Returns the distinct {placeholder} names used in the given texts, in order of appearance."""
+    names = []
+    for text in texts:
+        for name in PLACEHOLDER_PATTERN.findall(text or ""):
+            if name not in names:
+                names.append(name)
+    return names
+
+
+class CompiledTemplate:
+    """
+    A prompt text split once into literal parts and {placeholder} names,
+    so rendering it for a request is a single join.
+    """
+
+    __slots__ = ("text", "placeholders", "_parts")
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self.placeholders = template_placeholders(self.text)
+        # Even indexes hold literal text, odd indexes hold placeholder names
+        self._parts = PLACEHOLDER_PATTERN.split(self.text)
+
+    def render(self, values: dict) -> str:
+        parts = self._parts
+        return "".join(
+            part if i % 2 == 0 else str(values.get(part, "{" + part + "}"))
+            for i, part in enumerate(parts)
+        )
+
+
+def llm_settings_errors(owner: str, settings, provider: Optional[str]) -> List[str]:
+    """Validates an `llm:` mapping; a null value removes the provider default of that setting."""
+    if not isinstance(settings, dict):
+        return [f"{owner}: llm must be a mapping of {', '.join(LLM_SETTING_KEYS)}"]
+    errors = []
+    unknown = [key for key in settings if key not in LLM_SETTING_KEYS]
+    if unknown:
+        errors.append(f"{owner}: unknown llm settings {', '.join(map(str, unknown))}")
+    model = settings.get("model")
+    if "model" in settings and (not isinstance(model, str) or (provider and not model.startswith(f"{provider}/"))):
+        errors.append(f"{owner}: llm model must be a '{provider}/...' model name")
+    effort = settings.get("reasoning_effort")
+    if effort is not None and effort not in REASONING_EFFORTS:
+        errors.append(f"{owner}: llm reasoning_effort must be one of {', '.join(REASONING_EFFORTS)}")
+    temperature = settings.get("temperature")
+    if "temperature" in settings and (not isinstance(temperature, (int, float)) or not 0 <= temperature <= 2):
+        errors.append(f"{owner}: llm temperature must be a number between 0 and 2")
+    max_tokens = settings.get("max_tokens")
+    if max_tokens is not None and (not isinstance(max_tokens, int) or max_tokens <= 0):
+        errors.append(f"{owner}: llm max_tokens must be a positive integer")
+    return errors
+
+
+class AgentSpec:
+    """Validated agent definition from agents.yaml."""
+
+    def __init__(self, name: str, raw: dict):
+        self.name = name
+        self.raw = raw
+        self.role = CompiledTemplate(raw.get("role"))
+        self.goal = CompiledTemplate(raw.get("goal"))
+        self.backstory = CompiledTemplate(raw.get("backstory"))
+        self.provider = raw.get("provider", "gemini")
+        self.tools = list(raw.get("tools") or [])
+        # Model settings of all tasks of this agent, on top of the provider defaults
+        self.llm = raw.get("llm") or {}
+
+    @property
+    def placeholders(self) -> List[str]:
+        return template_placeholders(self.role.text, self.goal.text, self.backstory.text)
+
+    def agent_kwargs(self) -> dict:
+        """Keyword arguments for crewai's Agent."""
+        return {"role": self.role.text, "goal": self.goal.text, "backstory": self.backstory.text}
+
+
+class TaskSpec:
+    """Validated task definition from tasks.yaml."""
+
+    def __init__(self, name: str, raw: dict):
+        self.name = name
+        self.raw = raw
+        self.description = CompiledTemplate(raw.get("description"))
+        self.expected_output = CompiledTemplate(raw.get("expected_output"))
+        self.agent = raw.get("agent")
+        self.depends_on = list(raw.get("depends_on") or [])
+        self.section_title = raw.get("section_title", name)
+        # Section tasks produce a part of the plan; in digest mode their consumers get a digest
+        self.is_section = "section_title" in raw
+        # (min, max) characters from "between X and Y characters" in expected_output, checked after generation
+        self.length_limits = parse_length_limits(self.expected_output.text)
+        self.local = bool(raw.get("local"))
+        # Model settings of this task, on top of its agent's settings
+        self.llm = raw.get("llm") or {}
+        # The agent's and the task's settings merged; set when the config is compiled
+        self.llm_settings: Dict[str, object] = {}
+        # Questionnaire fields referenced by this task's prompts and its agent's prompts
+        self.input_fields: List[str] = []
+
+    def task_kwargs(self) -> dict:
+        """Keyword arguments for crewai's Task."""
+        return {"description": self.description.text, "expected_output": self.expected_output.text}
+
+
+class PlanConfig:
+    """
+    The parsed and validated agents.yaml/tasks.yaml pair.
+    Instances are never mutated; a config change produces a new PlanConfig.
+    """
+
+    def __init__(self, agents: Dict[str, AgentSpec], tasks: Dict[str, TaskSpec], version: str):
+        self.agents = agents
+        self.tasks = tasks
+        self.version = version
+        self.graph = TaskGraph({name: spec.depends_on for name, spec in tasks.items()})
+        self.loaded_at = time.time()
+
+
+def compile_plan_config(agents_raw: dict, tasks_raw: dict, version: str,
+                        input_fields: Iterable[str] = QUESTIONNAIRE_FIELDS,
+                        local_tasks: Optional[Iterable[str]] = None) -> PlanConfig:
+    """
+    Validates the raw YAML configs and compiles them into a PlanConfig.
+
+    Every {placeholder} must be a BusinessPlanRequest field, every agent task must
+    name a known agent and every dependency must name a known task. `llm:` settings
+    must be known model settings, with a model of the agent's provider. When
+    `local_tasks` is given, every local task must be one of them.
+
+    Raises:
+        ConfigError: If the configs are invalid
+    """
+    if not isinstance(agents_raw, dict) or not isinstance(tasks_raw, dict):
+        raise ConfigError("agents.yaml and tasks.yaml must both contain a mapping at the top level.")
+
+    allowed = set(input_fields)
+    handlers = set(local_tasks) if local_tasks is not None else None
+    errors = []
+    agents = {name: AgentSpec(name, raw or {}) for name, raw in agents_raw.items()}
+    tasks = {name: TaskSpec(name, raw or {}) for name, raw in tasks_raw.items()}
+
+    for name, spec in agents.items():
+        if spec.provider not in PROVIDERS:
+            errors.append(f"agent '{name}': unknown provider '{spec.provider}'")
+        for field in ("role", "goal", "backstory"):
+            if not getattr(spec, field).text:
+                errors.append(f"agent '{name}': missing {field}")
+        unknown = [p for p in spec.placeholders if p not in allowed]
+        if unknown:
+            errors.append(f"agent '{name}': unknown placeholders {', '.join(unknown)}")
+        errors += llm_settings_errors(f"agent '{name}'", spec.llm, spec.provider)
+
+    for name, spec in tasks.items():
+        placeholders = template_placeholders(spec.description.text, spec.expected_output.text)
+        if not spec.local:
+            if spec.agent not in agents:
+                errors.append(f"task '{name}': unknown agent '{spec.agent}'")
+            else:
+                placeholders += [p for p in agents[spec.agent].placeholders if p not in placeholders]
+            if not spec.description.text or not spec.expected_output.text:
+                errors.append(f"task '{name}': missing description or expected_output")
+            agent = agents.get(spec.agent)
+            task_errors = llm_settings_errors(f"task '{name}'", spec.llm, agent.provider if agent else None)
+            errors += task_errors
+            if agent is not None and not task_errors and isinstance(agent.llm, dict):
+                spec.llm_settings = {**agent.llm, **spec.llm}
+        else:
+            if spec.llm:
+                errors.append(f"task '{name}': local tasks make no LLM call and take no llm settings")
+            if handlers is not None and name not in handlers:
+                errors.append(f"task '{name}': no GeneratePlanCrew method '{name}' for this local task")
+        unknown = [p for p in placeholders if p not in allowed]
+        if unknown:
+            errors.append(f"task '{name}': unknown placeholders {', '.join(unknown)}")
+        spec.input_fields = [p for p in placeholders if p in allowed]
+
+    if errors:
+        raise ConfigError("Invalid plan config:\n  " + "\n  ".join(errors))
+    try:
+        return PlanConfig(agents, tasks, version)
+    except ValueError as e:
+        raise ConfigError(f"Invalid plan config: {e}") from e
+
+
+# ---------- Process-wide cache with hot reload ----------
+_config_lock = threading.Lock()
+_config: Optional[PlanConfig] = None
+_config_mtimes: Optional[Tuple[float, float]] = None
+
+
+def _read_configs() -> Tuple[dict, dict, str]:
+    with open(AGENTS_CONFIG_PATH, "rb") as fh:
+        agents_bytes = fh.read()
+    with open(TASKS_CONFIG_PATH, "rb") as fh:
+        tasks_bytes = fh.read()
+    version = hashlib.sha256(agents_bytes + b"\0" + tasks_bytes).hexdigest()[:12]
+    return yaml.safe_load(agents_bytes) or {}, yaml.safe_load(tasks_bytes) or {}, version
+
+
+def get_plan_config() -> PlanConfig:
+    """
+    Returns the compiled plan config, reloading it when agents.yaml or tasks.yaml changed on disk.
+
+    The first load raises ConfigError on invalid configs. A later invalid edit is reported
+    and the previously loaded config stays active, so a typo never takes the service down.
+    """
+    global _config, _config_mtimes
+    mtimes = (os.path.getmtime(AGENTS_CONFIG_PATH), os.path.getmtime(TASKS_CONFIG_PATH))
+    if _config is not None and mtimes == _config_mtimes:
+        return _config
+
+    with _config_lock:
+        if _config is not None and mtimes == _config_mtimes:
+            return _config
+        # Importing the crew registers the local task handlers
+        from . import generate_plan_crew  # noqa: F401
+
+        try:
+            agents_raw, tasks_raw, version = _read_configs()
+            config = compile_plan_config(agents_raw, tasks_raw, version, local_tasks=LOCAL_TASK_HANDLERS)
+        except (ConfigError, yaml.YAMLError) as e:
+            if _config is None:
+                raise
+            print(f"Ignoring invalid config change, keeping version {_config.version}: {e}")
+            _config_mtimes = mtimes
+            return _config
+        if _config is not None and config.version != _config.version:
+            print(f"Reloaded agent/task config: version {_config.version} -> {config.version}")
+        _config, _config_mtimes = config, mtimes
+        return _config
+
+
+def config_version() -> str:
+    """
+    Returns the version hash of the active agents.yaml/tasks.yaml pair.
+    Any edit to the prompts or the task graph changes the version.
+    """
+    return get_plan_config().version
+
+# --- END OF FILE src/config.py ---
@@ -0,0 +1,91 @@
+# --- START OF FILE src/consolidation.py ---
+
+import re
+from typing import List, Tuple
+
+# Matches ATX headings ("## Title"), capturing the hashes and the heading text
+HEADING_PATTERN = re.compile(r"^(#{1,6})[ \t]+(.*?)[ \t]*#*[ \t]*$")
+FENCE_PATTERN = re.compile(r"^[ \t]*(```|~~~)")
+# An LLM answer wrapped as a whole in a ```markdown ... ``` block
+OUTER_FENCE_PATTERN = re.compile(r"^\s*```(?:markdown|md)?[ \t]*\n(.*)\n```\s*$", re.DOTALL)
+
+
+def _strip_outer_fence(markdown: str) -> str:
+    match = OUTER_FENCE_PATTERN.match(markdown)
+    return match.group(1) if match else markdown
+
+
+def _heading_text(line: str) -> str:
+    """Returns the plain text of a heading or bold-only line, for title comparisons."""
+    match = HEADING_PATTERN.match(line.strip())
+    text = match.group(2) if match else line.strip()
+    return text.strip("*_: ").lower()
+
+
+def strip_leading_title(markdown: str, title: str) -> str:
+    """Removes a first heading that only repeats the section title."""
+    lines = markdown.strip().splitlines()
+    if lines and _heading_text(lines[0]) == title.strip().lower():
+        lines = lines[1:]
+    return "\n".join(lines).strip()
+
+
+def normalize_headings(markdown: str, top_level: int = 2) -> str:
+    """
+    Shifts all headings so the highest one in the text is at `top_level`,
+    keeping their relative nesting. Headings inside code blocks are left alone.
+
+    Args:
+        markdown (str): The markdown text of one section
+        top_level (int): The level the highest heading should end up at
+
+    Returns:
+        str: The markdown text with normalized heading levels
+    """
+    lines = markdown.splitlines()
+    in_fence = False
+    levels = []
+    for line in lines:
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        elif not in_fence:
+            match = HEADING_PATTERN.match(line)
+            if match:
+                levels.append(len(match.group(1)))
+    if not levels:
+        return markdown
+
+    shift = top_level - min(levels)
+    normalized = []
+    in_fence = False
+    for line in lines:
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_PATTERN.match(line)
+        if match:
+            level = min(max(len(match.group(1)) + shift, top_level), 6)
+            line = f"{'#' * level} {match.group(2)}"
+        normalized.append(line)
+    return "\n".join(normalized)
+
+
+def consolidate_sections(sections: List[Tuple[str, str]]) -> str:
+    """
+    Assembles the business plan sections into a single markdown document.
+
+    Every section gets a top-level heading with its title; the headings the agents
+    wrote inside a section are nested below it.
+
+    Args:
+        sections (list): (title, markdown) pairs, in the order they should appear
+
+    Returns:
+        str: The unified markdown business plan
+    """
+    parts = []
+    for title, markdown in sections:
+        body = strip_leading_title(_strip_outer_fence(markdown or ""), title)
+        parts.append(f"# {title}\n\n{normalize_headings(body)}".strip())
+    return "\n\n".join(parts) + "\n"
+
+# --- END OF FILE src/consolidation.py ---
@@ -0,0 +1,309 @@
+# --- START OF FILE src/export.py ---
+
+import asyncio
+import hashlib
+import html
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Renderers (optional imports handled during runtime)
+try:
+    import markdown as markdown_lib
+except Exception:
+    markdown_lib = None
+try:
+    import weasyprint
+except Exception:
+    weasyprint = None
+
+from .metrics import EXPORT_RENDER_SECONDS, EXPORTS
+from .toc import heading_slug
+
+EXPORT_FORMATS = ("html", "pdf")
+MEDIA_TYPES = {"html": "text/html; charset=utf-8", "pdf": "application/pdf"}
+
+# Rendering is CPU-bound and runs in worker processes
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+
+# Link and image targets kept in the document; any other scheme (javascript:, file:, ...) is dropped
+SAFE_URL_SCHEMES = ("", "http", "https", "mailto")
+
+# Print layout. The table of contents links get their page numbers from the rendered layout.
+STYLESHEET = """
+@page { size: A4; margin: 2.2cm 2cm; @bottom-center { content: counter(page); font-size: 9pt; color: #666; } }
+body { font-family: "DejaVu Sans", "Helvetica", sans-serif; font-size: 10.5pt; line-height: 1.5; color: #222; }
+h1 { font-size: 18pt; margin-top: 0; page-break-before: always; }
+h1:first-of-type { page-break-before: avoid; }
+h2 { font-size: 14pt; margin-top: 1.4em; }
+h3 { font-size: 12pt; }
+h1, h2, h3 { page-break-after: avoid; }
+table { border-collapse: collapse; width: 100%; margin: 1em 0; }
+th, td { border: 1px solid #bbb; padding: 4px 8px; text-align: left; }
+h1#table-of-contents + ul, h1#table-of-contents + ul ul { list-style: none; padding-left: 1.2em; }
+h1#table-of-contents + ul { padding-left: 0; }
+h1#table-of-contents + ul a { color: inherit; text-decoration: none; }
+h1#table-of-contents + ul a::after { content: leader(".") target-counter(attr(href), page); }
+"""
+
+# Raise when render_html or render_pdf change their output, so cached documents are rendered again
+RENDER_REVISION = 2
+
+# Part of every cache key, so a change of the layout or the renderers re-renders cached documents
+RENDERER_VERSION = hashlib.sha256(
+    f"{STYLESHEET}|{RENDER_REVISION}|{getattr(markdown_lib, '__version__', '')}|"
+    f"{getattr(weasyprint, '__version__', '')}".encode("utf-8")
+).hexdigest()[:12]
+
+
+class ExportUnavailableError(RuntimeError):
+    """Raised when the renderer of an export format is not installed."""
+
+
+class ExportResult(NamedTuple):
+    content: bytes
+    media_type: str
+    content_hash: str
+    cached: bool
+    # Seconds it took to render the document, also when it was served from the cache
+    render_seconds: float
+
+
+def content_hash(markdown: str) -> str:
+    """The SHA-256 of the markdown; documents with the same markdown share their exports."""
+    return hashlib.sha256(markdown.encode("utf-8")).hexdigest()
+
+
+if markdown_lib is not None:
+    from markdown.extensions import Extension
+    from markdown.extensions.toc import TocExtension
+    from markdown.treeprocessors import Treeprocessor
+
+    class _UnsafeUrlStripper(Treeprocessor):
+        def run(self, root):
+            for element in root.iter():
+                for attribute in ("href", "src"):
+                    url = element.get(attribute)
+                    if url is not None and urlsplit(url.strip()).scheme.lower() not in SAFE_URL_SCHEMES:
+                        del element.attrib[attribute]
+
+    class _SafeMarkdown(Extension):
+        """Escapes raw HTML of the plan instead of passing it through, and drops unsafe link targets."""
+
+        def extendMarkdown(self, md):
+            md.preprocessors.deregister("html_block")
+            md.inlinePatterns.deregister("html")
+            md.treeprocessors.register(_UnsafeUrlStripper(md), "unsafe_urls", 1)
+
+
+def render_html(markdown: str, title: str = "Business Plan") -> str:
+    """
+    Renders the plan markdown to a standalone HTML document. Raw HTML in the plan is escaped.
+    Headings get the same anchors as the links of the table of contents (see toc.py).
+    """
+    if markdown_lib is None:
+        raise ExportUnavailableError("HTML export needs the 'markdown' package.")
+    used_slugs: Dict[str, int] = {}
+    body = markdown_lib.markdown(markdown, extensions=[
+        "tables", "fenced_code", "sane_lists", _SafeMarkdown(),
+        # The toc extension visits the headings in document order, like toc.heading_tree
+        TocExtension(slugify=lambda value, separator: heading_slug(value, used_slugs)),
+    ])
+    return (
+        f'<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n<title>{html.escape(title)}</title>\n'
+        f"<style>{STYLESHEET}</style>\n</head>\n<body>\n{body}\n</body>\n</html>\n"
+    )
+
+
+def render_pdf(document_html: str) -> bytes:
+    if weasyprint is None:
+        raise ExportUnavailableError("PDF export needs the 'weasyprint' package.")
+    # Only inline data: resources are loaded; no files, no network
+    url_fetcher = weasyprint.URLFetcher(allowed_protocols=("data",))
+    return weasyprint.HTML(string=document_html, url_fetcher=url_fetcher).write_pdf()
+
+
+def render_document(markdown: str, export_format: str) -> Tuple[bytes, float]:
+    """Renders one document; runs in a worker process. Returns the content and the render time in seconds."""
+    start = time.perf_counter()
+    document_html = render_html(markdown)
+    content = render_pdf(document_html) if export_format == "pdf" else document_html.encode("utf-8")
+    return content, time.perf_counter() - start
+
+
+class ExportCache:
+    """
+    On-disk cache of rendered documents, keyed by the content hash of the markdown, the format
+    and the renderer version. Each entry is the document file plus a JSON file with its render time.
+    When the cache grows beyond `max_bytes`, the least recently used entries are evicted.
+
+    Args:
+        directory (str): Where the rendered documents are stored
+        max_bytes (int): Upper bound for the total size of the cache files
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(digest: str) -> str:
+        return f"{digest}-{RENDERER_VERSION}"
+
+    def _paths(self, key: str, export_format: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, key)
+        return f"{base}.{export_format}", f"{base}.{export_format}.json"
+
+    def get(self, key: str, export_format: str) -> Optional[Tuple[bytes, Dict]]:
+        """Returns the cached document and its metadata, or None on a miss."""
+        path, meta_path = self._paths(key, export_format)
+        with self._lock:
+            try:
+                with open(path, "rb") as fh:
+                    content = fh.read()
+                with open(meta_path, "r", encoding="utf-8") as fh:
+                    meta = json.load(fh)
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+            os.utime(path)  # mark as recently used
+            self.hits += 1
+            return content, meta
+
+    def put(self, key: str, export_format: str, content: bytes, meta: Dict):
+        path, meta_path = self._paths(key, export_format)
+        suffix = f".{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(meta_path + suffix, "w", encoding="utf-8") as fh:
+                json.dump(meta, fh)
+            with open(path + suffix, "wb") as fh:
+                fh.write(content)
+            os.replace(meta_path + suffix, meta_path)
+            os.replace(path + suffix, path)
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith((".json", ".tmp")):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for stale in (path, f"{path}.json"):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
+            total -= size
+
+    def stats(self) -> Dict:
+        with self._lock:
+            documents = [name for name in os.listdir(self.directory) if not name.endswith((".json", ".tmp"))]
+            size = sum(os.path.getsize(os.path.join(self.directory, name)) for name in documents)
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(documents),
+                "size_bytes": size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class PlanExporter:
+    """
+    Renders plans to HTML and PDF in a pool of worker processes, serving repeated exports of the
+    same markdown from the export cache. Concurrent exports of the same document share one render.
+    """
+
+    def __init__(self, cache: ExportCache, max_workers: int = EXPORT_WORKERS):
+        self.cache = cache
+        self.max_workers = max(max_workers, 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._pool
+
+    async def export(self, markdown: str, export_format: str) -> ExportResult:
+        """
+        Returns the plan rendered in `export_format`, from the cache when it was rendered before.
+
+        Raises:
+            ValueError: If the format is unknown
+            ExportUnavailableError: If the format's renderer is not installed
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{export_format}', expected one of {', '.join(EXPORT_FORMATS)}.")
+        digest = content_hash(markdown)
+        key = self.cache.make_key(digest)
+        cached = self.cache.get(key, export_format)
+        if cached is not None:
+            EXPORTS.inc(format=export_format, outcome="cached")
+            content, meta = cached
+            return ExportResult(content, MEDIA_TYPES[export_format], digest, True, meta.get("render_seconds", 0.0))
+
+        in_flight_key = (key, export_format)
+        future = self._in_flight.get(in_flight_key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor(), render_document, markdown, export_format)
+            self._in_flight[in_flight_key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(in_flight_key, None))
+            owner = True
+        else:
+            owner = False
+        content, seconds = await asyncio.shield(future)
+        if owner:
+            EXPORT_RENDER_SECONDS.observe(seconds, format=export_format)
+            EXPORTS.inc(format=export_format, outcome="rendered")
+            self.cache.put(key, export_format, content, {
+                "content_hash": digest,
+                "format": export_format,
+                "renderer_version": RENDERER_VERSION,
+                "render_seconds": seconds,
+                "size_bytes": len(content),
+                "created_at": time.time(),
+            })
+            print(f"Rendered {export_format.upper()} {digest[:12]} in {seconds:.2f}s ({len(content)} bytes)")
+        else:
+            EXPORTS.inc(format=export_format, outcome="shared")
+        return ExportResult(content, MEDIA_TYPES[export_format], digest, not owner, seconds)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def default_exporter() -> PlanExporter:
+    """An exporter with the cache at EXPORT_CACHE_DIR, as used by the API and the batch CLI."""
+    return PlanExporter(ExportCache(
+        directory=os.getenv("EXPORT_CACHE_DIR", "data/export_cache"),
+        max_bytes=int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(500 * 1024 * 1024))),
+    ))
+
+# --- END OF FILE src/export.py ---
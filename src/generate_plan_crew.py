@@ -1,9 +1,11 @@
 # --- START OF FILE src/generate_plan_crew.py ---
 
+import json
 import os
-from typing import Optional
+import threading
+from typing import Any, Dict, List, Optional
 
-import yaml
+from pydantic import BaseModel
 
 # external LLM libraries (optional imports handled during runtime)
 try:
@@ -13,100 +15,177 @@ except Exception:
     genai = None
     types = None # Set types to None if genai is not available
 
-try:
-    from langchain_groq import ChatGroq
-except Exception:
-    ChatGroq = None
-
-from crewai import LLM, Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task, before_kickoff
-
-# NOTE: CharacterCounterTool must be defined/imported from your project.
-# If you have a concrete implementation, replace the placeholder below with:
-# from your_tools import CharacterCounterTool
-class CharacterCounterTool:
-    """Placeholder CharacterCounterTool. Replace with your real implementation."""
-    def __init__(self):
-        pass
+from crewai import LLM
+
+from .compaction import CONTEXT_MODES, approximate_tokens, digest_section
+from .config import PlanConfig, get_plan_config, local_task
+from .consolidation import consolidate_sections
+from .instrumented_llm import track_task
+from .length_limits import length_repair_messages, length_violation
+from .llm_cassette import CASSETTE_MODES, LLM_CASSETTE_MODE, CassetteLLM, get_cassette
+from .llm_pool import LLMPool
+from .metrics import (
+    LENGTH_REPAIRS, LINT_FINDINGS, PATCH_EDITS, REFINE_COMPLETION_TOKENS, REFINE_SECONDS, REVIEW_SECONDS_SAVED,
+    REVIEWS,
+)
+from .plan_cache import PlanCache, section_cache_key
+from .plan_graph import BoundPlanGraph, get_graph_template
+from .plan_linter import LintIssue, format_issues, lint_business_plan, review_savings
+from .plan_patches import REFINE_MODES, apply_edits, parse_edits, patch_messages, reanchor_messages
+from .hedging import LLM_HEDGE_FALLBACK_MODELS, LLM_HEDGE_PERCENTILE
+from .rate_limiter import get_rate_limiter
+from .scheduler import TaskGraph, run_task_graph
+from .toc import add_table_of_contents
+from .tracing import span
+
+
+class CrewRunResult(BaseModel):
+    """Result of GeneratePlanCrew.run."""
+    business_plan: str
+    # Output of every task, keyed by task name
+    outputs: Dict[str, str] = {}
+    # Agent tasks whose output was taken from the section cache / generated in this run
+    reused_sections: List[str] = []
+    regenerated_sections: List[str] = []
+    # Version of the agents.yaml/tasks.yaml pair the plan was generated with
+    config_version: str = ""
+    # Approximate input tokens of every agent task run in this run
+    input_tokens: Dict[str, int] = {}
+    # Model, wall time, LLM calls, tokens and estimated cost of every agent task run in this run
+    task_usage: Dict[str, Dict[str, Any]] = {}
+    # True when the linter found nothing and the evaluator/refiner review was skipped
+    review_skipped: bool = False
+
+
+# Default model settings per provider; agents.yaml and tasks.yaml refine them with `llm:`.
+# LLM clients are pooled per API key and settings.
+GEMINI_LLM_SETTINGS = {"model": "gemini/gemini-2.5-pro-preview-05-06", "temperature": 0.1, "reasoning_effort": "high"}
+GROQ_LLM_SETTINGS = {"model": "groq/llama-3.3-70b-versatile", "temperature": 0.1}
+PROVIDER_LLM_SETTINGS = {"gemini": GEMINI_LLM_SETTINGS, "groq": GROQ_LLM_SETTINGS}
+
+# "full" passes section outputs verbatim to downstream agent tasks, "digest" passes a compact digest
+DEFAULT_CONTEXT_MODE = os.getenv("PLAN_CONTEXT_MODE", "full")
+# "rewrite" lets the refiner re-emit the whole plan, "patch" asks it for edits that are applied locally
+DEFAULT_REFINE_MODE = os.getenv("PLAN_REFINE_MODE", "rewrite")
+
+# crewai joins the outputs of context tasks with this divider; the DAG runner does the same
+CONTEXT_SEPARATOR = "\n\n----------\n\n"
 
 
-@CrewBase
 class GeneratePlanCrew:
-    """GeneratePlanCrew crew"""
-
-    # Paths to YAML config files for agents and tasks
-    agents_config_path = "config/agents.yaml"
-    tasks_config_path = "config/tasks.yaml"
-
-    def __init__(self, gemini_api_key: Optional[str] = None, groq_api_key: Optional[str] = None):
+    """
+    GeneratePlanCrew crew
+
+    The agents and tasks come from the shared graph template of the active config
+    version (see plan_graph.py); a crew instance only binds them to one request's
+    inputs and LLM handles.
+    """
+
+    # The task whose output is the final business plan, and the task applying the evaluator feedback
+    final_task = "table_of_contents"
+    refine_task = "refine_plan"
+    # The local linter; when it finds nothing, the review tasks are skipped and the consolidated plan is final
+    lint_task = "lint_plan"
+    review_tasks = ("evaluate_plan", "refine_plan")
+
+    def __init__(self, gemini_api_key: Optional[str] = None, groq_api_key: Optional[str] = None,
+                 section_cache: Optional[PlanCache] = None, bypass_cache: bool = False,
+                 plan_config: Optional[PlanConfig] = None, llm_pool: Optional[LLMPool] = None,
+                 context_mode: Optional[str] = None, llm_overrides: Optional[Dict[str, Any]] = None,
+                 llm_settings_overrides: Optional[Dict[str, dict]] = None, refine_mode: Optional[str] = None):
         """
         Constructor accepts API keys dynamically.
         Keys are expected to be passed from the application entrypoint.
+        When a section cache is given, task outputs whose inputs did not change are reused.
+        When an LLM pool is given, the LLM clients are taken from (and shared through) the pool.
+        In the "digest" context mode, downstream agent tasks get a digest of each upstream section
+        instead of its full text; the local consolidation always uses the full text.
+        In the "patch" refine mode, the refiner returns edits to the plan instead of rewriting it.
+        `llm_overrides` maps providers to LLM objects used instead of the API-key based clients,
+        e.g. the fake LLMs of the benchmarks.
+        Every agent task uses the provider's default model settings, refined by the `llm:` settings
+        of its agent and its task; `llm_settings_overrides` maps providers to settings applied on
+        top of those, e.g. the model tiers compared by the tier benchmark.
+        With LLM_CASSETTE_MODE=record every LLM call is stored in the cassette at LLM_CASSETTE_PATH;
+        with LLM_CASSETTE_MODE=replay the calls are served from it and no provider is contacted.
+        The agent/task config defaults to the process-wide compiled config; it is captured
+        here so a hot reload never changes the config in the middle of a run.
         """
+        self.plan_config = plan_config or get_plan_config()
         self._gemini_api_key = gemini_api_key
         self._groq_api_key = groq_api_key
-
-        # lazy-loaded LLM instances
-        self._llm_gemini = None
-        self._llm_groq = None
-
-        # load agent/task configs (if present)
-        self.agents_config = self._load_yaml(self.agents_config_path) or {}
-        self.tasks_config = self._load_yaml(self.tasks_config_path) or {}
-
-    def _load_yaml(self, path: str):
-        """Load a YAML file and return its contents as a dict, or None if not found."""
-        if not path:
-            return None
-        try:
-            base = os.getcwd()
-            full_path = path if os.path.isabs(path) else os.path.join(base, path)
-            if not os.path.exists(full_path):
-                return None
-            with open(full_path, "r", encoding="utf-8") as fh:
-                return yaml.safe_load(fh)
-        except Exception:
-            # don't crash on config load — return None and let callers handle missing keys
-            return None
+        self._section_cache = section_cache
+        self._bypass_cache = bypass_cache
+        self._llm_pool = llm_pool
+        self._llm_overrides = dict(llm_overrides or {})
+        self._llm_settings_overrides = dict(llm_settings_overrides or {})
+        if LLM_CASSETTE_MODE not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode '{LLM_CASSETTE_MODE}', expected one of {', '.join(CASSETTE_MODES)}.")
+        self._cassette_llms: Dict[str, CassetteLLM] = {}
+        self.context_mode = context_mode or DEFAULT_CONTEXT_MODE
+        if self.context_mode not in CONTEXT_MODES:
+            raise ValueError(f"Unknown context mode '{self.context_mode}', expected one of {', '.join(CONTEXT_MODES)}.")
+        self.refine_mode = refine_mode or DEFAULT_REFINE_MODE
+        if self.refine_mode not in REFINE_MODES:
+            raise ValueError(f"Unknown refine mode '{self.refine_mode}', expected one of {', '.join(REFINE_MODES)}.")
+        self._digests: Dict[str, str] = {}
+        self._input_tokens: Dict[str, int] = {}
+        self._task_usage: Dict[str, Dict[str, Any]] = {}
+        # Findings of the linter; None until it ran
+        self._lint_issues: Optional[List[LintIssue]] = None
+        self._reused_sections = []
+        self._regenerated_sections = []
+        self._sections_lock = threading.Lock()
+        self._graph: Optional[BoundPlanGraph] = None
+
+        # lazy-loaded LLM instances, keyed by provider and model settings
+        self._llms: Dict[str, Any] = {}
+
+    def _pooled_llm(self, provider: str, api_key: str, settings: dict, factory):
+        if self._llm_pool is None:
+            return factory()
+        return self._llm_pool.get(provider, api_key, factory, settings)
+
+    def _create_gemini_llm(self, settings: dict):
+        # crewai's native Gemini provider builds its own google-genai client from the API key;
+        # it does not take a client object
+        return LLM(api_key=self._gemini_api_key, **settings)
+
+    def _create_groq_llm(self, settings: dict):
+        # crewai's own LLM keeps the API key; a ChatGroq object was converted by crewai without it.
+        # crewai has no native Groq provider, so this goes through litellm (crewai[litellm] in requirements.txt)
+        return LLM(api_key=self._groq_api_key, **settings)
+
+    def _api_key(self, provider: str) -> Optional[str]:
+        return self._groq_api_key if provider == "groq" else self._gemini_api_key
+
+    def _provider_llm(self, provider: str, settings: dict):
+        """Lazy-init the LLM wrapper (LLM from crewai) of a provider and model settings."""
+        key = f"{provider}:{json.dumps(settings, sort_keys=True)}"
+        if key not in self._llms:
+            if provider == "groq":
+                if not self._groq_api_key:
+                    raise ValueError("Groq API key not provided to GeneratePlanCrew.")
+                factory = lambda: self._create_groq_llm(settings)
+            else:
+                if not self._gemini_api_key:
+                    raise ValueError("Gemini API key not provided to GeneratePlanCrew.")
+                if genai is None or types is None:
+                    raise ImportError("google.generativeai is not installed or could not be imported.")
+                factory = lambda: self._create_gemini_llm(settings)
+            self._llms[key] = self._pooled_llm(provider, self._api_key(provider), settings, factory)
+        return self._llms[key]
 
     @property
     def llm_gemini(self):
-        """Lazy-init a Gemini LLM wrapper (LLM from crewai configured to use Gemini)."""
-        if self._llm_gemini is None:
-            if not self._gemini_api_key:
-                raise ValueError("Gemini API key not provided to GeneratePlanCrew.")
-            if genai is None or types is None:
-                raise ImportError("google.generativeai is not installed or could not be imported.")
-
-            # Create a single client object for the new SDK
-            genai_client = genai.Client(api_key=self._gemini_api_key)
-
-            # create crewai LLM object for Gemini (model string based on user's choice)
-            self._llm_gemini = LLM(
-                model="gemini/gemini-2.5-pro-preview-05-06", # This model string might need adjustment based on crewai's expected format for the new SDK
-                temperature=0.1,
-                reasoning_effort="high",
-                client=genai_client # Pass the initialized client to the LLM
-            )
-        return self._llm_gemini
+        """The Gemini LLM with the default model settings."""
+        return self._provider_llm("gemini", GEMINI_LLM_SETTINGS)
 
     @property
     def llm_groq(self):
-        """Lazy-init a Groq-backed LLM via ChatGroq (langchain_groq)."""
-        if self._llm_groq is None:
-            if not self._groq_api_key:
-                raise ValueError("Groq API key not provided to GeneratePlanCrew.")
-            if ChatGroq is None:
-                raise ImportError("langchain_groq.ChatGroq is not available/imported.")
-            # instantiate the ChatGroq object -- the exact args depend on the version of langchain_groq
-            self._llm_groq = ChatGroq(
-                temperature=0.1,
-                groq_api_key=self._groq_api_key,
-                model_name="llama-3.3-70b-versatile"
-            )
-        return self._llm_groq
+        """The Groq LLM with the default model settings."""
+        return self._provider_llm("groq", GROQ_LLM_SETTINGS)
 
-    @before_kickoff
     def before_kickoff_function(self, inputs):
         """
         Inputs provided by the user (form data).
@@ -114,161 +193,326 @@ class GeneratePlanCrew:
         """
         return inputs
 
-    # ---------- Agents ----------
-    # Each agent pulls config by name from the loaded agents_config dict.
-    # If the config file isn't present or doesn't contain the specific agent entry,
-    # we fall back to passing the name string to Agent (depending on how crewai expects it).
-    def _agent_config_or_name(self, name: str):
-        return self.agents_config.get(name) if isinstance(self.agents_config, dict) else name
-
-    @agent
-    def business_designer(self) -> Agent:
-        return Agent(
-            config=self._agent_config_or_name("business_designer"),
-            tools=[CharacterCounterTool()],
-            llm=self.llm_gemini,
-            verbose=True
-        )
-
-    @agent
-    def product_designer(self) -> Agent:
-        return Agent(
-            config=self._agent_config_or_name("product_designer"),
-            tools=[CharacterCounterTool()],
-            llm=self.llm_gemini,
-            verbose=True
-        )
-
-    @agent
-    def market_analyst(self) -> Agent:
-        return Agent(
-            config=self._agent_config_or_name("market_analyst"),
-            tools=[CharacterCounterTool()],
-            llm=self.llm_gemini,
-            verbose=True
-        )
-
-    @agent
-    def marketing_expert(self) -> Agent:
-        return Agent(
-            config=self._agent_config_or_name("marketing_expert"),
-            tools=[CharacterCounterTool()],
-            llm=self.llm_gemini,
-            verbose=True
-        )
-
-    @agent
-    def operations_specialist(self) -> Agent:
-        return Agent(
-            config=self._agent_config_or_name("operations_specialist"),
-            tools=[CharacterCounterTool()],
-            llm=self.llm_gemini,
-            verbose=True
-        )
-
-    @agent
-    def financial_expert(self) -> Agent:
-        return Agent(
-            config=self._agent_config_or_name("financial_expert"),
-            tools=[CharacterCounterTool()],
-            llm=self.llm_gemini,
-            verbose=True
-        )
-
-    @agent
-    def consolidator(self) -> Agent:
-        return Agent(
-            config=self._agent_config_or_name("consolidator"),
-            llm=self.llm_gemini,
-            verbose=True
-        )
-
-    @agent
-    def evaluator(self) -> Agent:
-        return Agent(
-            config=self._agent_config_or_name("evaluator"),
-            llm=self.llm_groq,
-            verbose=True
-        )
-
-    @agent
-    def refiner(self) -> Agent:
-        return Agent(
-            config=self._agent_config_or_name("refiner"),
-            llm=self.llm_groq,
-            verbose=True
-        )
-
-    # ---------- Tasks ----------
-    def _task_config_or_name(self, name: str):
-        return self.tasks_config.get(name) if isinstance(self.tasks_config, dict) else name
-
-    @task
-    def create_business_concept(self) -> Task:
-        return Task(config=self._task_config_or_name("create_business_concept"))
-
-    @task
-    def create_product_design(self) -> Task:
-        return Task(config=self._task_config_or_name("create_product_design"),
-                    context=[self.create_business_concept()])
-
-    @task
-    def create_market_analysis(self) -> Task:
-        return Task(config=self._task_config_or_name("create_market_analysis"),
-                    context=[self.create_business_concept(), self.create_product_design()])
-
-    @task
-    def create_marketing_plan(self) -> Task:
-        return Task(config=self._task_config_or_name("create_marketing_plan"),
-                    context=[self.create_business_concept(), self.create_product_design(), self.create_market_analysis()])
-
-    @task
-    def create_operating_plan(self) -> Task:
-        return Task(config=self._task_config_or_name("create_operating_plan"),
-                    context=[self.create_business_concept(), self.create_product_design(), self.create_market_analysis(), self.create_marketing_plan()])
-
-    @task
-    def create_financial_plan(self) -> Task:
-        return Task(config=self._task_config_or_name("create_financial_plan"),
-                    context=[self.create_business_concept(), self.create_product_design(), self.create_market_analysis(), self.create_marketing_plan(), self.create_operating_plan()])
-
-    @task
-    def consolidate_plan(self) -> Task:
-        return Task(config=self._task_config_or_name("consolidate_plan"),
-                    context=[self.create_business_concept(), self.create_product_design(), self.create_market_analysis(), self.create_marketing_plan(), self.create_operating_plan(), self.create_financial_plan()])
-
-    @task
-    def evaluate_plan(self) -> Task:
-        return Task(config=self._task_config_or_name("evaluate_plan"),
-                    context=[self.consolidate_plan()])
-
-    @task
-    def refine_plan(self) -> Task:
-        return Task(config=self._task_config_or_name("refine_plan"),
-                    context=[self.consolidate_plan(), self.evaluate_plan()])
-
-    # ---------- Crew ----------
-    @crew
-    def crew(self) -> Crew:
-        """Creates the GeneratePlanCrew crew"""
-        # Ensure LLMs are initialized by accessing their properties so any import errors are raised early
-        _ = self.llm_gemini
-        _ = self.llm_groq
-
-        return Crew(
-            agents=self.agents,
-            tasks=self.tasks,
-            process=Process.sequential,
-            verbose=True
-        )
-
-    def run(self, inputs: dict = None):
+    # ---------- Agents and tasks ----------
+    # Agents take their role, goal, backstory, provider and tools from agents.yaml; tasks take
+    # their prompts, agent and `depends_on` dependencies from tasks.yaml. Dependencies define
+    # both the context each task receives and which tasks can run in parallel.
+    # Tasks marked `local: true` are computed in-process instead of by an agent.
+    def task_llm_settings(self, name: str) -> dict:
+        """
+        Returns the model settings of an agent task: the provider defaults, then the `llm:`
+        settings of its agent and task, then the overrides. A null value drops a default.
+        """
+        provider = self._task_provider(name)
+        settings = {
+            **PROVIDER_LLM_SETTINGS[provider],
+            **self.plan_config.tasks[name].llm_settings,
+            **self._llm_settings_overrides.get(provider, {}),
+        }
+        return {key: value for key, value in settings.items() if value is not None}
+
+    def _llm_for_task(self, name: str):
+        provider = self._task_provider(name)
+        if provider in self._llm_overrides:
+            return self._llm_overrides[provider]
+        settings = self.task_llm_settings(name)
+        if LLM_CASSETTE_MODE != "off":
+            return self._cassette_llm(provider, settings)
+        return self._provider_llm(provider, settings)
+
+    def _llm_options_for_task(self, name: str) -> dict:
+        """
+        Returns the rate limiter and hedging options of a task's LLM calls.
+        Fake and replayed LLMs never reach a provider and are neither limited nor hedged;
+        recordings are not hedged either, so every recorded call belongs to the run.
+        """
+        provider = self._task_provider(name)
+        if provider in self._llm_overrides or LLM_CASSETTE_MODE == "replay":
+            return {"hedge_percentile": 0}
+        settings = self.task_llm_settings(name)
+        api_key = self._api_key(provider)
+        options = {"rate_limiter": get_rate_limiter(provider, api_key, settings["model"])}
+        if LLM_CASSETTE_MODE != "off":
+            options["hedge_percentile"] = 0
+        elif LLM_HEDGE_PERCENTILE > 0 and provider in LLM_HEDGE_FALLBACK_MODELS:
+            options["fallback_llm"] = self._fallback_llm(provider, api_key, settings)
+        return options
+
+    def _fallback_llm(self, provider: str, api_key: str, settings: dict):
+        """The LLM hedged duplicates of this provider are sent to, from LLM_HEDGE_FALLBACK_MODELS."""
+        settings = {"model": LLM_HEDGE_FALLBACK_MODELS[provider], "temperature": settings.get("temperature")}
+        return self._pooled_llm(provider, api_key, settings, lambda: LLM(api_key=api_key, **settings))
+
+    def _cassette_llm(self, provider: str, settings: dict) -> CassetteLLM:
+        """Returns the recording or replaying LLM of a provider and model settings; replay needs no API key or client."""
+        key = f"{provider}:{json.dumps(settings, sort_keys=True)}"
+        if key not in self._cassette_llms:
+            llm = None
+            if LLM_CASSETTE_MODE == "record":
+                llm = self._provider_llm(provider, settings)
+            params = dict(settings)
+            model = params.pop("model")
+            with self._sections_lock:
+                self._cassette_llms.setdefault(
+                    key, CassetteLLM(get_cassette(), LLM_CASSETTE_MODE, model, params, llm=llm)
+                )
+        return self._cassette_llms[key]
+
+    def _task_dependencies(self, name: str) -> list:
+        return self.plan_config.tasks[name].depends_on
+
+    def _is_local_task(self, name: str) -> bool:
+        return self.plan_config.tasks[name].local
+
+    # ---------- Local stages ----------
+    @local_task
+    def consolidate_plan(self, upstream: dict) -> str:
+        """
+        Builds the unified markdown plan from the section outputs, without an LLM call.
+        Sections are ordered as in `depends_on` and titled with their `section_title`.
+        """
+        sections = [
+            (self.plan_config.tasks[dep].section_title, upstream[dep])
+            for dep in self._task_dependencies("consolidate_plan")
+        ]
+        return consolidate_sections(sections)
+
+    @local_task
+    def table_of_contents(self, upstream: dict) -> str:
+        """Puts a table of contents built from the heading tree at the top of the refined plan, without an LLM call."""
+        return add_table_of_contents(upstream[self._task_dependencies(self.final_task)[0]])
+
+    @local_task
+    def lint_plan(self, upstream: dict) -> str:
+        """
+        Runs the rule-based linter over the consolidated plan, without an LLM call.
+        Returns the findings in the evaluator's issue list format, empty when the plan is clean.
+        """
+        issues = lint_business_plan(upstream[self._task_dependencies(self.lint_task)[0]])
+        self._lint_issues = issues
+        for issue in issues:
+            LINT_FINDINGS.inc(rule=issue.rule)
+        print(f"Linter: {len(issues)} issues" + ("" if issues else "; skipping the evaluator/refiner review"))
+        return format_issues(issues)
+
+    def _review_skipped(self) -> bool:
+        return self._lint_issues is not None and not self._lint_issues
+
+    def _scheduled_provider(self, name: str) -> Optional[str]:
+        """The provider slot a task waits for; skipped review tasks call no LLM and need none."""
+        if name in self.review_tasks and self._review_skipped():
+            return None
+        return self._task_provider(name)
+
+    def _skipped_review_output(self, name: str, upstream: dict) -> str:
+        """A skipped refine task passes its first dependency (the consolidated plan) through; other review tasks return nothing."""
+        if name == self.refine_task:
+            return upstream[self._task_dependencies(name)[0]]
+        return ""
+
+    def _record_review(self):
+        """Reports whether this run's review was skipped and, if it ran, how long it took."""
+        if self._lint_issues is None:
+            return
+        if self._review_skipped():
+            saved = review_savings.record_skip()
+            REVIEWS.inc(outcome="skipped")
+            if saved is not None:
+                REVIEW_SECONDS_SAVED.inc(saved)
+        elif all(name in self._task_usage for name in self.review_tasks):
+            review_savings.record_review(sum(self._task_usage[name]["seconds"] for name in self.review_tasks))
+            REVIEWS.inc(outcome="reviewed")
+        else:
+            REVIEWS.inc(outcome="cached")
+
+    # ---------- Run ----------
+    def task_graph(self) -> TaskGraph:
+        """Returns the dependency graph of all tasks declared in tasks.yaml."""
+        return self.plan_config.graph
+
+    def _task_provider(self, name: str) -> Optional[str]:
+        if self._is_local_task(name):
+            return None
+        return self.plan_config.agents[self.plan_config.tasks[name].agent].provider
+
+    # ---------- Section cache ----------
+    # Each agent task is cached under the inputs its prompts reference plus its upstream outputs,
+    # so changing one answer only regenerates the sections that use it and their consumers.
+    def _section_cache_key(self, name: str, inputs: dict, upstream: dict) -> str:
+        spec = self.plan_config.tasks[name]
+        agent_spec = self.plan_config.agents[spec.agent]
+        definition = {
+            "task": spec.task_kwargs(),
+            "agent": agent_spec.agent_kwargs(),
+            "provider": agent_spec.provider,
+            "llm": self.task_llm_settings(name),
+        }
+        if self.context_mode != "full":
+            definition["context_mode"] = self.context_mode
+        if name == self.refine_task and self.refine_mode != "rewrite":
+            definition["refine_mode"] = self.refine_mode
+        referenced = {field: inputs.get(field) for field in spec.input_fields}
+        return section_cache_key(name, definition, referenced, upstream)
+
+    def _record_section(self, name: str, reused: bool):
+        with self._sections_lock:
+            (self._reused_sections if reused else self._regenerated_sections).append(name)
+
+    # ---------- Context compaction ----------
+    def _upstream_context(self, dep: str, output: str) -> str:
+        """Returns what a downstream agent task sees of an upstream output; digests are built once per run."""
+        spec = self.plan_config.tasks[dep]
+        if self.context_mode != "digest" or not spec.is_section:
+            return output
+        with self._sections_lock:
+            if dep not in self._digests:
+                self._digests[dep] = digest_section(spec.section_title, output)
+            return self._digests[dep]
+
+    # ---------- Length limits ----------
+    def _enforce_length(self, name: str, text: str, llm) -> str:
+        """
+        Checks an agent output against the "between X and Y characters" of its expected_output.
+        An output outside the range gets one repair call; the repair is kept if it is closer to the range.
+        """
+        limits = self.plan_config.tasks[name].length_limits
+        violation = length_violation(text, limits)
+        if not violation:
+            return text
+        length = len(text.strip())
+        print(f"Task '{name}': {length} characters, outside {limits[0]}-{limits[1]}; repairing the length")
+        with span("length.repair", task=name, characters=length, violation=violation) as repair_span:
+            try:
+                repaired = str(llm.call(length_repair_messages(self.plan_config.tasks[name].section_title,
+                                                               text, limits)) or "").strip()
+            except Exception as e:
+                print(f"Task '{name}': length repair failed, keeping the original: {e}")
+                LENGTH_REPAIRS.inc(task=name, outcome="kept")
+                return text
+            remaining = length_violation(repaired, limits)
+            repair_span.set_attribute("repaired_characters", len(repaired))
+        if not repaired or abs(remaining) >= abs(violation):
+            outcome, result = "kept", text
+        else:
+            outcome, result = ("fixed" if remaining == 0 else "improved"), repaired
+        print(f"Task '{name}': length repair {outcome} ({len(result.strip())} characters)")
+        LENGTH_REPAIRS.inc(task=name, outcome=outcome)
+        return result
+
+    # ---------- Patch-based refinement ----------
+    def _refine_with_patches(self, upstream: dict, llm) -> str:
+        """
+        Asks the refiner for edits that apply the evaluator feedback and applies them locally.
+        Edits that do not anchor in the plan are sent back once; edits failing again are dropped.
+        """
+        plan_task, feedback_task = self._task_dependencies(self.refine_task)[:2]
+        plan = upstream[plan_task]
+        edits = parse_edits(llm.call(patch_messages(plan, upstream[feedback_task])))
+        if edits is None:
+            print("Refiner answer is no edit list; keeping the plan unchanged")
+            PATCH_EDITS.inc(outcome="unparseable")
+            return plan
+        patched, failed = apply_edits(plan, edits)
+        PATCH_EDITS.inc(len(edits) - len(failed), outcome="applied")
+        if failed:
+            with span("refine.reanchor", failed_edits=len(failed)):
+                retried = parse_edits(llm.call(reanchor_messages(patched, failed))) or []
+            patched, still_failed = apply_edits(patched, retried)
+            reanchored = len(retried) - len(still_failed)
+            dropped = max(len(failed) - reanchored, 0)
+            PATCH_EDITS.inc(reanchored, outcome="reanchored")
+            PATCH_EDITS.inc(dropped, outcome="failed")
+            print(f"Refiner: {len(edits) - len(failed)} edits applied, {reanchored} after asking again, {dropped} dropped")
+        else:
+            print(f"Refiner: {len(edits)} edits applied")
+        return patched
+
+    def _execute_task(self, name: str, inputs: dict, upstream: dict) -> str:
+        """Runs a single task with the outputs of its dependencies as context."""
+        with span(f"task {name}", kind="task", task=name) as task_span:
+            if self._is_local_task(name):
+                task_span.set_attribute("local", True)
+                return getattr(self, name)(upstream)
+            if name in self.review_tasks and self._review_skipped():
+                task_span.set_attribute("skipped", True)
+                return self._skipped_review_output(name, upstream)
+
+            cache_key = None
+            if self._section_cache is not None:
+                cache_key = self._section_cache_key(name, inputs, upstream)
+                cached = None if self._bypass_cache else self._section_cache.get(cache_key)
+                if cached is not None:
+                    task_span.set_attribute("cached", True)
+                    self._record_section(name, reused=True)
+                    return cached["output"]
+
+            task_instance = self._graph.task(name)
+            context = CONTEXT_SEPARATOR.join(
+                self._upstream_context(dep, upstream[dep]) for dep in self._task_dependencies(name)
+            )
+            context_tokens = approximate_tokens(context)
+            input_tokens = approximate_tokens(task_instance.description + task_instance.expected_output) + context_tokens
+            with self._sections_lock:
+                self._input_tokens[name] = input_tokens
+            task_span.set_attribute("input_tokens", input_tokens)
+            print(f"Task '{name}': ~{input_tokens} input tokens, ~{context_tokens} of them context ({self.context_mode} mode)")
+            provider = self._task_provider(name)
+            model = self._llm_for_task(name).model
+            with track_task(name, self.plan_config.tasks[name].agent, provider, model) as run:
+                if name == self.refine_task and self.refine_mode == "patch":
+                    output = self._refine_with_patches(upstream, task_instance.agent.llm)
+                else:
+                    output = task_instance.execute_sync(agent=task_instance.agent, context=context).raw
+                    output = self._enforce_length(name, output, task_instance.agent.llm)
+            if name == self.refine_task:
+                REFINE_SECONDS.observe(run.seconds, mode=self.refine_mode)
+                REFINE_COMPLETION_TOKENS.observe(run.completion_tokens, mode=self.refine_mode)
+            with self._sections_lock:
+                self._task_usage[name] = {
+                    "model": model,
+                    "seconds": run.seconds,
+                    "llm_calls": run.llm_calls,
+                    "prompt_tokens": run.prompt_tokens,
+                    "completion_tokens": run.completion_tokens,
+                    "cost_usd": run.cost_usd,
+                }
+
+            if cache_key is not None:
+                self._section_cache.put(cache_key, {"output": output})
+            self._record_section(name, reused=False)
+            return output
+
+    def run(self, inputs: dict = None) -> CrewRunResult:
         """
         Kick off the crew with provided inputs.
+        Tasks run as soon as their dependencies are done, so independent sections are
+        generated at the same time, within the per-provider concurrency limits.
         Any exceptions are wrapped to add context.
         """
         try:
-            return self.crew().kickoff(inputs=inputs)
+            inputs = self.before_kickoff_function(inputs or {})
+            self._graph = get_graph_template(self.plan_config).bind(
+                self._llm_for_task, inputs, self._llm_options_for_task
+            )
+            graph = self.task_graph()
+            with span("crew.run", config_version=self.plan_config.version, context_mode=self.context_mode,
+                      refine_mode=self.refine_mode):
+                outputs = run_task_graph(
+                    graph,
+                    lambda name, upstream: self._execute_task(name, inputs, upstream),
+                    provider_of=self._scheduled_provider,
+                )
+            self._record_review()
+            return CrewRunResult(
+                business_plan=outputs[self.final_task],
+                outputs={name: outputs[name] for name in graph.order if name in outputs},
+                reused_sections=[name for name in graph.order if name in self._reused_sections],
+                regenerated_sections=[name for name in graph.order if name in self._regenerated_sections],
+                config_version=self.plan_config.version,
+                input_tokens=dict(self._input_tokens),
+                task_usage=dict(self._task_usage),
+                review_skipped=self._review_skipped(),
+            )
         except Exception as e:
             raise Exception(f"Error while running the crew: {e}") from e
 
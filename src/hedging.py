@@ -0,0 +1,127 @@
+# --- START OF FILE src/hedging.py ---
+
+import contextvars
+import json
+import os
+import random
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+# A call still running after this percentile of the recent latencies of its task and model gets a duplicate;
+# 0 disables hedging
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+# Latencies observed per task and model before hedging starts, and how many recent latencies are kept
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_WINDOW = int(os.getenv("LLM_HEDGE_WINDOW", "200"))
+# Provider -> model the duplicate is sent to instead of the original model, e.g. '{"gemini": "gemini/gemini-2.5-flash"}'
+LLM_HEDGE_FALLBACK_MODELS: Dict[str, str] = json.loads(os.getenv("LLM_HEDGE_FALLBACK_MODELS", "{}"))
+
+# Transient errors are retried with exponential backoff and full jitter
+LLM_RETRY_MAX_ATTEMPTS = int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "30.0"))
+
+TRANSIENT_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504)
+# Exception class names of litellm and the provider SDKs that mean "try again"
+TRANSIENT_ERROR_NAMES = (
+    "RateLimitError", "APIConnectionError", "Timeout", "APITimeoutError", "ServiceUnavailableError",
+    "InternalServerError", "ConnectionError", "TimeoutError", "ReadTimeout", "ConnectTimeout", "ResourceExhausted",
+)
+
+# Runs the primary call and its duplicate; a losing call cannot be interrupted and finishes in the background
+_hedge_executor = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_HEDGE_MAX_WORKERS", "32")),
+                                     thread_name_prefix="llm-hedge")
+
+
+class LatencyTracker:
+    """Recent latencies of one task and model, for the hedging threshold."""
+
+    def __init__(self, window: int = LLM_HEDGE_WINDOW):
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, p: float, min_samples: int = LLM_HEDGE_MIN_SAMPLES) -> Optional[float]:
+        """Returns the p-th percentile of the recent latencies, or None with fewer than min_samples."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies or len(latencies) < min_samples:
+            return None
+        return latencies[min(int(len(latencies) * p / 100), len(latencies) - 1)]
+
+
+_trackers: Dict[Tuple[str, str], LatencyTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def latency_tracker(task: str, model: str) -> LatencyTracker:
+    """
+    Returns the process-wide latency tracker of a task and model. Tasks write outputs of very
+    different lengths, so each gets its own threshold.
+    """
+    key = (task, model)
+    with _trackers_lock:
+        if key not in _trackers:
+            _trackers[key] = LatencyTracker()
+        return _trackers[key]
+
+
+def is_transient_error(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status in TRANSIENT_STATUS_CODES:
+        return True
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def backoff_delay(attempt: int, base: float = LLM_RETRY_BASE_DELAY, cap: float = LLM_RETRY_MAX_DELAY) -> float:
+    """Full-jitter exponential backoff: a random delay up to base * 2^(attempt - 1), capped."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def hedged_call(primary: Callable[[], Any], hedge: Callable[[], Any], threshold: float,
+                slot: Optional[threading.Semaphore] = None) -> Tuple[Any, bool, bool]:
+    """
+    Runs `primary`; if it has not finished after `threshold` seconds, also runs `hedge`
+    and returns whichever answer arrives first. An error of one call is only raised
+    if the other call fails as well.
+
+    Args:
+        slot (Semaphore): Concurrency cap the duplicate counts toward; it is only sent if a
+            slot is free right away, and releases the slot when it finishes
+
+    Returns:
+        tuple: (result, hedged, hedge_won)
+    """
+    first = _hedge_executor.submit(contextvars.copy_context().run, primary)
+    done, _ = wait([first], timeout=threshold)
+    if done:
+        return first.result(), False, False
+    if slot is not None and not slot.acquire(blocking=False):
+        # Every slot is taken; a duplicate now would exceed the cap
+        return first.result(), False, False
+
+    def run_hedge():
+        try:
+            return hedge()
+        finally:
+            if slot is not None:
+                slot.release()
+
+    second = _hedge_executor.submit(contextvars.copy_context().run, run_hedge)
+    pending = {first, second}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                return future.result(), True, future is second
+            except Exception as e:
+                error = e
+    raise error
+
+# --- END OF FILE src/hedging.py ---
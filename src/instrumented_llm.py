@@ -0,0 +1,237 @@
+# --- START OF FILE src/instrumented_llm.py ---
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from crewai.llms.base_llm import BaseLLM
+
+from .compaction import approximate_tokens
+from .hedging import (
+    LLM_HEDGE_PERCENTILE, LLM_RETRY_MAX_ATTEMPTS, backoff_delay, hedged_call, is_transient_error, latency_tracker,
+)
+from .llm_pool import with_stop_words
+from .metrics import (
+    LLM_CALL_SECONDS, LLM_CALLS, LLM_COMPLETION_TOKENS, LLM_COST, LLM_ERRORS, LLM_HEDGE_WINS, LLM_HEDGES,
+    LLM_PROMPT_TOKENS, LLM_RETRIES, RATE_LIMIT_WAIT_SECONDS, TASK_HEDGES, TASK_ITERATIONS, TASK_RETRIES,
+    TASK_SECONDS,
+)
+from .rate_limiter import RateLimiter
+from .scheduler import provider_semaphore
+from .tracing import span
+
+# litellm (installed with crewai[litellm]) knows the tokenizers and prices of most models
+try:
+    from litellm import cost_per_token, token_counter
+except Exception:
+    print("litellm is not installed: token counts are approximated and costs are reported as 0. "
+          "Install crewai[litellm] from requirements.txt.")
+    cost_per_token = None
+    token_counter = None
+
+
+class TaskRun:
+    """LLM call statistics of the agent task running in the current thread."""
+
+    def __init__(self, task: str):
+        self.task = task
+        self.llm_calls = 0
+        self.failed_calls = 0
+        # LLM calls repeated after an error, and calls that got a hedged duplicate
+        self.retries = 0
+        self.hedges = 0
+        # Usage of the successful calls, and the task's wall time once it finished
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.seconds = 0.0
+
+
+_current_task_run: contextvars.ContextVar[Optional[TaskRun]] = contextvars.ContextVar("current_task_run", default=None)
+
+
+@contextmanager
+def track_task(task: str, agent: str, provider: str, model: str):
+    """Records wall time, LLM iterations, retries and hedges of one agent task run inside the block."""
+    run = TaskRun(task)
+    token = _current_task_run.set(run)
+    labels = {"task": task, "agent": agent, "provider": provider, "model": model}
+    start = time.perf_counter()
+    try:
+        yield run
+    finally:
+        _current_task_run.reset(token)
+        run.seconds = time.perf_counter() - start
+        TASK_SECONDS.observe(run.seconds, **labels)
+        TASK_ITERATIONS.observe(run.llm_calls, **labels)
+        if run.retries:
+            TASK_RETRIES.inc(run.retries, **labels)
+        if run.hedges:
+            TASK_HEDGES.inc(run.hedges, **labels)
+
+
+def count_tokens(model: str, messages: Any = None, text: Optional[str] = None) -> int:
+    """Counts tokens with the model's tokenizer when litellm knows it, approximately otherwise."""
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    if token_counter is not None:
+        try:
+            if messages is not None:
+                return token_counter(model=model, messages=messages)
+            return token_counter(model=model, text=text or "")
+        except Exception:
+            pass
+    if messages is not None:
+        text = " ".join(str(message.get("content") or "") for message in messages)
+    return approximate_tokens(text)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    if cost_per_token is None:
+        return 0.0
+    try:
+        prompt_cost, completion_cost = cost_per_token(
+            model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        )
+    except Exception:
+        return 0.0
+    return prompt_cost + completion_cost
+
+
+class InstrumentedLLM(BaseLLM):
+    """
+    Wraps the LLM of one agent and records tokens, latency, cost and errors of every call,
+    labeled with the task, agent, provider and model.
+
+    Every attempt first waits for its turn at the rate limiter, if one is given. An attempt
+    still running after the hedging percentile of the recent latencies of its task and model
+    gets a duplicate (sent to `fallback_llm` if given), if the provider has a free concurrency
+    slot, and the first answer wins. Transient errors are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, llm, agent: str, provider: str, rate_limiter: Optional[RateLimiter] = None,
+                 fallback_llm=None, hedge_percentile: float = LLM_HEDGE_PERCENTILE,
+                 max_attempts: int = LLM_RETRY_MAX_ATTEMPTS):
+        super().__init__(model=llm.model, temperature=getattr(llm, "temperature", None))
+        self.llm = llm
+        self.agent = agent
+        self.provider = provider
+        self.rate_limiter = rate_limiter
+        self.fallback_llm = fallback_llm
+        self.hedge_percentile = hedge_percentile
+        self.max_attempts = max(max_attempts, 1)
+
+    def _labels(self) -> dict:
+        run = _current_task_run.get()
+        return {"task": run.task if run else "", "agent": self.agent, "provider": self.provider, "model": self.model}
+
+    def _acquire(self, prompt_tokens: int):
+        """Waits for the rate limiter, if any, to admit one request."""
+        if self.rate_limiter is not None:
+            waited = self.rate_limiter.acquire(prompt_tokens)
+            RATE_LIMIT_WAIT_SECONDS.observe(waited, provider=self.provider, model=self.model)
+
+    def _send(self, llm, messages, call_kwargs: dict, task: str):
+        """One provider call, admitted by the rate limiter before; records its latency."""
+        # crewai sets the agent's stop words on the LLM it was given, i.e. on this wrapper
+        llm = with_stop_words(llm, self.stop)
+        start = time.perf_counter()
+        response = llm.call(messages, **call_kwargs)
+        latency_tracker(task, llm.model).observe(time.perf_counter() - start)
+        return response
+
+    def _hedged_attempt(self, messages, prompt_tokens: int, call_kwargs: dict, labels: dict, run: Optional[TaskRun]):
+        # The hedge timer starts once the request is admitted, so time queued at the rate limiter
+        # never counts toward the threshold
+        self._acquire(prompt_tokens)
+        task = labels["task"]
+        threshold = None
+        if self.hedge_percentile > 0:
+            threshold = latency_tracker(task, self.model).percentile(self.hedge_percentile)
+        if threshold is None:
+            return self._send(self.llm, messages, call_kwargs, task)
+
+        hedge_llm = self.fallback_llm or self.llm
+
+        def hedge():
+            # The duplicate is a request of its own and waits for its own turn
+            self._acquire(prompt_tokens)
+            return self._send(hedge_llm, messages, call_kwargs, task)
+
+        # The duplicate also takes a slot of the provider's concurrency cap, like a task
+        response, hedged, hedge_won = hedged_call(
+            lambda: self._send(self.llm, messages, call_kwargs, task),
+            hedge,
+            threshold,
+            slot=provider_semaphore(self.provider),
+        )
+        if hedged:
+            LLM_HEDGES.inc(**labels)
+            if run is not None:
+                run.hedges += 1
+        if hedge_won:
+            LLM_HEDGE_WINS.inc(**labels)
+        return response
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        labels = self._labels()
+        run = _current_task_run.get()
+        if run is not None:
+            if run.failed_calls:
+                run.retries += 1
+            run.llm_calls += 1
+        LLM_CALLS.inc(**labels)
+
+        call_kwargs = dict(kwargs, tools=tools, callbacks=callbacks, available_functions=available_functions)
+        prompt_tokens = count_tokens(self.model, messages=messages)
+        with span("llm.call", kind="llm", **labels) as call_span:
+            start = time.perf_counter()
+            try:
+                for attempt in range(1, self.max_attempts + 1):
+                    try:
+                        response = self._hedged_attempt(messages, prompt_tokens, call_kwargs, labels, run)
+                        break
+                    except Exception as e:
+                        if attempt == self.max_attempts or not is_transient_error(e):
+                            raise
+                        delay = backoff_delay(attempt)
+                        print(f"Transient LLM error ({type(e).__name__}), retry {attempt} in {delay:.1f}s: {e}")
+                        LLM_RETRIES.inc(**labels)
+                        if run is not None:
+                            run.retries += 1
+                        time.sleep(delay)
+            except Exception:
+                LLM_ERRORS.inc(**labels)
+                if run is not None:
+                    run.failed_calls += 1
+                raise
+            finally:
+                LLM_CALL_SECONDS.observe(time.perf_counter() - start, **labels)
+                call_span.set_attribute("attempts", attempt)
+
+            completion_tokens = count_tokens(self.model, text=str(response or ""))
+            if self.rate_limiter is not None:
+                self.rate_limiter.adjust(completion_tokens)
+            call_span.set_attribute("prompt_tokens", prompt_tokens)
+            call_span.set_attribute("completion_tokens", completion_tokens)
+        cost = estimate_cost(self.model, prompt_tokens, completion_tokens)
+        LLM_PROMPT_TOKENS.inc(prompt_tokens, **labels)
+        LLM_COMPLETION_TOKENS.inc(completion_tokens, **labels)
+        LLM_COST.inc(cost, **labels)
+        if run is not None:
+            run.prompt_tokens += prompt_tokens
+            run.completion_tokens += completion_tokens
+            run.cost_usd += cost
+        return response
+
+    def supports_function_calling(self) -> bool:
+        return self.llm.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
+
+# --- END OF FILE src/instrumented_llm.py ---
@@ -0,0 +1,152 @@
+# --- START OF FILE src/job_store.py ---
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+# Job lifecycle: queued -> running -> succeeded | failed
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+class JobRecord(BaseModel):
+    job_id: str
+    status: str
+    created_at: float
+    updated_at: float
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+
+
+def worker_id() -> str:
+    """Identifies the worker process that owns a job: "<hostname>:<pid>"."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """
+    Small SQLite-backed store for plan generation jobs.
+
+    Only the job status and the final result are persisted. API keys never
+    touch the disk, which also means a job cannot be resumed after a restart:
+    such jobs are marked as failed by `fail_interrupted_jobs`. Every job records
+    the worker process that runs it, so several workers can share the store.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    owner TEXT
+                )
+                """
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+            if "owner" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+
+    def create(self) -> JobRecord:
+        """Registers a new queued job and returns its record."""
+        now = time.time()
+        job = JobRecord(job_id=uuid.uuid4().hex, status=JOB_QUEUED, created_at=now, updated_at=now)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, created_at, updated_at, owner) VALUES (?, ?, ?, ?, ?)",
+                (job.job_id, job.status, job.created_at, job.updated_at, worker_id()),
+            )
+        return job
+
+    def mark_running(self, job_id: str):
+        self._update(job_id, status=JOB_RUNNING)
+
+    def mark_succeeded(self, job_id: str, result: Dict):
+        self._update(job_id, status=JOB_SUCCEEDED, result=json.dumps(result))
+
+    def mark_failed(self, job_id: str, error: str):
+        self._update(job_id, status=JOB_FAILED, error=error)
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        """Returns the job record, or None if the job id is unknown."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT job_id, status, created_at, updated_at, result, error FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return JobRecord(
+            job_id=row[0],
+            status=row[1],
+            created_at=row[2],
+            updated_at=row[3],
+            result=json.loads(row[4]) if row[4] else None,
+            error=row[5],
+        )
+
+    def fail_interrupted_jobs(self) -> int:
+        """
+        Marks jobs left queued or running by a previous process as failed. Only jobs of this
+        host whose worker process has exited are touched (and jobs recorded before owners
+        were), so jobs of the other workers sharing the store keep running.
+
+        Returns:
+            int: The number of jobs that were marked as failed
+        """
+        hostname = socket.gethostname()
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT job_id, owner FROM jobs WHERE status IN (?, ?)", (JOB_QUEUED, JOB_RUNNING),
+            ).fetchall()
+            interrupted = []
+            for job_id, owner in rows:
+                host, _, pid = (owner or "").rpartition(":")
+                if owner is None or (host == hostname and pid.isdigit() and not _process_alive(int(pid))):
+                    interrupted.append(job_id)
+            self._conn.executemany(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE job_id = ? AND status IN (?, ?)",
+                [(JOB_FAILED, "Job was interrupted by a server restart.", time.time(), job_id, JOB_QUEUED, JOB_RUNNING)
+                 for job_id in interrupted],
+            )
+        return len(interrupted)
+
+    def _update(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = COALESCE(?, result), error = COALESCE(?, error), updated_at = ? "
+                "WHERE job_id = ?",
+                (status, result, error, time.time(), job_id),
+            )
+
+# --- END OF FILE src/job_store.py ---
@@ -0,0 +1,54 @@
+# --- START OF FILE src/length_limits.py ---
+
+import re
+from typing import List, Optional, Tuple
+
+# "between 2000 and 4000 characters" in a task's expected_output
+LENGTH_LIMIT_PATTERN = re.compile(r"between\s+(\d[\d,.]*)\s+and\s+(\d[\d,.]*)\s+characters", re.IGNORECASE)
+
+
+def parse_length_limits(text: str) -> Optional[Tuple[int, int]]:
+    """Returns the (min, max) characters asked for in a prompt text, or None if it sets no range."""
+    match = LENGTH_LIMIT_PATTERN.search(text or "")
+    if match is None:
+        return None
+    low, high = (int(re.sub(r"[,.]", "", value)) for value in match.groups())
+    return min(low, high), max(low, high)
+
+
+def length_violation(text: str, limits: Optional[Tuple[int, int]]) -> int:
+    """
+    Returns how many characters the text is outside the limits: negative if too short,
+    positive if too long, 0 if within the limits or without limits.
+    """
+    if limits is None:
+        return 0
+    length = len(text.strip())
+    if length < limits[0]:
+        return length - limits[0]
+    if length > limits[1]:
+        return length - limits[1]
+    return 0
+
+
+def length_repair_messages(section_title: str, text: str, limits: Tuple[int, int]) -> List[dict]:
+    """Messages of the single LLM call that brings an out-of-range section back within its limits."""
+    low, high = limits
+    length = len(text.strip())
+    action = "Shorten" if length > high else "Expand"
+    return [
+        {
+            "role": "system",
+            "content": "You are an editor of business plans. You adjust the length of a section without changing "
+                       "its structure, its headings, its facts or its tone. You answer with the revised section only.",
+        },
+        {
+            "role": "user",
+            "content": f"The business plan section '{section_title}' below has {length} characters, but it must be "
+                       f"between {low} and {high} characters. {action} it to about {(low + high) // 2} characters. "
+                       f"Keep the markdown headings in the same order and do not add new facts or figures.\n\n"
+                       f"{text.strip()}",
+        },
+    ]
+
+# --- END OF FILE src/length_limits.py ---
@@ -0,0 +1,164 @@
+# --- START OF FILE src/llm_cassette.py ---
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from crewai.llms.base_llm import BaseLLM
+
+from .llm_pool import with_stop_words
+
+# off: call the providers; record: call them and store every call; replay: serve stored calls only
+CASSETTE_MODES = ("off", "record", "replay")
+LLM_CASSETTE_MODE = os.getenv("LLM_CASSETTE_MODE", "off")
+LLM_CASSETTE_PATH = os.getenv("LLM_CASSETTE_PATH", "data/llm_cassette.jsonl.gz")
+# Replayed calls wait for their recorded latency times this factor; 0 replays at full speed
+LLM_REPLAY_LATENCY_SCALE = float(os.getenv("LLM_REPLAY_LATENCY_SCALE", "1.0"))
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when no recorded call matches a request."""
+
+
+def _normalize_messages(messages: Any) -> List[Dict[str, str]]:
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    return [
+        {"role": str(message.get("role", "")), "content": " ".join(str(message.get("content") or "").split())}
+        for message in messages
+    ]
+
+
+def call_key(model: str, messages: Any, params: Optional[Dict] = None, tools: Any = None) -> str:
+    """
+    Returns the cassette key of an LLM call: a hash of the whitespace-normalized messages,
+    the model, the model parameters and the names of the tools offered to the model.
+    """
+    tool_names = sorted(
+        str((tool.get("function") or {}).get("name") or tool.get("name")) if isinstance(tool, dict) else str(tool)
+        for tool in tools or []
+    )
+    payload = json.dumps(
+        {"model": model, "messages": _normalize_messages(messages), "params": params or {}, "tools": tool_names},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """
+    Recorded LLM calls in a gzip-compressed JSON Lines file, one call per line.
+
+    New recordings are appended as extra gzip members, so recording never rewrites the file.
+    Calls with the same key (e.g. retries of the same prompt) are replayed in recording order;
+    once they are used up, the last one is served again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._calls: Dict[str, List[Dict]] = {}
+        self._replayed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        call = json.loads(line)
+                        self._calls.setdefault(call["key"], []).append(call)
+
+    def __len__(self) -> int:
+        return sum(len(calls) for calls in self._calls.values())
+
+    def record(self, key: str, model: str, response: Any, latency: float):
+        call = {"key": key, "model": model, "latency": round(latency, 3), "response": response}
+        with self._lock:
+            self._calls.setdefault(key, []).append(call)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as fh:
+                fh.write(json.dumps(call, ensure_ascii=False) + "\n")
+
+    def replay(self, key: str) -> Dict:
+        with self._lock:
+            calls = self._calls.get(key)
+            if not calls:
+                raise CassetteMissError(f"No recorded LLM call for key {key[:12]} in {self.path}.")
+            index = self._replayed.get(key, 0)
+            self._replayed[key] = index + 1
+            return calls[min(index, len(calls) - 1)]
+
+
+class CassetteLLM(BaseLLM):
+    """
+    Records the calls of a real LLM into a cassette, or replays them from it without any LLM.
+
+    Args:
+        cassette (Cassette): Where calls are stored
+        mode (str): "record" or "replay"
+        model (str): The model name; part of the call key
+        params (dict): Model parameters (temperature, ...); part of the call key
+        llm: The real LLM; only needed for recording
+        latency_scale (float): Factor applied to recorded latencies when replaying
+    """
+
+    def __init__(self, cassette: Cassette, mode: str, model: str, params: Optional[Dict] = None, llm=None,
+                 latency_scale: float = LLM_REPLAY_LATENCY_SCALE):
+        if mode == "record" and llm is None:
+            raise ValueError("Recording needs the real LLM.")
+        super().__init__(model=model, temperature=(params or {}).get("temperature"))
+        self.cassette = cassette
+        self.mode = mode
+        self.params = dict(params or {})
+        self.llm = llm
+        self.latency_scale = latency_scale
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        key = call_key(self.model, messages, self.params, tools)
+        if self.mode == "replay":
+            call = self.cassette.replay(key)
+            if self.latency_scale > 0:
+                time.sleep(call["latency"] * self.latency_scale)
+            return call["response"]
+
+        llm = with_stop_words(self.llm, self.stop)
+        start = time.perf_counter()
+        response = llm.call(
+            messages, tools=tools, callbacks=callbacks, available_functions=available_functions, **kwargs
+        )
+        # Native tool calls may return non-text results, which cannot be replayed
+        if isinstance(response, str):
+            self.cassette.record(key, self.model, response, time.perf_counter() - start)
+        return response
+
+    # Both modes must present the same capabilities to crewai, or the recorded prompts would not
+    # match the replayed ones. Text-based tool use keeps every response a plain string.
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size() if self.llm is not None else super().get_context_window_size()
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette:
+    """Returns the process-wide cassette at LLM_CASSETTE_PATH, loading it on first use."""
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(LLM_CASSETTE_PATH)
+        return _cassette
+
+# --- END OF FILE src/llm_cassette.py ---
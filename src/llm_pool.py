@@ -0,0 +1,114 @@
+# --- START OF FILE src/llm_pool.py ---
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+def api_key_fingerprint(api_key: str) -> str:
+    """Returns a stable fingerprint of an API key, so the key itself is never used as a dict key or logged."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def with_stop_words(llm: Any, stop: Optional[list]) -> Any:
+    """
+    Returns `llm` with the given stop words. Pooled clients are shared by concurrent runs, so
+    instead of setting the stop words on the pooled object this returns a shallow copy, which
+    still shares the underlying HTTP client. LLMs that ignore stop words are returned as they are.
+    """
+    if not stop or getattr(llm, "stop", None) == stop:
+        return llm
+    supports_stop_words = getattr(llm, "supports_stop_words", None)
+    if supports_stop_words is not None and not supports_stop_words():
+        return llm
+    if hasattr(llm, "model_copy"):
+        return llm.model_copy(update={"stop": list(stop)})
+    llm = copy.copy(llm)
+    llm.stop = list(stop)
+    return llm
+
+
+class LLMPool:
+    """
+    Process-wide pool of LLM clients, keyed by provider, API-key fingerprint and model settings.
+
+    All agents of a request and all requests using the same key share one client, and with it
+    its HTTP keep-alive connections and TLS sessions. Clients unused for `idle_ttl_seconds`
+    are dropped, and when more than `max_size` clients are pooled the least recently used
+    one is dropped.
+    """
+
+    def __init__(self, max_size: int = 32, idle_ttl_seconds: float = 15 * 60):
+        self.max_size = max(max_size, 1)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (client, last used timestamp), least recently used first
+        self._clients: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(provider: str, api_key: str, settings: Optional[Dict] = None) -> str:
+        payload = json.dumps(settings or {}, sort_keys=True, default=str)
+        return f"{provider}:{api_key_fingerprint(api_key)}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]}"
+
+    def get(self, provider: str, api_key: str, factory: Callable[[], Any], settings: Optional[Dict] = None) -> Any:
+        """
+        Returns the pooled client for the provider, key and settings, creating it with `factory` on a miss.
+
+        Args:
+            provider (str): The LLM provider, e.g. "gemini"
+            api_key (str): The API key the client authenticates with
+            factory (callable): Creates a new client; called without arguments
+            settings (dict): Model settings the client was created with (model name, temperature, ...)
+        """
+        key = self.make_key(provider, api_key, settings)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._clients[key] = (entry[0], now)
+                self._clients.move_to_end(key)
+                return entry[0]
+
+            self.misses += 1
+            client = factory()
+            self._clients[key] = (client, now)
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+            return client
+
+    def _evict_idle(self, now: float):
+        expired = [key for key, (_, last_used) in self._clients.items() if now - last_used > self.idle_ttl_seconds]
+        for key in expired:
+            del self._clients[key]
+        self.evictions += len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def stats(self) -> Dict:
+        """Returns hit/miss counters and the current size of the pool."""
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._clients),
+                "max_size": self.max_size,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+            }
+
+# --- END OF FILE src/llm_pool.py ---
@@ -1,7 +1,11 @@
 # --- START OF FILE src/main.py ---
 
 #!/usr/bin/env python
+import asyncio
+import contextvars
+import functools
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Dict
 from dotenv import load_dotenv # Still good for local testing, though Render uses its own env vars
 from pydantic import BaseModel
@@ -9,6 +13,9 @@ from pydantic import BaseModel
 from crewai.flow import Flow, listen, start, router
 
 from .generate_plan_crew import GeneratePlanCrew
+from .llm_pool import LLMPool
+from .plan_cache import PlanCache
+from .tracing import span
 # from .crews.review_plan_crew.review_plan_crew import ReviewPlanCrew
 
 # This import is not directly used in this file for the `genai` module,
@@ -19,9 +26,63 @@ from .generate_plan_crew import GeneratePlanCrew
 # from google import genai 
 
 
+# Crew runs are synchronous and take minutes, so they are moved off the event loop
+# onto a bounded thread pool. CREW_MAX_WORKERS caps the number of plans generated
+# at the same time in one worker process; further runs wait for a free slot. This also
+# caps the batch CLI: `python -m src.batch --workers N` runs at most CREW_MAX_WORKERS
+# plans at once, so raise both together.
+CREW_MAX_WORKERS = int(os.getenv("CREW_MAX_WORKERS", "4"))
+_crew_executor = ThreadPoolExecutor(max_workers=CREW_MAX_WORKERS, thread_name_prefix="crew")
+
+
+def shutdown_crew_executor():
+    """Cancels the crew runs still waiting for a worker; running crews cannot be interrupted."""
+    _crew_executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Per-task output cache: when a questionnaire changes, only the sections whose prompts
+# reference a changed answer (and the tasks downstream of them) are regenerated.
+section_cache = PlanCache(
+    directory=os.getenv("SECTION_CACHE_DIR", "data/section_cache"),
+    max_bytes=int(os.getenv("SECTION_CACHE_MAX_BYTES", str(500 * 1024 * 1024))),
+    ttl_seconds=float(os.getenv("SECTION_CACHE_TTL_SECONDS", str(30 * 24 * 3600))),
+)
+
+
+# LLM clients shared by all crew runs using the same API key, so keep-alive connections
+# and TLS sessions survive from one request (and one agent) to the next.
+llm_pool = LLMPool(
+    max_size=int(os.getenv("LLM_POOL_MAX_SIZE", "32")),
+    idle_ttl_seconds=float(os.getenv("LLM_POOL_IDLE_TTL_SECONDS", str(15 * 60))),
+)
+
+
+# Provider -> LLM object replacing the real clients in every crew run; used by the benchmarks
+# to run the whole flow against fake LLMs. Empty in normal operation.
+LLM_OVERRIDES: Dict[str, object] = {}
+
+
+def run_crew(gemini_api_key: str, groq_api_key: str, inputs: dict, bypass_cache: bool = False):
+    """Builds a GeneratePlanCrew and runs it synchronously. Called from the crew executor."""
+    crew = GeneratePlanCrew(gemini_api_key=gemini_api_key, groq_api_key=groq_api_key,
+                            section_cache=section_cache, bypass_cache=bypass_cache, llm_pool=llm_pool,
+                            llm_overrides=LLM_OVERRIDES)
+    return crew.run(inputs=inputs)
+
+
 class BusinessPlanState(BaseModel):
     user_inputs: Dict = {}
     business_plan: str = ""
+    # Always regenerate every section instead of reusing cached ones
+    bypass_cache: bool = False
+    # Agent tasks reused from the section cache / regenerated in this run
+    reused_sections: List[str] = []
+    regenerated_sections: List[str] = []
+    # Version of the agents.yaml/tasks.yaml pair used for this plan
+    config_version: str = ""
+    # Output of every task in graph order, and the usage of the agent tasks run for this plan
+    section_outputs: Dict[str, str] = {}
+    task_usage: Dict[str, Dict] = {}
     #feedback: Optional[str] = None
     #valid: bool = False
     #retry_count: int = 0
@@ -36,17 +97,27 @@ class BusinessPlanFlow(Flow[BusinessPlanState]):
         if not gemini_api_key or not groq_api_key:
             raise ValueError("API keys for Gemini and Groq must be provided.")
 
-        # Initialize GeneratePlanCrew with the API keys
-        crew = GeneratePlanCrew(gemini_api_key=gemini_api_key, groq_api_key=groq_api_key)
-
         # Pass the full user_inputs (excluding the keys which are handled by the crew's __init__)
         # to the run method for task context
         # It's better to remove the API keys from the inputs dictionary before passing to `crew.run`
         # as the crew itself will use them for LLM initialization.
         crew_inputs = {k: v for k, v in self.state.user_inputs.items() if k not in ["gemini_api_key", "groq_api_key"]}
 
-        result = crew.run(inputs=crew_inputs)
-        self.state.business_plan = result
+        # Run the crew on the bounded executor so the event loop keeps serving other requests.
+        # The executor does not propagate contextvars by itself; copy them for the trace spans.
+        loop = asyncio.get_running_loop()
+        with span("flow.generate_business_plan"):
+            result = await loop.run_in_executor(
+                _crew_executor,
+                functools.partial(contextvars.copy_context().run, run_crew, gemini_api_key, groq_api_key,
+                                  crew_inputs, self.state.bypass_cache),
+            )
+        self.state.business_plan = result.business_plan
+        self.state.reused_sections = result.reused_sections
+        self.state.regenerated_sections = result.regenerated_sections
+        self.state.config_version = result.config_version
+        self.state.section_outputs = result.outputs
+        self.state.task_usage = result.task_usage
         return self.state
 
     @listen("done")
@@ -0,0 +1,251 @@
+# --- START OF FILE src/metrics.py ---
+
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Default histogram buckets for durations in seconds; LLM calls take from seconds to minutes
+DEFAULT_SECONDS_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing value per label set."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only be increased.")
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """A value per label set that can go up and down, or is computed by a callback at scrape time."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._functions: Dict[tuple, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float], **labels):
+        key = self._label_values(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def _samples(self) -> List[str]:
+        values = dict(self._values)
+        values.update({key: function() for key, function in self._functions.items()})
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count of observed values per label set."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = DEFAULT_SECONDS_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [bucket counts..., sum, count]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._label_values(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, state in sorted(self._values.items()):
+            for i, bound in enumerate(self.buckets):
+                labels = _format_labels(self.labelnames, key, (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {state[i]}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process collection of metrics, rendered in the Prometheus text exposition format.
+    Metrics are aggregated per worker process.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered.")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = DEFAULT_SECONDS_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# ---------- Plan generation metrics ----------
+LLM_LABELS = ("task", "agent", "provider", "model")
+
+LLM_CALLS = registry.counter(
+    "business_plan_llm_calls_total", "LLM calls made by the agents, including tool-call iterations.", LLM_LABELS)
+LLM_ERRORS = registry.counter(
+    "business_plan_llm_errors_total", "LLM calls that raised an error.", LLM_LABELS)
+LLM_PROMPT_TOKENS = registry.counter(
+    "business_plan_llm_prompt_tokens_total", "Prompt tokens sent to the LLM.", LLM_LABELS)
+LLM_COMPLETION_TOKENS = registry.counter(
+    "business_plan_llm_completion_tokens_total", "Completion tokens received from the LLM.", LLM_LABELS)
+LLM_COST = registry.counter(
+    "business_plan_llm_cost_usd_total", "Estimated LLM spend in USD, for models with known prices.", LLM_LABELS)
+LLM_CALL_SECONDS = registry.histogram(
+    "business_plan_llm_call_seconds", "Wall time of single LLM calls.", LLM_LABELS)
+TASK_SECONDS = registry.histogram(
+    "business_plan_task_seconds", "Wall time of agent tasks, from start to final answer.", LLM_LABELS)
+TASK_ITERATIONS = registry.histogram(
+    "business_plan_task_llm_iterations", "LLM calls per agent task; more than one means tool-call iterations.",
+    LLM_LABELS, buckets=(1, 2, 3, 5, 8, 13, 20))
+TASK_RETRIES = registry.counter(
+    "business_plan_task_retries_total", "LLM calls repeated after a failed call within the same task.", LLM_LABELS)
+TASK_HEDGES = registry.counter(
+    "business_plan_task_hedges_total", "LLM calls of a task that got a hedged duplicate.", LLM_LABELS)
+LLM_RETRIES = registry.counter(
+    "business_plan_llm_retries_total", "Provider calls retried after a transient error, with backoff.", LLM_LABELS)
+LLM_HEDGES = registry.counter(
+    "business_plan_llm_hedges_total", "Slow LLM calls that got a duplicate request.", LLM_LABELS)
+LLM_HEDGE_WINS = registry.counter(
+    "business_plan_llm_hedge_wins_total", "Hedged LLM calls answered first by the duplicate.", LLM_LABELS)
+
+LENGTH_REPAIRS = registry.counter(
+    "business_plan_length_repairs_total",
+    "Sections outside the length limits of their task that got a repair call, by outcome "
+    "(fixed, improved, kept: the original was kept).", ("task", "outcome"))
+
+LINT_FINDINGS = registry.counter(
+    "business_plan_lint_findings_total", "Issues found by the local plan linter, by rule.", ("rule",))
+REVIEWS = registry.counter(
+    "business_plan_reviews_total",
+    "Plans by review outcome: reviewed by the evaluator and refiner, skipped because the linter found "
+    "nothing, or served from the section cache.", ("outcome",))
+REVIEW_SECONDS_SAVED = registry.counter(
+    "business_plan_review_seconds_saved_total",
+    "Estimated evaluator/refiner wall time saved by skipped reviews, at the mean duration of the reviews that ran.")
+
+REFINE_SECONDS = registry.histogram(
+    "business_plan_refine_seconds", "Wall time of the refine step, by refine mode (rewrite or patch).", ("mode",))
+REFINE_COMPLETION_TOKENS = registry.histogram(
+    "business_plan_refine_completion_tokens", "Completion tokens of the refine step, by refine mode.", ("mode",),
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000))
+PATCH_EDITS = registry.counter(
+    "business_plan_patch_edits_total",
+    "Refiner edits in patch mode, by outcome: applied, applied after asking again (reanchored), dropped "
+    "(failed), or answers that were no edit list (unparseable).", ("outcome",))
+
+EXPORTS = registry.counter(
+    "business_plan_exports_total",
+    "Plan exports by format and outcome: rendered, served from the export cache (cached), or sharing a "
+    "render of the same document that was already running (shared).", ("format", "outcome"))
+EXPORT_RENDER_SECONDS = registry.histogram(
+    "business_plan_export_render_seconds", "Time to render one plan document, by format.", ("format",),
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60))
+
+RATE_LIMIT_LABELS = ("provider", "model")
+
+RATE_LIMIT_WAIT_SECONDS = registry.histogram(
+    "business_plan_rate_limit_wait_seconds", "Time LLM calls waited for the provider rate limiter.",
+    RATE_LIMIT_LABELS, buckets=(0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120))
+RATE_LIMIT_QUEUE_LENGTH = registry.gauge(
+    "business_plan_rate_limit_queue_length", "LLM calls currently waiting for the provider rate limiter.",
+    RATE_LIMIT_LABELS)
+RATE_LIMIT_QUEUE_WAIT = registry.gauge(
+    "business_plan_rate_limit_current_wait_seconds",
+    "How long the longest-waiting LLM call has been queued at the provider rate limiter.", RATE_LIMIT_LABELS)
+
+# --- END OF FILE src/metrics.py ---
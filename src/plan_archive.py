@@ -0,0 +1,263 @@
+# --- START OF FILE src/plan_archive.py ---
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from .plan_cache import normalize_inputs
+
+# Columns of the plans table that can be filtered on; each has an index together with created_at
+FILTER_COLUMNS = ("business_name", "business_sector", "country")
+# Retention is enforced on startup and then at most once per interval while plans are archived
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class ArchivedSection(BaseModel):
+    task: str
+    text: str
+    # Timings and usage of the agent task that wrote the section; None when it was reused from
+    # the section cache or is a local task
+    model: Optional[str] = None
+    seconds: Optional[float] = None
+    llm_calls: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+class ArchivedPlanSummary(BaseModel):
+    plan_id: str
+    inputs_hash: str
+    business_name: str
+    business_sector: str
+    country: str
+    config_version: str
+    created_at: float
+    generation_seconds: float
+
+
+class ArchivedPlan(ArchivedPlanSummary):
+    business_plan: str
+    sections: List[ArchivedSection] = []
+
+
+def inputs_hash(inputs: dict) -> str:
+    """SHA-256 of the normalized questionnaire inputs, without API keys."""
+    payload = json.dumps(normalize_inputs(inputs), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PlanArchive:
+    """
+    Persistent SQLite archive of every generated plan: the inputs hash, the final plan, the text
+    of each task output with its timings, and the config version it was generated with.
+
+    The database runs in WAL mode, so listing and fetching plans does not wait for an archive
+    write. Listing reads only the indexed summary columns, never the plan text. Plans older than
+    `retention_seconds`, and the oldest plans beyond `max_plans`, are purged.
+
+    Args:
+        path (str): The SQLite database file
+        retention_seconds (float): Age after which plans are purged; 0 keeps them forever
+        max_plans (int): Number of most recent plans kept; 0 for no limit
+    """
+
+    def __init__(self, path: str, retention_seconds: float = 0, max_plans: int = 0):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.retention_seconds = retention_seconds
+        self.max_plans = max_plans
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS plans (
+                    plan_id TEXT PRIMARY KEY,
+                    inputs_hash TEXT NOT NULL,
+                    business_name TEXT NOT NULL COLLATE NOCASE,
+                    business_sector TEXT NOT NULL COLLATE NOCASE,
+                    country TEXT NOT NULL COLLATE NOCASE,
+                    config_version TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    generation_seconds REAL NOT NULL,
+                    business_plan TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS plan_sections (
+                    plan_id TEXT NOT NULL REFERENCES plans (plan_id) ON DELETE CASCADE,
+                    position INTEGER NOT NULL,
+                    task TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    model TEXT,
+                    seconds REAL,
+                    llm_calls INTEGER,
+                    prompt_tokens INTEGER,
+                    completion_tokens INTEGER,
+                    PRIMARY KEY (plan_id, position)
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS plans_created_at ON plans (created_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS plans_inputs_hash ON plans (inputs_hash, created_at)")
+            for column in FILTER_COLUMNS:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS plans_{column} ON plans ({column}, created_at)")
+
+    def record(self, inputs: dict, business_plan: str, config_version: str, generation_seconds: float,
+               section_outputs: Dict[str, str], task_usage: Dict[str, Dict]) -> str:
+        """
+        Archives a generated plan.
+
+        Args:
+            inputs (dict): The questionnaire inputs the plan was generated from
+            business_plan (str): The final plan
+            config_version (str): Version of the agents.yaml/tasks.yaml pair
+            generation_seconds (float): Wall time of the generation
+            section_outputs (dict): Output of every task, in graph order
+            task_usage (dict): Model, seconds, LLM calls and tokens of the agent tasks run for this plan
+
+        Returns:
+            str: The id of the archived plan
+        """
+        plan_id = uuid.uuid4().hex
+        now = time.time()
+        sections = []
+        for position, (task, text) in enumerate(section_outputs.items()):
+            usage = task_usage.get(task) or {}
+            sections.append((
+                plan_id, position, task, text, usage.get("model"), usage.get("seconds"),
+                usage.get("llm_calls"), usage.get("prompt_tokens"), usage.get("completion_tokens"),
+            ))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO plans (plan_id, inputs_hash, business_name, business_sector, country, config_version, "
+                "created_at, generation_seconds, business_plan) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    plan_id, inputs_hash(inputs), _text(inputs.get("business_name")),
+                    _text(inputs.get("business_sector")), _text(inputs.get("primary_countries")),
+                    config_version, now, generation_seconds, business_plan,
+                ),
+            )
+            self._conn.executemany(
+                "INSERT INTO plan_sections (plan_id, position, task, text, model, seconds, llm_calls, "
+                "prompt_tokens, completion_tokens) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                sections,
+            )
+        if now - self._last_purge >= PURGE_INTERVAL_SECONDS:
+            self.purge()
+        return plan_id
+
+    def list_plans(self, business_name: Optional[str] = None, business_sector: Optional[str] = None,
+                   country: Optional[str] = None, inputs_hash: Optional[str] = None, since: Optional[float] = None,
+                   until: Optional[float] = None, limit: int = 50, offset: int = 0) -> List[ArchivedPlanSummary]:
+        """
+        Returns the summaries of the archived plans matching all given filters, newest first.
+        Name, sector and country match exactly, ignoring case.
+        """
+        filters = {"business_name": business_name, "business_sector": business_sector, "country": country,
+                   "inputs_hash": inputs_hash}
+        clauses = [f"{column} = ?" for column, value in filters.items() if value is not None]
+        params: list = [value for value in filters.values() if value is not None]
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT plan_id, inputs_hash, business_name, business_sector, country, config_version, created_at, "
+                f"generation_seconds FROM plans {where}ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return [ArchivedPlanSummary(**dict(zip(ArchivedPlanSummary.model_fields, row))) for row in rows]
+
+    def get(self, plan_id: str, include_sections: bool = True) -> Optional[ArchivedPlan]:
+        """Returns the archived plan with its sections, or None if the plan id is unknown."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT plan_id, inputs_hash, business_name, business_sector, country, config_version, created_at, "
+                "generation_seconds, business_plan FROM plans WHERE plan_id = ?",
+                (plan_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            sections = self._conn.execute(
+                "SELECT task, text, model, seconds, llm_calls, prompt_tokens, completion_tokens FROM plan_sections "
+                "WHERE plan_id = ? ORDER BY position",
+                (plan_id,),
+            ).fetchall() if include_sections else []
+        plan = ArchivedPlan(**dict(zip(ArchivedPlan.model_fields, row)))
+        plan.sections = [ArchivedSection(**dict(zip(ArchivedSection.model_fields, section))) for section in sections]
+        return plan
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """
+        Deletes the plans outside the retention policy, with their sections.
+
+        Returns:
+            int: The number of plans deleted
+        """
+        now = time.time() if now is None else now
+        deleted = 0
+        with self._lock, self._conn:
+            if self.retention_seconds > 0:
+                deleted += self._conn.execute(
+                    "DELETE FROM plans WHERE created_at < ?", (now - self.retention_seconds,)
+                ).rowcount
+            if self.max_plans > 0:
+                deleted += self._conn.execute(
+                    "DELETE FROM plans WHERE plan_id IN "
+                    "(SELECT plan_id FROM plans ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_plans,),
+                ).rowcount
+            self._last_purge = now
+        if deleted:
+            print(f"Purged {deleted} archived plan(s) outside the retention policy.")
+        return deleted
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count, oldest, newest = self._conn.execute(
+                "SELECT COUNT(*), MIN(created_at), MAX(created_at) FROM plans"
+            ).fetchone()
+        return {
+            "plans": count,
+            "oldest_created_at": oldest,
+            "newest_created_at": newest,
+            "retention_seconds": self.retention_seconds,
+            "max_plans": self.max_plans,
+        }
+
+
+def default_archive() -> PlanArchive:
+    """
+    The archive at PLAN_ARCHIVE_PATH, as used by the API and the batch CLI. Plans older than
+    PLAN_ARCHIVE_RETENTION_DAYS, and the oldest beyond PLAN_ARCHIVE_MAX_PLANS, are purged.
+    """
+    return PlanArchive(
+        os.getenv("PLAN_ARCHIVE_PATH", "data/plan_archive.sqlite3"),
+        retention_seconds=float(os.getenv("PLAN_ARCHIVE_RETENTION_DAYS", "365")) * 24 * 3600,
+        max_plans=int(os.getenv("PLAN_ARCHIVE_MAX_PLANS", "0")),
+    )
+
+
+def _text(value) -> str:
+    return " ".join(str(value).split()) if value is not None else ""
+
+# --- END OF FILE src/plan_archive.py ---
@@ -0,0 +1,208 @@
+# --- START OF FILE src/plan_cache.py ---
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Inputs that never influence the generated plan and must not end up in a cache key
+SECRET_INPUT_KEYS = ("gemini_api_key", "groq_api_key")
+
+
+def normalize_inputs(inputs: dict) -> dict:
+    """
+    Normalizes questionnaire inputs so trivially different submissions share a cache key:
+    API keys are dropped, None becomes "" and runs of whitespace collapse to one space.
+    """
+    def normalize(value):
+        if value is None:
+            return ""
+        if isinstance(value, str):
+            return " ".join(value.split())
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        return value
+
+    return {key: normalize(value) for key, value in inputs.items() if key not in SECRET_INPUT_KEYS}
+
+
+def section_cache_key(task_name: str, task_definition: dict, referenced_inputs: dict, upstream_outputs: dict) -> str:
+    """
+    Returns the cache key of one task output.
+
+    The key only covers what the task can actually see: its own definition (prompt texts
+    and agent), the values of the inputs its prompt references and the outputs of its
+    upstream tasks. Changing any other questionnaire answer keeps the key stable.
+    """
+    payload = json.dumps(
+        {
+            "task": task_name,
+            "definition": task_definition,
+            "inputs": normalize_inputs(referenced_inputs),
+            "upstream": {
+                name: hashlib.sha256(output.encode("utf-8")).hexdigest()
+                for name, output in upstream_outputs.items()
+            },
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PlanCache:
+    """
+    On-disk cache of generated business plans (or of single task outputs), one JSON file per entry.
+
+    Entries expire `ttl_seconds` after they were written. When the cache grows beyond
+    `max_bytes`, the least recently used entries are evicted. Sizes, creation times and
+    the recency order are kept in memory, built from one directory scan at startup; a file's
+    mtime is its creation time. Files written by other processes are indexed on first lookup.
+
+    Args:
+        directory (str): Where the cache files are stored
+        max_bytes (int): Upper bound for the total size of the cache files
+        ttl_seconds (float): Lifetime of an entry
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl_seconds: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> (size in bytes, created_at), least recently used first
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._size = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def make_key(inputs: dict, config_version: str) -> str:
+        """Returns the cache key for the normalized inputs and the config version."""
+        payload = json.dumps(
+            {"inputs": normalize_inputs(inputs), "config_version": config_version},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name[:-len(".json")]))
+        for created_at, size, key in sorted(entries):
+            self._entries[key] = (size, created_at)
+            self._size += size
+
+    def _index(self, key: str, size: int, created_at: float):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= previous[0]
+        self._entries[key] = (size, created_at)
+        self._size += size
+
+    def _unindex(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[0]
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Returns the cached value for the key, or None on a miss."""
+        path = self._path(key)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            # Possibly written by another process sharing the directory
+            try:
+                stat = os.stat(path)
+            except OSError:
+                with self._lock:
+                    self.misses += 1
+                return None
+            entry = (stat.st_size, stat.st_mtime)
+            with self._lock:
+                self._index(key, *entry)
+
+        if time.time() - entry[1] > self.ttl_seconds:
+            with self._lock:
+                self._unindex(key)
+                self.misses += 1
+            self._remove(path)
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                value = json.load(fh)["value"]
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self._unindex(key)
+                self.misses += 1
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)  # mark as recently used
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict):
+        """Stores a value and evicts expired and least recently used entries."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        created_at = time.time()
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({"created_at": created_at, "value": value}, fh, ensure_ascii=False)
+        os.utime(tmp_path, (created_at, created_at))
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._index(key, size, created_at)
+            evicted = self._evict(created_at)
+        for evicted_key in evicted:
+            self._remove(self._path(evicted_key))
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self, now: float) -> List[str]:
+        """Drops expired and least recently used entries from the index; returns their keys."""
+        evicted = [key for key, (_, created_at) in self._entries.items() if now - created_at > self.ttl_seconds]
+        for key in evicted:
+            self._unindex(key)
+        while self._size > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._unindex(key)
+            evicted.append(key)
+        return evicted
+
+    def stats(self) -> Dict:
+        """Returns hit/miss counters and the current size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+# --- END OF FILE src/plan_cache.py ---
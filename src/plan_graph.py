@@ -0,0 +1,128 @@
+# --- START OF FILE src/plan_graph.py ---
+
+import json
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from crewai import Agent, Task
+
+from .config import PlanConfig
+from .instrumented_llm import InstrumentedLLM
+from .tools.CharacterCounterTool import CharacterCounterTool
+from .tracing import traced_tool
+
+# Tools agents can request with `tools:` in agents.yaml; their calls are traced.
+# Section lengths are checked locally after generation (see length_limits.py), so no agent
+# spends tool-call iterations on the character counter by default.
+TOOL_FACTORIES = {
+    "character_counter": traced_tool(CharacterCounterTool),
+}
+
+# Number of config versions whose templates are kept around after a hot reload
+MAX_CACHED_TEMPLATES = 4
+
+
+class PlanGraphTemplate:
+    """
+    The agent/task graph of one config version, built once and shared by all requests.
+
+    The template holds everything that does not depend on a request: the execution
+    order, the compiled prompt templates and the agent of every task. Binding it to a
+    request only renders the prompts and creates the crewai objects that hold per-run state.
+    Tasks of one agent with different `llm:` settings get separate crewai agents.
+    """
+
+    def __init__(self, plan_config: PlanConfig):
+        self.version = plan_config.version
+        self.order = tuple(plan_config.graph.order)
+        self.agents = plan_config.agents
+        self.tasks = {name: spec for name, spec in plan_config.tasks.items() if not spec.local}
+        for name, spec in self.agents.items():
+            unknown = [tool for tool in spec.tools if tool not in TOOL_FACTORIES]
+            if unknown:
+                raise ValueError(f"Agent '{name}' uses unknown tools: {', '.join(unknown)}")
+
+    def agent_key(self, task: str) -> Tuple[str, str]:
+        """The crewai agent a task runs on: its agents.yaml agent and its merged model settings."""
+        spec = self.tasks[task]
+        return spec.agent, json.dumps(spec.llm_settings, sort_keys=True)
+
+    def bind(self, llm_for_task: Callable[[str], Any], inputs: dict,
+             llm_options_for_task: Callable[[str], dict] = lambda task: {}) -> "BoundPlanGraph":
+        """
+        Binds the template to one request's inputs and LLM handles. `llm_for_task` returns the
+        LLM of a task's model settings and `llm_options_for_task` extra InstrumentedLLM
+        arguments (rate limiter, hedging) for it.
+        """
+        return BoundPlanGraph(self, llm_for_task, inputs, llm_options_for_task)
+
+
+class BoundPlanGraph:
+    """
+    A template bound to one request. Agents and tasks are created on first use, so
+    tasks served from the section cache never construct any crewai object.
+    """
+
+    def __init__(self, template: PlanGraphTemplate, llm_for_task: Callable[[str], Any], inputs: dict,
+                 llm_options_for_task: Callable[[str], dict] = lambda task: {}):
+        self.template = template
+        self._llm_for_task = llm_for_task
+        self._llm_options_for_task = llm_options_for_task
+        self._inputs = inputs
+        self._agents: Dict[Tuple[str, str], Agent] = {}
+        self._tasks: Dict[str, Task] = {}
+        self._lock = threading.Lock()
+
+    def agent(self, task: str) -> Agent:
+        """Returns the crewai agent that runs `task`, shared with tasks of the same agent and settings."""
+        key = self.template.agent_key(task)
+        with self._lock:
+            if key not in self._agents:
+                name = key[0]
+                spec = self.template.agents[name]
+                self._agents[key] = Agent(
+                    role=spec.role.render(self._inputs),
+                    goal=spec.goal.render(self._inputs),
+                    backstory=spec.backstory.render(self._inputs),
+                    tools=[TOOL_FACTORIES[tool]() for tool in spec.tools],
+                    llm=InstrumentedLLM(self._llm_for_task(task), agent=name, provider=spec.provider,
+                                        **self._llm_options_for_task(task)),
+                    verbose=True,
+                )
+            return self._agents[key]
+
+    def task(self, name: str) -> Task:
+        spec = self.template.tasks[name]
+        agent = self.agent(name)
+        with self._lock:
+            if name not in self._tasks:
+                self._tasks[name] = Task(
+                    name=name,
+                    description=spec.description.render(self._inputs),
+                    expected_output=spec.expected_output.render(self._inputs),
+                    agent=agent,
+                )
+            return self._tasks[name]
+
+    @property
+    def agents(self) -> List[Agent]:
+        return list(self._agents.values())
+
+
+_templates: Dict[str, PlanGraphTemplate] = {}
+_templates_lock = threading.Lock()
+
+
+def get_graph_template(plan_config: PlanConfig) -> PlanGraphTemplate:
+    """Returns the graph template of a config version, building it on first use."""
+    template = _templates.get(plan_config.version)
+    if template is not None:
+        return template
+    with _templates_lock:
+        if plan_config.version not in _templates:
+            while len(_templates) >= MAX_CACHED_TEMPLATES:
+                _templates.pop(next(iter(_templates)))
+            _templates[plan_config.version] = PlanGraphTemplate(plan_config)
+        return _templates[plan_config.version]
+
+# --- END OF FILE src/plan_graph.py ---
@@ -0,0 +1,215 @@
+# --- START OF FILE src/plan_linter.py ---
+
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .consolidation import FENCE_PATTERN, HEADING_PATTERN
+
+# Like evaluate_plan, the linter leaves the intentionally concise Financial Plan alone
+EXCLUDED_SECTIONS = ("Financial Plan",)
+
+BULLET_PATTERN = re.compile(r"^\s*(?:[-*+•]|\d{1,2}[.)])\s+\S")
+NEGATIVE_PATTERNS = (
+    re.compile(r"\b(?:does|do|did|is|are|was|were|has|have|will|can|could|would|should)\s+not\b(?!\s+only\b)",
+               re.IGNORECASE),
+    re.compile(r"\b(?:doesn't|don't|didn't|isn't|aren't|wasn't|weren't|hasn't|haven't|won't|can't|cannot|"
+               r"couldn't|wouldn't|shouldn't)\b", re.IGNORECASE),
+    re.compile(r"\bnot\s+(?:significant|relevant|necessary|available|offered|provided|planned|included|yet)\b",
+               re.IGNORECASE),
+)
+# Ways to refer to the company besides its name; a section may use at most MAX_COMPANY_SYNONYMS of them
+COMPANY_SYNONYM_PATTERN = re.compile(
+    r"\b(?:the|our)\s+(company|business|firm|enterprise|organi[sz]ation|startup|start-up|venture|brand|"
+    r"corporation|provider)\b",
+    re.IGNORECASE,
+)
+MAX_COMPANY_SYNONYMS = 3
+# Word sequences of this length found in two sections count as a repeated phrase
+REPEATED_PHRASE_WORDS = 8
+SENTENCE_PATTERN = re.compile(r"[^.!?\n]*[.!?]?")
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9'-]*")
+
+
+class LintIssue(NamedTuple):
+    section: str
+    rule: str
+    message: str
+    text: str
+
+
+def split_sections(markdown: str) -> List[Tuple[str, List[str]]]:
+    """Splits a consolidated plan at its top-level headings into (title, body lines) pairs."""
+    sections: List[Tuple[str, List[str]]] = []
+    in_fence = False
+    for line in markdown.splitlines():
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_PATTERN.match(line)
+        if match and len(match.group(1)) == 1:
+            sections.append((match.group(2), []))
+        elif sections:
+            sections[-1][1].append(line)
+    return sections
+
+
+def _prose_lines(lines: Iterable[str]) -> List[str]:
+    """The lines of a section that are prose: no headings, code blocks or table rows."""
+    prose, in_fence = [], False
+    for line in lines:
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence or HEADING_PATTERN.match(line) or line.lstrip().startswith("|"):
+            continue
+        prose.append(line)
+    return prose
+
+
+def _sentence_at(line: str, position: int) -> str:
+    for match in SENTENCE_PATTERN.finditer(line):
+        if match.start() <= position < max(match.end(), match.start() + 1):
+            return match.group(0).strip()
+    return line.strip()
+
+
+def _lint_bullets(title: str, lines: List[str]) -> List[LintIssue]:
+    return [
+        LintIssue(title, "bullet_points", "Bullet point or direct listing instead of flowing text", line.strip())
+        for line in lines if BULLET_PATTERN.match(line)
+    ]
+
+
+def _lint_negative_phrasing(title: str, lines: List[str]) -> List[LintIssue]:
+    issues, seen = [], set()
+    for line in lines:
+        for pattern in NEGATIVE_PATTERNS:
+            for match in pattern.finditer(line):
+                sentence = _sentence_at(line, match.start())
+                if sentence not in seen:
+                    seen.add(sentence)
+                    issues.append(LintIssue(title, "negative_phrasing",
+                                            "Negative statement about what the company does not do", sentence))
+    return issues
+
+
+def _lint_company_synonyms(title: str, lines: List[str]) -> List[LintIssue]:
+    synonyms: Dict[str, str] = {}
+    for line in lines:
+        for match in COMPANY_SYNONYM_PATTERN.finditer(line):
+            synonyms.setdefault(match.group(1).lower().replace("-", ""), match.group(0))
+    if len(synonyms) <= MAX_COMPANY_SYNONYMS:
+        return []
+    return [LintIssue(title, "company_synonyms",
+                      f"Company referred to in {len(synonyms)} different ways besides its name "
+                      f"(at most {MAX_COMPANY_SYNONYMS})", ", ".join(synonyms.values()))]
+
+
+def _words(lines: List[str]) -> List[str]:
+    return WORD_PATTERN.findall(" ".join(lines).lower())
+
+
+def _lint_repeated_phrases(sections: List[Tuple[str, List[str]]]) -> List[LintIssue]:
+    """Flags word sequences of a section that also appear in another section, longest match first."""
+    n = REPEATED_PHRASE_WORDS
+    words = {title: _words(lines) for title, lines in sections}
+    shingles: Dict[tuple, set] = defaultdict(set)
+    for title, section_words in words.items():
+        for i in range(len(section_words) - n + 1):
+            shingles[tuple(section_words[i:i + n])].add(title)
+
+    issues, reported = [], set()
+    for title, section_words in words.items():
+        i = 0
+        while i <= len(section_words) - n:
+            others = shingles[tuple(section_words[i:i + n])] - {title}
+            if not others:
+                i += 1
+                continue
+            end = i + n
+            while end < len(section_words) and shingles[tuple(section_words[end - n + 1:end + 1])] - {title}:
+                end += 1
+            phrase = " ".join(section_words[i:end])
+            if phrase not in reported:
+                reported.add(phrase)
+                issues.append(LintIssue(title, "repeated_phrase",
+                                        f"Phrase repeated in {', '.join(sorted(others))}", phrase))
+            i = end
+    return issues
+
+
+def lint_business_plan(markdown: str, excluded_sections: Iterable[str] = EXCLUDED_SECTIONS) -> List[LintIssue]:
+    """
+    Checks a consolidated business plan for the issues evaluate_plan flags that can be detected
+    mechanically: bullet points, negative phrasing, too many company synonyms per section and
+    phrases repeated across sections.
+
+    Args:
+        markdown (str): The consolidated plan, with one top-level heading per section
+        excluded_sections (iterable): Section titles that are not checked
+
+    Returns:
+        list: The LintIssues found, in section order
+    """
+    excluded = {title.lower() for title in excluded_sections}
+    sections = [(title, _prose_lines(lines)) for title, lines in split_sections(markdown)
+                if title.lower() not in excluded]
+    issues = []
+    for title, lines in sections:
+        issues += _lint_bullets(title, lines)
+        issues += _lint_negative_phrasing(title, lines)
+        issues += _lint_company_synonyms(title, lines)
+    issues += _lint_repeated_phrases(sections)
+    order = {title: i for i, (title, _) in enumerate(sections)}
+    return sorted(issues, key=lambda issue: order.get(issue.section, len(order)))
+
+
+def format_issues(issues: List[LintIssue]) -> str:
+    """Renders issues as the evaluator's bulleted list of section names and exact problematic text."""
+    return "\n".join(f'- **{issue.section}**: {issue.message}: "{issue.text}"' for issue in issues)
+
+
+class ReviewSavings:
+    """
+    Running estimate of the evaluate/refine time saved by skipping the review of clean plans:
+    every skip is credited with the mean duration of the reviews that did run.
+    """
+
+    def __init__(self):
+        self.reviewed = 0
+        self.skipped = 0
+        self.review_seconds = 0.0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_review(self, seconds: float):
+        with self._lock:
+            self.reviewed += 1
+            self.review_seconds += seconds
+
+    def record_skip(self) -> Optional[float]:
+        """Counts a skipped review; returns the estimated seconds saved, None before any review ran."""
+        with self._lock:
+            self.skipped += 1
+            if not self.reviewed:
+                return None
+            saved = self.review_seconds / self.reviewed
+            self.saved_seconds += saved
+            return saved
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.reviewed + self.skipped
+            return {
+                "reviewed": self.reviewed,
+                "skipped": self.skipped,
+                "skip_rate": self.skipped / total if total else 0.0,
+                "mean_review_seconds": self.review_seconds / self.reviewed if self.reviewed else 0.0,
+                "estimated_seconds_saved": self.saved_seconds,
+            }
+
+
+review_savings = ReviewSavings()
+
+# --- END OF FILE src/plan_linter.py ---
@@ -0,0 +1,160 @@
+# --- START OF FILE src/plan_patches.py ---
+
+import difflib
+import json
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+# "rewrite": the refiner re-emits the whole plan; "patch": it returns edits that are applied locally
+REFINE_MODES = ("rewrite", "patch")
+# Minimum difflib similarity for an edit's original text to anchor to a different span of the plan
+FUZZY_ANCHOR_RATIO = 0.85
+
+JSON_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+SECTION_HEADING_PATTERN = re.compile(r"^# +(.+?)[ \t]*$", re.MULTILINE)
+
+EDIT_FORMAT = (
+    'Answer with a JSON array only, one object per edit: '
+    '[{"section": "<section title>", "original": "<exact text from the plan>", "replacement": "<new text>"}]. '
+    'Copy "original" character for character from the plan and keep it as short as the change allows, '
+    'usually one sentence. Answer with [] if nothing needs to change.'
+)
+
+
+class PlanEdit(NamedTuple):
+    section: str
+    original: str
+    replacement: str
+
+
+def parse_edits(text: str) -> Optional[List[PlanEdit]]:
+    """Parses the refiner's JSON edit list, also from inside a code fence; returns None if it is not one."""
+    text = (text or "").strip()
+    fenced = JSON_FENCE_PATTERN.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    elif "[" in text and "]" in text[text.index("["):]:
+        text = text[text.index("["):text.rindex("]") + 1]
+    try:
+        raw = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(raw, list):
+        return None
+    return [
+        PlanEdit(str(edit.get("section") or ""), str(edit["original"]), str(edit.get("replacement") or ""))
+        for edit in raw
+        if isinstance(edit, dict) and edit.get("original")
+    ]
+
+
+def section_span(markdown: str, title: str) -> Tuple[int, int]:
+    """Returns the character range of the section under the top-level heading `title`, or the whole plan."""
+    headings = list(SECTION_HEADING_PATTERN.finditer(markdown))
+    for i, heading in enumerate(headings):
+        if heading.group(1).strip().lower() == title.strip().lower():
+            end = headings[i + 1].start() if i + 1 < len(headings) else len(markdown)
+            return heading.end(), end
+    return 0, len(markdown)
+
+
+def _fuzzy_anchor(text: str, original: str) -> Optional[Tuple[int, int]]:
+    """Finds the span of `text` most similar to `original`, starting from their longest common block."""
+    matcher = difflib.SequenceMatcher(None, text, original, autojunk=False)
+    block = matcher.find_longest_match(0, len(text), 0, len(original))
+    if block.size == 0:
+        return None
+    start = max(block.a - block.b, 0)
+    end = min(start + len(original), len(text))
+    # Widen to whole words, so a replacement never splits one
+    while start > 0 and not text[start - 1].isspace():
+        start -= 1
+    while end < len(text) and not text[end].isspace():
+        end += 1
+    if difflib.SequenceMatcher(None, text[start:end], original, autojunk=False).ratio() < FUZZY_ANCHOR_RATIO:
+        return None
+    return start, end
+
+
+def anchor_edit(markdown: str, edit: PlanEdit) -> Optional[Tuple[int, int]]:
+    """
+    Locates the text an edit replaces: verbatim, then with any whitespace, then by similarity,
+    first within the edit's section and then in the whole plan.
+
+    Returns:
+        tuple: The (start, end) character range in `markdown`, or None if the edit does not anchor
+    """
+    words = edit.original.split()
+    if not words:
+        return None
+    loose = re.compile(r"\s+".join(re.escape(word) for word in words))
+    scopes = [section_span(markdown, edit.section), (0, len(markdown))]
+    for start, end in scopes:
+        index = markdown.find(edit.original, start, end)
+        if index >= 0:
+            return index, index + len(edit.original)
+        match = loose.search(markdown, start, end)
+        if match:
+            return match.span()
+    for start, end in scopes:
+        span = _fuzzy_anchor(markdown[start:end], edit.original)
+        if span is not None:
+            return span[0] + start, span[1] + start
+    return None
+
+
+def apply_edits(markdown: str, edits: List[PlanEdit]) -> Tuple[str, List[PlanEdit]]:
+    """
+    Applies edits one after the other.
+
+    Returns:
+        tuple: (patched markdown, the edits that did not anchor)
+    """
+    failed = []
+    for edit in edits:
+        span = anchor_edit(markdown, edit)
+        if span is None:
+            failed.append(edit)
+            continue
+        markdown = markdown[:span[0]] + edit.replacement + markdown[span[1]:]
+    return markdown, failed
+
+
+def patch_messages(plan: str, feedback: str) -> List[dict]:
+    """Messages asking the refiner for the edits that apply the evaluator's feedback."""
+    return [
+        {
+            "role": "system",
+            "content": "You are a business plan writer who applies evaluator feedback minimally and precisely. "
+                       "You do not alter the structure of the plan, add new content or change its tone, voice "
+                       "or formatting. " + EDIT_FORMAT,
+        },
+        {
+            "role": "user",
+            "content": f"The full business plan is:\n\n{plan}\n\n----------\n\n"
+                       f"The evaluator feedback comments are:\n\n{feedback}\n\n----------\n\n"
+                       f"Return the edits that apply only the suggested changes. {EDIT_FORMAT}",
+        },
+    ]
+
+
+def reanchor_messages(plan: str, failed: List[PlanEdit]) -> List[dict]:
+    """Messages asking the refiner once more for edits whose original text was not found in the plan."""
+    parts = []
+    for edit in failed:
+        start, end = section_span(plan, edit.section)
+        parts.append(
+            f"Section: {edit.section}\nOriginal you gave: {edit.original}\nReplacement: {edit.replacement}\n"
+            f"Current text of the section:\n{plan[start:end].strip()}"
+        )
+    return [
+        {"role": "system", "content": "You correct edits to a business plan. " + EDIT_FORMAT},
+        {
+            "role": "user",
+            "content": "The original text of these edits does not appear in the plan. Give each edit again with "
+                       "the original copied exactly from the current text of its section.\n\n"
+                       + "\n\n----------\n\n".join(parts) + f"\n\n{EDIT_FORMAT}",
+        },
+    ]
+
+# --- END OF FILE src/plan_patches.py ---
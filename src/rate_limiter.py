@@ -0,0 +1,185 @@
+# --- START OF FILE src/rate_limiter.py ---
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .llm_pool import api_key_fingerprint
+from .metrics import RATE_LIMIT_QUEUE_LENGTH, RATE_LIMIT_QUEUE_WAIT
+
+# Requests and tokens per minute allowed per API key and model. Models without an entry are not limited.
+# Override or extend with LLM_RATE_LIMITS, e.g.
+#   LLM_RATE_LIMITS='{"groq/llama-3.3-70b-versatile": {"rpm": 30, "tpm": 12000}}'
+DEFAULT_RATE_LIMITS = {
+    "gemini/gemini-2.5-pro-preview-05-06": {"rpm": 150, "tpm": 2_000_000},
+    "groq/llama-3.3-70b-versatile": {"rpm": 30, "tpm": 12_000},
+}
+# Limiters unused for this long are dropped, like the pooled clients. By then both buckets have
+# refilled, so a new limiter for the key starts from the same state.
+IDLE_TTL_SECONDS = max(float(os.getenv("LLM_POOL_IDLE_TTL_SECONDS", str(15 * 60))), 60.0)
+
+_rate_limits: Optional[Dict[str, Dict[str, int]]] = None
+
+
+def rate_limits_for(model: str) -> Optional[Dict[str, int]]:
+    """Returns the {"rpm": ..., "tpm": ...} budget of a model, or None if it is not limited."""
+    global _rate_limits
+    if _rate_limits is None:
+        limits = dict(DEFAULT_RATE_LIMITS)
+        limits.update(json.loads(os.getenv("LLM_RATE_LIMITS", "{}")))
+        _rate_limits = limits
+    return _rate_limits.get(model)
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter with a requests-per-minute and a tokens-per-minute budget.
+
+    Both buckets start full and refill continuously. Callers are served strictly in arrival
+    order: only the oldest waiting caller may take from the buckets, so a large request is
+    never starved by a stream of small ones.
+
+    Args:
+        rpm (int): Requests per minute, or None for no request limit
+        tpm (int): Tokens per minute, or None for no token limit
+    """
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm or 0)
+        self._tokens = float(tpm or 0)
+        self._updated = time.monotonic()
+        self.last_used = self._updated
+        self._condition = threading.Condition()
+        # (ticket, enqueue time) of the waiting callers, oldest first
+        self._queue: List[Tuple[object, float]] = []
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(float(self.rpm), self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(float(self.tpm), self._tokens + elapsed * self.tpm / 60)
+
+    def _delay(self, tokens: int) -> float:
+        """Seconds until both buckets hold enough for one request of `tokens` tokens."""
+        delay = 0.0
+        if self.rpm and self._requests < 1:
+            delay = (1 - self._requests) * 60 / self.rpm
+        if self.tpm and self._tokens < tokens:
+            delay = max(delay, (tokens - self._tokens) * 60 / self.tpm)
+        return delay
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Blocks until the request fits in both budgets, then takes it from the buckets.
+
+        Args:
+            tokens (int): Estimated tokens of the request; capped at the per-minute budget
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if not self.rpm and not self.tpm:
+            return 0.0
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        ticket = object()
+        start = time.monotonic()
+        self.last_used = start
+        with self._condition:
+            self._queue.append((ticket, start))
+            try:
+                while True:
+                    self._refill(time.monotonic())
+                    if self._queue[0][0] is ticket:
+                        delay = self._delay(tokens)
+                        if delay <= 0:
+                            self._requests -= 1 if self.rpm else 0
+                            self._tokens -= tokens
+                            break
+                        self._condition.wait(delay)
+                    else:
+                        self._condition.wait()
+            finally:
+                self._queue = [entry for entry in self._queue if entry[0] is not ticket]
+                self._condition.notify_all()
+        self.last_used = time.monotonic()
+        return self.last_used - start
+
+    def adjust(self, tokens: int):
+        """Charges tokens that were not known before the request, e.g. the completion tokens."""
+        if not self.tpm or not tokens:
+            return
+        with self._condition:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+
+    def is_idle(self, now: float, ttl: float) -> bool:
+        return not self._queue and now - self.last_used > ttl
+
+    @property
+    def queue_length(self) -> int:
+        return len(self._queue)
+
+    @property
+    def oldest_wait(self) -> float:
+        """Seconds the longest-waiting caller has been queued, 0 when nobody waits."""
+        queue = self._queue
+        return time.monotonic() - queue[0][1] if queue else 0.0
+
+
+# (provider, model) -> API-key fingerprint -> limiter
+_limiters: Dict[Tuple[str, str], Dict[str, RateLimiter]] = {}
+_limiters_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+def _limiters_of(provider: str, model: str) -> List[RateLimiter]:
+    return list(_limiters.get((provider, model), {}).values())
+
+
+def _evict_idle(now: float):
+    """Drops the limiters nobody waits on and nobody used for IDLE_TTL_SECONDS."""
+    for limiters in _limiters.values():
+        for fingerprint in [fp for fp, limiter in limiters.items() if limiter.is_idle(now, IDLE_TTL_SECONDS)]:
+            del limiters[fingerprint]
+
+
+def get_rate_limiter(provider: str, api_key: str, model: str) -> Optional[RateLimiter]:
+    """
+    Returns the process-wide limiter of an API key and model, shared by all agents and requests,
+    or None if the model has no configured budget.
+    """
+    global _last_sweep
+    limits = rate_limits_for(model)
+    if not limits or not api_key:
+        return None
+    fingerprint = api_key_fingerprint(api_key)
+    now = time.monotonic()
+    with _limiters_lock:
+        if now - _last_sweep > IDLE_TTL_SECONDS:
+            _evict_idle(now)
+            _last_sweep = now
+        if (provider, model) not in _limiters:
+            _limiters[(provider, model)] = {}
+            # Queue metrics are reported per provider and model, over all API keys
+            RATE_LIMIT_QUEUE_LENGTH.set_function(
+                lambda: sum(limiter.queue_length for limiter in _limiters_of(provider, model)),
+                provider=provider, model=model,
+            )
+            RATE_LIMIT_QUEUE_WAIT.set_function(
+                lambda: max((limiter.oldest_wait for limiter in _limiters_of(provider, model)), default=0.0),
+                provider=provider, model=model,
+            )
+        limiters = _limiters[(provider, model)]
+        limiter = limiters.get(fingerprint)
+        if limiter is None:
+            limiter = limiters[fingerprint] = RateLimiter(rpm=limits.get("rpm"), tpm=limits.get("tpm"))
+        limiter.last_used = now
+        return limiter
+
+# --- END OF FILE src/rate_limiter.py ---
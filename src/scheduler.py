@@ -0,0 +1,126 @@
+# --- START OF FILE src/scheduler.py ---
+
+import contextvars
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+# Default number of concurrent calls per LLM provider across the whole process.
+# Override with <PROVIDER>_MAX_CONCURRENCY, e.g. GEMINI_MAX_CONCURRENCY=8.
+DEFAULT_PROVIDER_CONCURRENCY = {"gemini": 4, "groq": 2}
+
+_provider_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_provider_semaphores_lock = threading.Lock()
+
+
+def provider_semaphore(provider: str) -> threading.BoundedSemaphore:
+    """Returns the process-wide semaphore limiting concurrent calls to a provider."""
+    with _provider_semaphores_lock:
+        if provider not in _provider_semaphores:
+            default = DEFAULT_PROVIDER_CONCURRENCY.get(provider, 1)
+            limit = int(os.getenv(f"{provider.upper()}_MAX_CONCURRENCY", default))
+            _provider_semaphores[provider] = threading.BoundedSemaphore(max(limit, 1))
+        return _provider_semaphores[provider]
+
+
+class TaskGraph:
+    """
+    Dependency graph of the plan tasks, as declared with `depends_on` in tasks.yaml.
+
+    Args:
+        dependencies (dict): Maps every task name to the list of task names it depends on
+    """
+
+    def __init__(self, dependencies: Dict[str, List[str]]):
+        self.dependencies = {name: list(deps or []) for name, deps in dependencies.items()}
+        self.dependents: Dict[str, List[str]] = {name: [] for name in self.dependencies}
+        for name, deps in self.dependencies.items():
+            for dep in deps:
+                if dep not in self.dependencies:
+                    raise ValueError(f"Task '{name}' depends on unknown task '{dep}'.")
+                self.dependents[dep].append(name)
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        remaining = {name: len(deps) for name, deps in self.dependencies.items()}
+        ready = [name for name, count in remaining.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for dependent in self.dependents[name]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(self.dependencies):
+            cyclic = sorted(name for name, count in remaining.items() if count > 0)
+            raise ValueError(f"Task dependencies contain a cycle involving: {', '.join(cyclic)}")
+        return order
+
+    def critical_path_length(self, durations: Dict[str, float]) -> float:
+        """Returns the length of the longest dependency chain for the given task durations."""
+        finish: Dict[str, float] = {}
+        for name in self.order:
+            start = max((finish[dep] for dep in self.dependencies[name]), default=0.0)
+            finish[name] = start + durations.get(name, 0.0)
+        return max(finish.values(), default=0.0)
+
+
+def run_task_graph(
+    graph: TaskGraph,
+    run_task: Callable[[str, Dict[str, Any]], Any],
+    provider_of: Callable[[str], Optional[str]] = lambda name: None,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Runs every task of the graph as soon as all of its dependencies are finished.
+
+    Independent tasks run at the same time; tasks bound to a provider additionally
+    wait for a slot of that provider's process-wide semaphore. Every task runs in a copy
+    of the caller's context, so trace spans and other contextvars carry over.
+
+    Args:
+        graph (TaskGraph): The task graph to execute
+        run_task (callable): Called as run_task(name, upstream_outputs) and returns the task output;
+            upstream_outputs maps each dependency name to its output, in declaration order
+        provider_of (callable): Returns the provider a task calls, or None for local tasks
+        max_workers (int): Maximum number of threads; defaults to the number of tasks
+
+    Returns:
+        dict: The output of every task, keyed by task name
+    """
+    outputs: Dict[str, Any] = {}
+    remaining = {name: len(deps) for name, deps in graph.dependencies.items()}
+
+    def execute(name: str):
+        upstream = {dep: outputs[dep] for dep in graph.dependencies[name]}
+        provider = provider_of(name)
+        if provider is None:
+            return run_task(name, upstream)
+        with provider_semaphore(provider):
+            return run_task(name, upstream)
+
+    def submit(name: str):
+        return pool.submit(contextvars.copy_context().run, execute, name)
+
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(graph.order), 1), thread_name_prefix="task") as pool:
+        pending = {submit(name): name for name in graph.order if remaining[name] == 0}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    outputs[name] = future.result()
+                except Exception:
+                    # Don't start anything new; tasks already running are waited for by the pool
+                    for other in pending:
+                        other.cancel()
+                    raise
+                for dependent in graph.dependents[name]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        pending[submit(dependent)] = dependent
+    return outputs
+
+# --- END OF FILE src/scheduler.py ---
@@ -0,0 +1,111 @@
+# --- START OF FILE src/toc.py ---
+
+import re
+from typing import Dict, List, Tuple
+
+from .consolidation import FENCE_PATTERN, HEADING_PATTERN, _strip_outer_fence
+
+TOC_TITLE = "Table of Contents"
+# Headings down to this level are listed: the plan sections and their subsections
+TOC_MAX_LEVEL = 2
+TOC_HEADING_PATTERN = re.compile(r"^(#{1,6})[ \t]+\**(?:table of contents|contents)\**[ \t]*#*[ \t]*$", re.IGNORECASE)
+SLUG_STRIP_PATTERN = re.compile(r"[^\w\- ]", re.UNICODE)
+INLINE_MARKUP_PATTERN = re.compile(r"[*_`]|\[([^\]]*)\]\([^)]*\)")
+# Underline of a setext heading: "===" for level 1, "---" for level 2
+SETEXT_UNDERLINE_PATTERN = re.compile(r"^(=+|-+)[ \t]*$")
+
+
+def heading_text(raw: str) -> str:
+    """The plain text of a heading, without emphasis, code marks or link targets."""
+    return INLINE_MARKUP_PATTERN.sub(lambda match: match.group(1) or "", raw).strip()
+
+
+def heading_slug(text: str, used: Dict[str, int]) -> str:
+    """
+    GitHub-style anchor of a heading: lowercase, punctuation removed, spaces as hyphens,
+    and "-1", "-2", ... appended to repeated slugs. `used` collects the slugs of one document.
+    """
+    slug = SLUG_STRIP_PATTERN.sub("", heading_text(text).lower()).replace(" ", "-")
+    count = used.get(slug, 0)
+    used[slug] = count + 1
+    return slug if count == 0 else f"{slug}-{count}"
+
+
+def heading_tree(markdown: str) -> List[Tuple[int, str, str]]:
+    """
+    Returns (level, text, anchor) of every heading outside code blocks, in document order.
+    Like the markdown renderer, a setext heading is the first line of a paragraph underlined
+    with "=" or "-".
+    """
+    headings, used, in_fence = [], {}, False
+    # The previous line, if it can be the text of a setext heading
+    setext_text = None
+    block_start = True
+    for line in markdown.splitlines():
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+            setext_text, block_start = None, False
+            continue
+        if in_fence:
+            continue
+        match = HEADING_PATTERN.match(line)
+        underline = SETEXT_UNDERLINE_PATTERN.match(line) if setext_text is not None else None
+        if match:
+            headings.append((len(match.group(1)), heading_text(match.group(2)), heading_slug(match.group(2), used)))
+        elif underline:
+            level = 1 if underline.group(1).startswith("=") else 2
+            headings.append((level, heading_text(setext_text), heading_slug(setext_text, used)))
+        blank = not line.strip()
+        setext_text = line.strip() if block_start and not blank and not match and not line.startswith("    ") else None
+        # The line after a heading starts a new block
+        block_start = blank or bool(match or underline)
+    return headings
+
+
+def strip_table_of_contents(markdown: str) -> str:
+    """Removes a table of contents section, e.g. one an LLM wrote, up to the next heading of the same or a higher level."""
+    lines = markdown.splitlines()
+    kept, skip_level = [], None
+    for line in lines:
+        match = HEADING_PATTERN.match(line)
+        if skip_level is not None:
+            if match and len(match.group(1)) <= skip_level:
+                skip_level = None
+            else:
+                continue
+        toc = TOC_HEADING_PATTERN.match(line)
+        if toc:
+            skip_level = len(toc.group(1))
+            continue
+        kept.append(line)
+    return "\n".join(kept).strip() + "\n"
+
+
+def build_table_of_contents(markdown: str, max_level: int = TOC_MAX_LEVEL) -> str:
+    """
+    Builds a markdown table of contents from the heading tree, with anchor links.
+
+    Args:
+        markdown (str): The plan, without a table of contents
+        max_level (int): The deepest heading level listed
+
+    Returns:
+        str: The table of contents section, or "" if the plan has no headings
+    """
+    headings = [heading for heading in heading_tree(markdown) if heading[0] <= max_level]
+    if not headings:
+        return ""
+    top = min(level for level, _, _ in headings)
+    lines = [f"# {TOC_TITLE}", ""]
+    for level, text, anchor in headings:
+        lines.append(f"{'    ' * (level - top)}- [{text}](#{anchor})")
+    return "\n".join(lines) + "\n"
+
+
+def add_table_of_contents(markdown: str, max_level: int = TOC_MAX_LEVEL) -> str:
+    """Replaces any existing table of contents with one built from the headings, placed at the top."""
+    body = strip_table_of_contents(_strip_outer_fence(markdown.strip()))
+    toc = build_table_of_contents(body, max_level)
+    return f"{toc}\n{body}" if toc else body
+
+# --- END OF FILE src/toc.py ---
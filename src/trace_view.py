@@ -0,0 +1,124 @@
+# --- START OF FILE src/trace_view.py ---
+"""
+Renders a trace exported by src/tracing.py as a Gantt-style text timeline.
+
+Every span is one row, indented below its parent, with a bar showing when it ran
+relative to the whole trace. "self" is the time a span spent outside its child
+spans, i.e. where time went between the child operations.
+
+Usage:
+    python -m src.trace_view [TRACE_ID] [--file data/traces.jsonl] [--width 60]
+
+Without a trace id, the most recently finished trace in the file is shown.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+from .tracing import TRACE_EXPORT_PATH
+
+
+def load_spans(path: str, trace_id: Optional[str] = None) -> List[Dict]:
+    """Returns the spans of a trace, or of the most recently finished trace when no id is given."""
+    spans = []
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    if trace_id is None:
+        if not spans:
+            return []
+        trace_id = max(spans, key=lambda s: s["end"] or 0)["trace_id"]
+    return [s for s in spans if s["trace_id"] == trace_id]
+
+
+def _covered_time(intervals: List[tuple]) -> float:
+    """Total length of the union of (start, end) intervals."""
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def _label(span: Dict) -> str:
+    attributes = span.get("attributes") or {}
+    details = [f"{key}={attributes[key]}" for key in ("cached", "local") if attributes.get(key)]
+    if span["kind"] == "llm" and attributes.get("agent"):
+        details.append(attributes["agent"])
+    if span.get("error"):
+        details.append("ERROR")
+    return span["name"] + (f" [{', '.join(details)}]" if details else "")
+
+
+def render_timeline(spans: List[Dict], width: int = 60) -> str:
+    """Renders the spans as one indented row per span with a bar on a shared time axis."""
+    if not spans:
+        return "No spans found."
+    ids = {s["span_id"] for s in spans}
+    children: Dict[Optional[str], List[Dict]] = {}
+    for s in spans:
+        parent = s["parent_id"] if s["parent_id"] in ids else None
+        children.setdefault(parent, []).append(s)
+    for siblings in children.values():
+        siblings.sort(key=lambda s: s["start"])
+
+    trace_start = min(s["start"] for s in spans)
+    trace_end = max(s["end"] or s["start"] for s in spans)
+    total = max(trace_end - trace_start, 1e-9)
+
+    rows = []
+
+    def visit(span: Dict, depth: int):
+        end = span["end"] or trace_end
+        duration = end - span["start"]
+        child_spans = children.get(span["span_id"], [])
+        busy = _covered_time([(c["start"], c["end"] or trace_end) for c in child_spans])
+        first = int((span["start"] - trace_start) / total * width)
+        last = max(int((end - trace_start) / total * width), first + 1)
+        bar = " " * first + "#" * (last - first) + " " * (width - last)
+        rows.append((("  " * depth) + _label(span), bar, duration, duration - busy))
+        for child in child_spans:
+            visit(child, depth + 1)
+
+    for root in children.get(None, []):
+        visit(root, 0)
+
+    name_width = min(max(len(row[0]) for row in rows), 60)
+    lines = [f"trace {spans[0]['trace_id']}  total {total:.2f}s", ""]
+    lines.append(f"{'span':<{name_width}} |{'':<{width}}| {'duration':>9} {'self':>9}")
+    for name, bar, duration, self_time in rows:
+        lines.append(f"{name[:name_width]:<{name_width}} |{bar}| {duration:8.2f}s {self_time:8.2f}s")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace_id", nargs="?", help="Trace id (X-Trace-Id response header); defaults to the latest")
+    parser.add_argument("--file", default=TRACE_EXPORT_PATH or "data/traces.jsonl", help="Span export file")
+    parser.add_argument("--width", type=int, default=60, help="Width of the timeline bars in characters")
+    args = parser.parse_args(argv)
+
+    try:
+        spans = load_spans(args.file, args.trace_id)
+    except FileNotFoundError:
+        print(f"Trace file not found: {args.file}", file=sys.stderr)
+        return 1
+    print(render_timeline(spans, args.width))
+    return 0 if spans else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# --- END OF FILE src/trace_view.py ---
@@ -0,0 +1,222 @@
+# --- START OF FILE src/tracing.py ---
+
+import atexit
+import contextvars
+import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Finished spans are appended to this file, one JSON object per line; set to "" to disable tracing
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "data/traces.jsonl")
+# The file is rotated to <path>.1 when it grows beyond this size
+TRACE_EXPORT_MAX_BYTES = int(os.getenv("TRACE_EXPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+# Finished spans waiting for the writer thread; spans beyond this are dropped rather than blocking the caller
+TRACE_EXPORT_QUEUE_SIZE = int(os.getenv("TRACE_EXPORT_QUEUE_SIZE", "10000"))
+
+# W3C trace context header: version-trace_id-parent_id-flags
+TRACEPARENT_PATTERN = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+TRACE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class Span:
+    """One timed operation of a trace; spans form a tree through their parent ids."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "end", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, kind: str = "internal",
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes = dict(attributes or {})
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class JsonlSpanExporter:
+    """
+    Appends finished spans to a JSON Lines file.
+
+    `export` only queues the span, so it never does file I/O on the caller's thread (often the
+    event loop). A daemon thread writes the queued spans in batches to the open file and flushes
+    after each batch; spans still queued at interpreter exit are written by an atexit hook.
+    """
+
+    def __init__(self, path: str, max_bytes: int = TRACE_EXPORT_MAX_BYTES,
+                 queue_size: int = TRACE_EXPORT_QUEUE_SIZE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, span: Span):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(span.to_dict())
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name="span-exporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def close(self, timeout: float = 5.0):
+        """Writes the queued spans and stops the writer thread."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _write_loop(self):
+        fh, size = None, 0
+        while True:
+            batch: List[Optional[Dict[str, Any]]] = [self._queue.get()]
+            while batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            spans = [span for span in batch if span is not None]
+            try:
+                if fh is None:
+                    fh = open(self.path, "a", encoding="utf-8")
+                    size = fh.tell()
+                for span in spans:
+                    if size > self.max_bytes:
+                        fh.close()
+                        os.replace(self.path, self.path + ".1")
+                        fh = open(self.path, "a", encoding="utf-8")
+                        size = 0
+                    line = json.dumps(span, ensure_ascii=False, default=str) + "\n"
+                    fh.write(line)
+                    size += len(line.encode("utf-8"))
+                fh.flush()
+            except OSError as e:
+                print(f"Could not export {len(spans)} span(s): {e}")
+                if fh is not None:
+                    try:
+                        fh.close()
+                    except OSError:
+                        pass
+                fh = None
+            if batch[-1] is None:
+                if fh is not None:
+                    fh.close()
+                return
+
+
+_exporter: Optional[JsonlSpanExporter] = JsonlSpanExporter(TRACE_EXPORT_PATH) if TRACE_EXPORT_PATH else None
+
+# The innermost open span, and the trace id to use for spans started without a parent
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_current_trace: contextvars.ContextVar[Optional[Dict[str, Optional[str]]]] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def trace_from_headers(headers) -> Dict[str, Optional[str]]:
+    """
+    Returns the trace id (and remote parent span id) of an incoming request.
+    Accepts a W3C `traceparent` header or an `X-Trace-Id` header; otherwise starts a new trace.
+    """
+    match = TRACEPARENT_PATTERN.match((headers.get("traceparent") or "").strip().lower())
+    if match:
+        return {"trace_id": match.group(1), "parent_id": match.group(2)}
+    trace_id = (headers.get("x-trace-id") or "").strip().lower().replace("-", "")
+    if TRACE_ID_PATTERN.match(trace_id):
+        return {"trace_id": trace_id, "parent_id": None}
+    return {"trace_id": new_trace_id(), "parent_id": None}
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    if span is not None:
+        return span.trace_id
+    trace = _current_trace.get()
+    return trace["trace_id"] if trace else None
+
+
+@contextmanager
+def use_trace(trace_id: str, parent_id: Optional[str] = None):
+    """Makes spans started inside the block (without an open parent span) join the given trace."""
+    token = _current_trace.set({"trace_id": trace_id, "parent_id": parent_id})
+    try:
+        yield
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """
+    Times the block as a span, as a child of the current span. Exceptions are recorded
+    on the span and re-raised.
+
+    Spans propagate through contextvars: asyncio tasks inherit them automatically, threads
+    only when the work is submitted with contextvars.copy_context().run.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        trace = _current_trace.get() or {"trace_id": new_trace_id(), "parent_id": None}
+        trace_id, parent_id = trace["trace_id"], trace["parent_id"]
+
+    current = Span(name, trace_id, parent_id, kind, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end = time.time()
+        if _exporter is not None:
+            _exporter.export(current)
+
+
+class TracedToolMixin:
+    """Mixin for crewai tools that records every tool call as a span of the running task."""
+
+    def _run(self, *args, **kwargs):
+        with span(f"tool {self.name}", kind="tool"):
+            return super()._run(*args, **kwargs)
+
+
+def traced_tool(tool_class: type) -> type:
+    """Returns a subclass of a crewai tool class whose calls are traced."""
+    return type(f"Traced{tool_class.__name__}", (TracedToolMixin, tool_class), {})
+
+# --- END OF FILE src/tracing.py ---
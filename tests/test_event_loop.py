@@ -0,0 +1,89 @@
+# --- START OF FILE tests/test_event_loop.py ---
+"""
+The crew runs on the bounded executor, so the event loop keeps serving requests while a plan
+is being generated. run_crew is replaced by a stub that blocks its thread like a real crew.
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import httpx
+import pytest
+
+CREW_SECONDS = 2.0
+# A blocked event loop would answer only after the crew finished
+HEALTH_TIMEOUT_SECONDS = 0.5
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    # backend.py opens its stores at import time; keep them out of ./data
+    for name, filename in (("JOB_STORE_PATH", "jobs.sqlite3"), ("PLAN_CACHE_DIR", "plan_cache"),
+                           ("SECTION_CACHE_DIR", "section_cache"), ("PLAN_ARCHIVE_PATH", "plan_archive.sqlite3"),
+                           ("EXPORT_CACHE_DIR", "export_cache"), ("TRACE_EXPORT_PATH", "traces.jsonl")):
+        monkeypatch.setenv(name, str(tmp_path / filename))
+    import backend as backend_module
+    from src import main as flow_module
+    from src.job_store import JobStore
+    from src.plan_archive import PlanArchive
+
+    # The stores were opened by the first import; point them at this test's directory
+    monkeypatch.setattr(backend_module, "job_store", JobStore(str(tmp_path / "jobs.sqlite3")))
+    monkeypatch.setattr(backend_module, "plan_archive", PlanArchive(str(tmp_path / "plan_archive.sqlite3")))
+    return backend_module, flow_module
+
+
+@pytest.mark.anyio
+async def test_health_answers_while_crew_runs(backend, monkeypatch):
+    backend_module, flow_module = backend
+    from benchmarks.fakes import sample_request_data
+    from src.generate_plan_crew import CrewRunResult
+
+    crew_started = threading.Event()
+
+    def slow_run_crew(gemini_api_key, groq_api_key, inputs, bypass_cache=False):
+        crew_started.set()
+        time.sleep(CREW_SECONDS)
+        return CrewRunResult(business_plan="# Plan\n", config_version="test")
+
+    monkeypatch.setattr(flow_module, "run_crew", slow_run_crew)
+
+    transport = httpx.ASGITransport(app=backend_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        payload = sample_request_data(gemini_api_key="fake", groq_api_key="fake", bypass_cache=True)
+        submitted = await client.post("/jobs", json=payload)
+        assert submitted.status_code == 202
+        job_id = submitted.json()["job_id"]
+
+        # Wait until the crew is running without blocking the event loop
+        for _ in range(100):
+            if crew_started.is_set():
+                break
+            await asyncio.sleep(0.05)
+        assert crew_started.is_set()
+
+        start = time.perf_counter()
+        health = await asyncio.wait_for(client.get("/health"), timeout=HEALTH_TIMEOUT_SECONDS)
+        elapsed = time.perf_counter() - start
+        assert health.status_code == 200
+        assert elapsed < HEALTH_TIMEOUT_SECONDS
+
+        # The crew was still running while /health answered
+        status = await client.get(f"/jobs/{job_id}")
+        assert status.json()["status"] == "running"
+
+        for _ in range(int(CREW_SECONDS / 0.05) + 100):
+            status = await client.get(f"/jobs/{job_id}")
+            if status.json()["status"] != "running":
+                break
+            await asyncio.sleep(0.05)
+        assert status.json()["status"] == "succeeded", status.json()
+
+# --- END OF FILE tests/test_event_loop.py ---
@@ -0,0 +1,104 @@
+# --- START OF FILE tests/test_plan_linter.py ---
+"""
+The mechanical checks that decide whether a consolidated plan still needs the evaluate/refine review.
+"""
+
+from src.plan_linter import lint_business_plan
+
+CLEAN_PLAN = (
+    "# Executive Summary\n\n"
+    "Bean There opens a specialty coffee shop next to the university library in Porto. "
+    "Bean There roasts its own beans and serves students and office workers from early morning.\n\n"
+    "# Market Analysis\n\n"
+    "Porto has forty thousand students, and the streets around the campus offer few places to sit and work. "
+    "Demand for quiet seating with good coffee peaks during the examination periods.\n\n"
+    "# Financial Plan\n\n"
+    "- Revenue in year one: 180,000 EUR\n"
+    "- The shop does not take a bank loan.\n"
+)
+
+
+def rules(issues):
+    return [issue.rule for issue in issues]
+
+
+def test_clean_plan_has_no_findings():
+    assert lint_business_plan(CLEAN_PLAN) == []
+
+
+def test_bullet_points():
+    plan = CLEAN_PLAN.replace(
+        "Demand for quiet seating",
+        "The shop offers:\n- espresso drinks\n1. pastries from a local bakery\n\nDemand for quiet seating",
+    )
+    issues = lint_business_plan(plan)
+    assert rules(issues) == ["bullet_points", "bullet_points"]
+    assert {issue.section for issue in issues} == {"Market Analysis"}
+    assert [issue.text for issue in issues] == ["- espresso drinks", "1. pastries from a local bakery"]
+
+
+def test_negative_phrasing():
+    plan = CLEAN_PLAN.replace(
+        "Bean There roasts its own beans",
+        "Bean There does not sell alcohol and won't offer delivery. Seating isn't limited. "
+        "Bean There roasts its own beans",
+    )
+    issues = lint_business_plan(plan)
+    assert rules(issues) == ["negative_phrasing", "negative_phrasing"]
+    # One finding per sentence, however many negations it has
+    assert [issue.text for issue in issues] == [
+        "Bean There does not sell alcohol and won't offer delivery.",
+        "Seating isn't limited.",
+    ]
+    assert all(issue.section == "Executive Summary" for issue in issues)
+
+
+def test_not_only_is_not_negative_phrasing():
+    plan = CLEAN_PLAN.replace("Bean There roasts", "Bean There does not only brew coffee, it roasts")
+    assert lint_business_plan(plan) == []
+
+
+def test_company_synonyms():
+    plan = CLEAN_PLAN.replace(
+        "Demand for quiet seating",
+        "The company targets students. Our business opens early. The firm roasts daily. "
+        "The venture hires baristas. Demand for quiet seating",
+    )
+    issues = lint_business_plan(plan)
+    assert rules(issues) == ["company_synonyms"]
+    assert issues[0].section == "Market Analysis"
+    assert issues[0].text == "The company, Our business, The firm, The venture"
+
+
+def test_three_company_synonyms_are_allowed():
+    plan = CLEAN_PLAN.replace(
+        "Demand for quiet seating",
+        "The company targets students. Our business opens early. The firm roasts daily. Demand for quiet seating",
+    )
+    assert lint_business_plan(plan) == []
+
+
+def test_repeated_phrase():
+    phrase = "serves students and office workers from early morning"
+    plan = CLEAN_PLAN.replace("Demand for quiet seating", f"The shop {phrase}. Demand for quiet seating")
+    issues = lint_business_plan(plan)
+    # Reported once, at its first section
+    assert rules(issues) == ["repeated_phrase"]
+    assert issues[0].section == "Executive Summary"
+    assert phrase in issues[0].text
+    assert issues[0].message == "Phrase repeated in Market Analysis"
+
+
+def test_financial_plan_is_excluded():
+    plan = CLEAN_PLAN + (
+        "- Our business does not rent a second shop.\n"
+        "The company, the firm, the venture and the startup share one budget.\n"
+        "Bean There roasts its own beans and serves students and office workers from early morning.\n"
+    )
+    assert lint_business_plan(plan) == []
+    # The same section is checked when it is not excluded
+    assert set(rules(lint_business_plan(plan, excluded_sections=()))) == {
+        "bullet_points", "negative_phrasing", "company_synonyms", "repeated_phrase",
+    }
+
+# --- END OF FILE tests/test_plan_linter.py ---
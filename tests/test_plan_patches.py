@@ -0,0 +1,99 @@
+# --- START OF FILE tests/test_plan_patches.py ---
+"""
+Anchoring and applying the refiner's edits in patch mode.
+"""
+
+from src.plan_patches import PlanEdit, anchor_edit, apply_edits, parse_edits
+
+PLAN = (
+    "# Market Analysis\n\n"
+    "The local market for specialty coffee grows by 8% a year.\n"
+    "Most customers are students and office workers.\n\n"
+    "# Financial Plan\n\n"
+    "Revenue grows by 12% a year.\n"
+    "The break-even point is reached in month 18.\n"
+)
+
+
+def anchored_text(markdown: str, edit: PlanEdit) -> str:
+    span = anchor_edit(markdown, edit)
+    assert span is not None
+    return markdown[span[0]:span[1]]
+
+
+def test_verbatim_anchor():
+    edit = PlanEdit("Financial Plan", "reached in month 18", "reached in month 14")
+    assert anchored_text(PLAN, edit) == "reached in month 18"
+    patched, failed = apply_edits(PLAN, [edit])
+    assert failed == []
+    assert "The break-even point is reached in month 14.\n" in patched
+    assert patched.count("month 18") == 0
+
+
+def test_whitespace_anchor():
+    # The refiner joined two lines of the plan into one
+    edit = PlanEdit("Market Analysis", "grows by 8% a year. Most customers", "grows by 6% a year. Most customers")
+    assert anchored_text(PLAN, edit) == "grows by 8% a year.\nMost customers"
+    patched, failed = apply_edits(PLAN, [edit])
+    assert failed == []
+    assert "specialty coffee grows by 6% a year. Most customers are students" in patched
+
+
+def test_fuzzy_anchor():
+    # A slightly misquoted original still anchors to the sentence it was copied from
+    edit = PlanEdit("Market Analysis", "Most customers are student and office worker.", "Most customers are students.")
+    assert anchored_text(PLAN, edit) == "Most customers are students and office workers."
+    patched, failed = apply_edits(PLAN, [edit])
+    assert failed == []
+    assert "Most customers are students.\n\n# Financial Plan" in patched
+
+
+def test_edit_that_does_not_anchor():
+    edit = PlanEdit("Financial Plan", "We will open a second shop in Lisbon next spring.", "We will not expand.")
+    assert anchor_edit(PLAN, edit) is None
+    patched, failed = apply_edits(PLAN, [edit])
+    assert patched == PLAN
+    assert failed == [edit]
+
+
+def test_near_match_in_another_section_does_not_win_over_the_edit_section():
+    # "grows by 12% a year" in the Financial Plan is a near match of the Market Analysis sentence
+    edit = PlanEdit("Financial Plan", "Revenue grows by 12% a year.", "Revenue grows by 10% a year.")
+    plan = PLAN.replace("grows by 8% a year.", "Revenue grows by 13% a year.")
+    span = anchor_edit(plan, edit)
+    assert span is not None
+    assert span[0] > plan.index("# Financial Plan")
+    patched, failed = apply_edits(plan, [edit])
+    assert failed == []
+    assert "Revenue grows by 13% a year." in patched
+    assert "Revenue grows by 10% a year." in patched
+
+
+def test_verbatim_match_elsewhere_wins_over_near_match_in_the_named_section():
+    # The refiner named the wrong section; the exact text elsewhere is preferred to a similar sentence
+    edit = PlanEdit("Market Analysis", "Revenue grows by 12% a year.", "Revenue grows by 10% a year.")
+    plan = PLAN.replace("grows by 8% a year.", "Revenue grows by 13% a year.")
+    span = anchor_edit(plan, edit)
+    assert span is not None
+    assert plan[span[0]:span[1]] == "Revenue grows by 12% a year."
+    assert span[0] > plan.index("# Financial Plan")
+
+
+def test_parse_edits_from_fenced_answer():
+    answer = (
+        "Here are the edits:\n```json\n"
+        '[{"section": "Financial Plan", "original": "month 18", "replacement": "month 14"}, {"section": "x"}]\n'
+        "```"
+    )
+    assert parse_edits(answer) == [PlanEdit("Financial Plan", "month 18", "month 14")]
+
+
+def test_parse_edits_rejects_answers_that_are_not_edit_lists():
+    assert parse_edits("") is None
+    assert parse_edits("The plan looks good, no changes needed.") is None
+    assert parse_edits('{"section": "Financial Plan", "original": "a", "replacement": "b"}') is None
+    assert parse_edits("[1, 2") is None
+    assert parse_edits("# Market Analysis\n\nA rewritten plan [see appendix] instead of edits.") is None
+    assert parse_edits("[]") == []
+
+# --- END OF FILE tests/test_plan_patches.py ---
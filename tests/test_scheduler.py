@@ -0,0 +1,68 @@
+# --- START OF FILE tests/test_scheduler.py ---
+"""
+The dependency graph of the plan tasks and the scheduler that runs it.
+"""
+
+import threading
+
+import pytest
+
+from src.scheduler import TaskGraph, run_task_graph
+
+# Upper bound for waiting on another task's thread; only reached when the scheduler misbehaves
+WAIT_SECONDS = 5
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="cycle involving: a, b, c"):
+        TaskGraph({"start": [], "a": ["start", "c"], "b": ["a"], "c": ["b"]})
+
+
+def test_missing_dependency_is_rejected():
+    with pytest.raises(ValueError, match="Task 'summary' depends on unknown task 'market'"):
+        TaskGraph({"intro": [], "summary": ["intro", "market"]})
+
+
+def test_order_and_upstream_outputs():
+    graph = TaskGraph({"consolidate": ["market", "intro"], "intro": [], "market": ["intro"]})
+    assert graph.order == ["intro", "market", "consolidate"]
+
+    outputs = run_task_graph(graph, lambda name, upstream: f"{name}({','.join(upstream.values())})")
+    assert outputs == {
+        "intro": "intro()",
+        "market": "market(intro())",
+        "consolidate": "consolidate(market(intro()),intro())",
+    }
+
+
+def test_task_starts_as_soon_as_its_dependencies_finish():
+    # "fast_child" only depends on "fast"; it must not wait for "slow", which is still running
+    graph = TaskGraph({"slow": [], "fast": [], "fast_child": ["fast"], "slow_child": ["slow"]})
+    fast_child_started = threading.Event()
+    slow_saw_fast_child = []
+
+    def run_task(name, upstream):
+        if name == "slow":
+            slow_saw_fast_child.append(fast_child_started.wait(WAIT_SECONDS))
+        elif name == "fast_child":
+            fast_child_started.set()
+        return name
+
+    outputs = run_task_graph(graph, run_task)
+    assert slow_saw_fast_child == [True]
+    assert set(outputs) == {"slow", "fast", "fast_child", "slow_child"}
+
+
+def test_failed_task_stops_its_dependents():
+    graph = TaskGraph({"a": [], "b": ["a"]})
+    started = []
+
+    def run_task(name, upstream):
+        started.append(name)
+        raise RuntimeError(f"{name} failed")
+
+    with pytest.raises(RuntimeError, match="a failed"):
+        run_task_graph(graph, run_task)
+    assert started == ["a"]
+
+# --- END OF FILE tests/test_scheduler.py ---